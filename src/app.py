@@ -1,16 +1,24 @@
+import time
+
+_STARTED = time.perf_counter()
+
 import argparse
 from PyQt5 import QtWidgets
 
 from .gui.main_window import MainWindow
+from .gui.startup import StartupTimeline
 
 
 def main() -> None:
+    timeline = StartupTimeline(_STARTED)
+    timeline.mark("Import")
     parser = argparse.ArgumentParser(description="Getränkekasse")
     parser.add_argument('--fullscreen', action='store_true', help='Fullscreen GUI')
     args = parser.parse_args()
 
     app = QtWidgets.QApplication([])
-    window = MainWindow()
+    timeline.mark("QApplication")
+    window = MainWindow(timeline=timeline)
     if args.fullscreen:
         window.showFullScreen()
     else:
@@ -2,7 +2,7 @@ import sqlite3
 import shutil
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 DB_PATH = Path(__file__).resolve().parent.parent / 'data' / 'getraenkekasse.db'
 
@@ -75,16 +75,104 @@ _SCHEMA = {
         'key TEXT PRIMARY KEY, '
         'value TEXT'
         ')'
-    )
+    ),
+    'rfid_jobs': (
+        'CREATE TABLE IF NOT EXISTS rfid_jobs ('
+        'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+        "status TEXT NOT NULL DEFAULT 'pending', "
+        'uid TEXT, '
+        'error TEXT, '
+        'created REAL NOT NULL, '
+        'updated REAL'
+        ')'
+    ),
+    'telegram_outbox': (
+        'CREATE TABLE IF NOT EXISTS telegram_outbox ('
+        'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+        'method TEXT NOT NULL, '
+        'chat_id TEXT NOT NULL, '
+        'text TEXT, '
+        'filename TEXT, '
+        'document BLOB, '
+        'attempts INTEGER NOT NULL DEFAULT 0, '
+        'next_attempt REAL NOT NULL, '
+        'created REAL NOT NULL, '
+        'error TEXT'
+        ')'
+    ),
 }
 
+# Indexes backing the prefix search and name ordering of the admin lists.
+# NOCASE matches SQLite's case-insensitive LIKE, so ``name LIKE 'ab%'`` can
+# use them.
+_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_users_name ON users(name COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS idx_users_rfid_uid ON users(rfid_uid COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS idx_drinks_name ON drinks(name COLLATE NOCASE)',
+)
+
+# Stored in ``PRAGMA user_version`` by init_db(). Bump it whenever _SCHEMA,
+# _INDEXES or upgrade_schema() change, so existing databases get migrated
+# before the GUI touches them.
+SCHEMA_VERSION = 2
+
+# Optional query observers installed by the web admin's metrics. The trace
+# callback sees every statement SQLite runs, the timer gets the wall time
+# spent in execute calls.
+_sql_trace: Optional[Callable[[str], None]] = None
+_sql_timer: Optional[Callable[[float], None]] = None
+
+
+def set_sql_observers(
+    trace: Optional[Callable[[str], None]], timer: Optional[Callable[[float], None]]
+) -> None:
+    """Install (or with ``None`` remove) the SQL observers for new connections."""
+    global _sql_trace, _sql_timer
+    _sql_trace = trace
+    _sql_timer = timer
+
+
+class _TimedCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            if _sql_timer:
+                _sql_timer(time.perf_counter() - start)
+
+    def executemany(self, *args):
+        start = time.perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            if _sql_timer:
+                _sql_timer(time.perf_counter() - start)
+
+
+class _TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+
 def get_connection() -> sqlite3.Connection:
     DB_PATH.parent.mkdir(exist_ok=True)
     try:
-        conn = sqlite3.connect(DB_PATH)
+        if _sql_trace or _sql_timer:
+            conn = sqlite3.connect(DB_PATH, factory=_TimedConnection)
+        else:
+            conn = sqlite3.connect(DB_PATH)
     except sqlite3.Error as e:  # pragma: no cover - hard to trigger in tests
         raise RuntimeError(f"Datenbank konnte nicht geöffnet werden: {e}") from e
     conn.row_factory = sqlite3.Row
+    if _sql_trace:
+        conn.set_trace_callback(_sql_trace)
     return conn
 
 
@@ -114,6 +202,14 @@ def clear_exit_flag() -> None:
         pass
 
 
+def refresh_mtime() -> float:
+    """Return the modification time of the refresh flag, 0.0 if it is missing."""
+    try:
+        return REFRESH_FLAG.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
 def refresh_needed(last_mtime: float) -> bool:
     """Return True if the refresh flag has been modified since last_mtime."""
     if not REFRESH_FLAG.exists():
@@ -194,6 +290,8 @@ def init_db(conn: Optional[sqlite3.Connection] = None) -> None:
         cursor.execute(stmt)
     conn.commit()
     upgrade_schema(conn)
+    for stmt in _INDEXES:
+        cursor.execute(stmt)
     cursor.execute(
         "INSERT OR IGNORE INTO config (key, value) VALUES ('overdraft_limit', '0')"
     )
@@ -205,10 +303,24 @@ def init_db(conn: Optional[sqlite3.Connection] = None) -> None:
     )
     conn.commit()
     add_sample_data(conn)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    conn.commit()
     if own_conn:
         conn.close()
 
 
+def schema_is_current(conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Return True if init_db() of this version already ran on the database."""
+    own = conn is None
+    if conn is None:
+        conn = get_connection()
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    finally:
+        if own:
+            conn.close()
+
+
 def add_sample_data(conn: sqlite3.Connection) -> None:
     """Insert a few example users and drinks if tables are empty."""
     cur = conn.execute('SELECT COUNT(*) FROM users')
@@ -6,6 +6,7 @@ import platform
 
 from .. import database
 from .. import models
+from .pixmap_cache import cache as pixmap_cache
 
 
 class AdminWindow(QtWidgets.QWidget):
@@ -126,10 +127,8 @@ class AdminWindow(QtWidgets.QWidget):
         dlg = QtWidgets.QDialog(self)
         dlg.setWindowTitle("Webinterface QR-Code")
         dlg.setWindowState(QtCore.Qt.WindowFullScreen)
-        pixmap = QtGui.QPixmap(str(path))
         screen_size = QtWidgets.QApplication.primaryScreen().availableSize()
-        scaled = pixmap.scaled(screen_size, QtCore.Qt.KeepAspectRatio,
-                               QtCore.Qt.SmoothTransformation)
+        scaled = pixmap_cache.pixmap(path, screen_size)
         label = QtWidgets.QLabel(alignment=QtCore.Qt.AlignCenter)
         label.setPixmap(scaled)
         layout = QtWidgets.QVBoxLayout(dlg)
@@ -0,0 +1,312 @@
+"""Headless benchmark of the register GUI.
+
+Runs :class:`MainWindow` on Qt's offscreen platform against a generated
+database with the simulated card reader and LED backends, and prints the
+timings as JSON::
+
+    python -m src.gui.bench --purchases 50 --output bench.json
+
+With ``--rate`` (taps per hour) or ``--tap-script`` it additionally replays
+a festival scenario through the real booking path, ``--speed`` times faster
+than real time.
+
+The real ``data/`` directory is not touched.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+from PyQt5 import QtCore, QtWidgets
+
+from .. import database, led, models, rfid, tapscript
+from .main_window import MainWindow
+from .pixmap_cache import cache as pixmap_cache
+from .startup import StartupTimeline
+
+
+def populate(
+    conn,
+    users: int = 2000,
+    drinks: int = 16,
+    transactions: int = 10000,
+    seed: int = 1,
+) -> list[str]:
+    """Fill an initialised database with a festival-sized data set.
+
+    Returns the card UIDs of the generated users.
+    """
+    rng = random.Random(seed)
+    uids = [f"BENCH{n:06d}" for n in range(users)]
+    conn.executemany(
+        'INSERT INTO users (name, rfid_uid, balance) VALUES (?, ?, ?)',
+        [(f"Gast {n}", uid, 1_000_000) for n, uid in enumerate(uids)],
+    )
+    conn.executemany(
+        'INSERT INTO drinks (name, price, stock, min_stock, page) VALUES (?, ?, ?, ?, ?)',
+        [
+            (f"Getränk {n}", rng.choice((100, 150, 200, 250, 300)), 100_000, 10, n // 8 + 1)
+            for n in range(drinks)
+        ],
+    )
+    user_ids = [row[0] for row in conn.execute('SELECT id FROM users')]
+    drink_ids = [row[0] for row in conn.execute('SELECT id FROM drinks')]
+    # Local time in the format of models._now(), like real bookings.
+    now = datetime.now(models.LOCAL_TZ)
+    conn.executemany(
+        'INSERT INTO transactions (user_id, drink_id, quantity, timestamp) '
+        'VALUES (?, ?, ?, ?)',
+        [
+            (rng.choice(user_ids), rng.choice(drink_ids), rng.randint(1, 3),
+             (now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))).strftime("%Y-%m-%d %H:%M:%S"))
+            for _ in range(transactions)
+        ],
+    )
+    conn.commit()
+    return uids
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    """Milliseconds statistics of ``samples`` given in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {"n": 0}
+    return {
+        "n": len(ms),
+        "min": round(ms[0], 2),
+        "median": round(statistics.median(ms), 2),
+        "p95": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 2),
+        "max": round(ms[-1], 2),
+    }
+
+
+def _wait_until(app: QtWidgets.QApplication, done: Callable[[], bool], timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not done():
+        if time.monotonic() > deadline:
+            raise RuntimeError("Zeitüberschreitung im Benchmark")
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.0005)
+
+
+def _memory() -> dict[str, int]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    peak_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    result = {"peak_rss_kb": peak_kb, "pixmap_cache_kb": pixmap_cache.size_bytes // 1024}
+    try:
+        pages = int(Path('/proc/self/statm').read_text().split()[1])
+        result["rss_kb"] = pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return result
+
+
+def _close_dialogs(app: QtWidgets.QApplication, counter: list[int]) -> None:
+    """Dismiss modal error boxes, which would otherwise wait for a touch."""
+    widget = app.activeModalWidget()
+    if isinstance(widget, QtWidgets.QDialog):
+        counter[0] += 1
+        widget.done(0)
+
+
+def _replay(
+    app: QtWidgets.QApplication,
+    window: MainWindow,
+    reader: rfid.SimulatedReader,
+    taps: list[tapscript.Tap],
+    speed: float,
+    rng: random.Random,
+) -> dict:
+    """Play ``taps`` as customers buying one drink each through the GUI.
+
+    A customer arriving while the register is busy queues; ``wait_ms`` is
+    that queueing time, ``service_ms`` the time from choosing the payment
+    to the thank-you page (or the error, for refused cards).
+    """
+    drinks = list(window._drinks_by_id.values())
+    dialog = window.quantity_dialog
+    dialogs = [0]
+    closer = QtCore.QTimer()
+    closer.timeout.connect(lambda: _close_dialogs(app, dialogs))
+    closer.start(50)
+    waits, services = [], []
+    booked = refused = 0
+    started = time.monotonic()
+    for offset, uid in taps:
+        arrival = started + offset / speed
+        _wait_until(app, lambda: time.monotonic() >= arrival, timeout=offset / speed + 60)
+        waits.append(time.monotonic() - arrival)
+        drink = rng.choice(drinks)
+        dialog.bind(drink)
+        t0 = time.perf_counter()
+        window._settle([(drink, 1)], dialog)
+        reader.tap(uid)
+        _wait_until(app, lambda: not window.is_busy() and (
+            window.stack.currentWidget() is window.start_page
+            or "Danke" in window.info_label.text()
+        ))
+        services.append(time.perf_counter() - t0)
+        if "Danke" in window.info_label.text():
+            booked += 1
+        else:
+            refused += 1
+        window.show_start_page()
+        _wait_until(app, lambda: reader.current_uid is None)
+    closer.stop()
+    elapsed = time.monotonic() - started
+    return {
+        "taps": len(taps),
+        "booked": booked,
+        "refused": refused,
+        "dialogs_closed": dialogs[0],
+        "speed": speed,
+        "simulated_s": round(taps[-1][0], 1) if taps else 0,
+        "wall_s": round(elapsed, 2),
+        "wait_ms": _summary(waits),
+        "service_ms": _summary(services),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    started = time.perf_counter()
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        database.DB_PATH = tmp_path / 'bench.db'
+        database.REFRESH_FLAG = tmp_path / 'refresh.flag'
+        database.EXIT_FLAG = tmp_path / 'exit.flag'
+        conn = database.get_connection()
+        database.init_db(conn)
+        # Tic Tac Toe offers would only lengthen the thank-you screen.
+        models.set_game_enabled(False, conn)
+        uids = populate(conn, args.users, args.drinks, args.transactions, args.seed)
+        conn.close()
+
+        leds = led.SimulatedLed()
+        led.set_controller(leds)
+        reader = rfid.SimulatedReader(poll_interval=args.poll_ms / 1000, debounce=0.0)
+        reader.start()
+        timeline = StartupTimeline(time.perf_counter())
+        window = MainWindow(timeline=timeline, reader=reader)
+        window.show()
+        _wait_until(app, lambda: any(label == "Interaktiv" for label, _ in timeline.marks))
+        startup = {label: round(elapsed * 1000, 2) for label, elapsed in timeline.marks}
+        memory_after_start = _memory()
+
+        flips = []
+        for _ in range(args.flips):
+            flip = window.next_page if window.current_page < window.page_count else window.prev_page
+            t0 = time.perf_counter()
+            flip()
+            app.processEvents()
+            flips.append(time.perf_counter() - t0)
+
+        rebuilds = []
+        for _ in range(args.rebuilds):
+            # A sale elsewhere changes every stock figure, so every tile is refreshed.
+            with database.get_connection() as conn:
+                conn.execute('UPDATE drinks SET stock = stock - 1')
+            conn.close()
+            t0 = time.perf_counter()
+            window._sync_start_page()
+            app.processEvents()
+            rebuilds.append(time.perf_counter() - t0)
+
+        rng = random.Random(args.seed)
+        drinks = list(window._drinks_by_id.values())
+        dialog = window.quantity_dialog
+        purchases = []
+        for _ in range(args.purchases):
+            drink = rng.choice(drinks)
+            dialog.bind(drink)
+            t0 = time.perf_counter()
+            window._settle([(drink, 1)], dialog)
+            reader.tap(rng.choice(uids))
+            _wait_until(app, lambda: not window.is_busy() and "Danke" in window.info_label.text())
+            purchases.append(time.perf_counter() - t0)
+            window.show_start_page()
+            _wait_until(app, lambda: reader.current_uid is None)
+
+        replay = None
+        if args.tap_script or args.rate:
+            if args.tap_script:
+                taps = tapscript.load(args.tap_script)
+            else:
+                taps = tapscript.scenario(uids, args.rate, args.duration, args.cards, args.seed)
+            replay = _replay(app, window, reader, taps, args.speed, rng)
+
+        window.db.stop()
+        reader.stop()
+        window.close()
+        app.processEvents()
+
+    return {
+        "platform": {
+            "python": platform.python_version(),
+            "qt": QtCore.QT_VERSION_STR,
+            "machine": platform.machine(),
+            "qpa": os.environ.get('QT_QPA_PLATFORM', ''),
+        },
+        "dataset": {
+            "users": args.users,
+            "drinks": args.drinks,
+            "transactions": args.transactions,
+        },
+        "startup_ms": startup,
+        "page_flip_ms": _summary(flips),
+        "tile_rebuild_ms": _summary(rebuilds),
+        "purchase_ms": _summary(purchases),
+        "replay": replay,
+        "led_commands": dict(leds.counts),
+        "led": led.stats(),
+        "memory": {"after_start": memory_after_start, "end": _memory()},
+        "total_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark der Getränkekassen-GUI")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--drinks', type=int, default=16)
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--flips', type=int, default=50)
+    parser.add_argument('--rebuilds', type=int, default=20)
+    parser.add_argument('--purchases', type=int, default=30)
+    parser.add_argument('--poll-ms', type=int, default=int(rfid.POLL_INTERVAL * 1000),
+                        help='Abfrageintervall des simulierten Lesers')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='Lasttest: Karten pro Stunde (0 = aus)')
+    parser.add_argument('--duration', type=float, default=3600,
+                        help='Lasttest: simulierte Dauer in Sekunden')
+    parser.add_argument('--speed', type=float, default=60,
+                        help='Lasttest: Zeitraffer-Faktor')
+    parser.add_argument('--cards',
+                        help='Lasttest: Kartenverteilung "UID1=5,UID2=1" statt der erzeugten Gäste')
+    parser.add_argument('--tap-script', help='Lasttest: Tap-Skript statt --rate abspielen')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='JSON zusätzlich in diese Datei schreiben')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    result = run(args)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
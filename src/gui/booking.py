@@ -0,0 +1,237 @@
+"""Booking steps of the register, run on the GUI's database thread.
+
+Each function bundles the model calls of one user action, so the window
+submits a single job per tap and gets one result object back.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Optional
+import threading
+import time
+
+from .. import database
+from .. import models
+
+# Reasons a booking was refused; the window picks the message to show.
+UNKNOWN_CARD = 'unknown_card'
+UNKNOWN_USER = 'unknown_user'
+LIMIT = 'limit'
+FAILED = 'failed'
+
+
+Items = list[tuple[int, int]]
+
+# Seconds a card session outlives its last use; covers purchase, game and
+# balance check of one visit at the register.
+SESSION_TTL = 30.0
+
+
+@dataclass
+class BookingResult:
+    ok: bool
+    user: Optional[models.User] = None
+    old_balance: int = 0
+    reason: str = ''
+    total: int = 0
+
+
+class SessionCache:
+    """Users of recently tapped cards, updated from the booking results.
+
+    The bookings themselves re-check validity and overdraft inside their
+    transaction and return the new balance, so a cached user only saves the
+    lookups around them. Changes from the web admin clear the cache via the
+    refresh flag; the register's own bookings touch the flag as well, so
+    their mtime is remembered and does not count as an outside change.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL) -> None:
+        self.ttl = ttl
+        self._users: dict[int, tuple[models.User, float]] = {}
+        self._cards: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flag_mtime = 0.0
+
+    def _get(self, user_id: Optional[int]) -> Optional[models.User]:
+        entry = self._users.get(user_id) if user_id is not None else None
+        if entry is None:
+            return None
+        user, expires = entry
+        now = time.monotonic()
+        if now > expires:
+            self._users.pop(user_id, None)
+            return None
+        self._users[user_id] = (user, now + self.ttl)
+        return user
+
+    def remember(self, user: models.User) -> models.User:
+        with self._lock:
+            self._users[user.id] = (user, time.monotonic() + self.ttl)
+            if user.rfid_uid:
+                self._cards[user.rfid_uid] = user.id
+        return user
+
+    def by_card(self, uid: str) -> Optional[models.User]:
+        with self._lock:
+            user = self._get(self._cards.get(uid))
+        if user is None:
+            user = models.get_user_by_uid(uid)
+            if user is not None:
+                self.remember(user)
+        return user
+
+    def by_id(self, user_id: int) -> Optional[models.User]:
+        with self._lock:
+            user = self._get(user_id)
+        if user is None:
+            user = models.get_user(user_id)
+            if user is not None:
+                self.remember(user)
+        return user
+
+    def set_balance(self, user: models.User, balance: int) -> models.User:
+        return self.remember(replace(user, balance=balance))
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._cards.clear()
+            self._flag_mtime = database.refresh_mtime()
+
+    def own_change(self, before: float) -> None:
+        """Accept the refresh flag as touched by a booking of this register.
+
+        ``before`` is the flag's mtime read before the booking. If it had
+        already changed since the last check, that outside change must
+        still clear the cache, so nothing is recorded then.
+        """
+        with self._lock:
+            if before == self._flag_mtime:
+                self._flag_mtime = database.refresh_mtime()
+
+    def check_flag(self) -> bool:
+        """Clear the cache if the refresh flag changed outside the register."""
+        with self._lock:
+            if database.refresh_mtime() == self._flag_mtime:
+                return False
+        self.clear()
+        return True
+
+
+sessions = SessionCache()
+
+
+def charge_user(user_id: int, items: Items, free: bool = False) -> BookingResult:
+    """Book ``(drink_id, quantity)`` items for a user in one transaction."""
+    if not any(quantity > 0 for _, quantity in items):
+        return BookingResult(False, reason=FAILED)
+    user = sessions.by_id(user_id)
+    if user is None:
+        return BookingResult(False, reason=UNKNOWN_USER)
+    before = database.refresh_mtime()
+    booked = models.book_basket(user.id, items, free=free)
+    sessions.own_change(before)
+    if booked is None:
+        # Refused: the next attempt should see the current state.
+        sessions.forget(user.id)
+        if not all(models.get_drink_by_id(drink_id) for drink_id, _ in items):
+            return BookingResult(False, user, user.balance, FAILED)
+        return BookingResult(False, user, user.balance, LIMIT)
+    total, balance = booked
+    return BookingResult(True, sessions.set_balance(user, balance), balance + total, total=total)
+
+
+def charge_card(uid: str, items: Items, free: bool = False) -> BookingResult:
+    """Like :func:`charge_user` for the owner of card ``uid``."""
+    user = sessions.by_card(uid)
+    if user is None:
+        return BookingResult(False, reason=UNKNOWN_CARD)
+    return charge_user(user.id, items, free)
+
+
+def sell_cash(items: Items) -> BookingResult:
+    """Book a cash sale on the BARZAHLUNG user."""
+    before = database.refresh_mtime()
+    booked = models.book_basket(models.get_cash_user_id(), items, charge=False)
+    sessions.own_change(before)
+    if booked is None:
+        return BookingResult(False, reason=FAILED)
+    return BookingResult(True, total=booked[0])
+
+
+def topup_card(uid: str, amount: int) -> BookingResult:
+    """Credit ``amount`` cents to the owner of card ``uid``."""
+    user = sessions.by_card(uid)
+    if user is None:
+        return BookingResult(False, reason=UNKNOWN_CARD)
+    balance = models.change_balance(user.id, amount)
+    if balance is None:
+        sessions.forget(user.id)
+        return BookingResult(False, user, user.balance, FAILED)
+    models.add_topup(user.id, amount)
+    return BookingResult(True, sessions.set_balance(user, balance), balance - amount)
+
+
+def check_card(uid: str) -> BookingResult:
+    """Look up the owner of card ``uid`` for the balance display.
+
+    Always reads the database, since top-ups in the web admin do not pass
+    through the session cache; the fresh user then serves the next steps.
+    """
+    user = models.get_user_by_uid(uid)
+    if user is None:
+        return BookingResult(False, reason=UNKNOWN_CARD)
+    return BookingResult(True, sessions.remember(user), user.balance)
+
+
+def settle_game(user_id: int, result: str, total_price: int) -> BookingResult:
+    """Refund (win) or charge again (lose) the price of a purchase."""
+    user = sessions.by_id(user_id)
+    if user is None:
+        return BookingResult(False, reason=UNKNOWN_USER)
+    diff = {'win': total_price, 'lose': -total_price}.get(result)
+    if diff is None:
+        return BookingResult(True, user, user.balance)
+    balance = models.change_balance(user_id, diff)
+    if balance is None:
+        sessions.forget(user_id)
+        return BookingResult(False, user, user.balance, LIMIT)
+    return BookingResult(True, sessions.set_balance(user, balance), balance - diff)
+
+
+def pin_role(pin: str) -> Optional[str]:
+    """Return the admin role unlocked by ``pin``, or ``None``."""
+    if pin == models.get_admin_pin():
+        return 'admin'
+    if pin == models.get_buyer_pin():
+        return 'buyer'
+    return None
+
+
+def book_restock(quantities: dict[int, int]) -> int:
+    """Add purchased quantities to the stock and return the number of bottles."""
+    booked = 0
+    for drink_id, qty in quantities.items():
+        if qty > 0:
+            models.update_drink_stock(drink_id, qty)
+            models.log_restock(drink_id, qty)
+            booked += qty
+    return booked
+
+
+def status_counts() -> dict[str, int]:
+    """Return the row counts shown in the status dialog."""
+    conn = database.get_connection()
+    try:
+        return {
+            table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in ('users', 'drinks', 'transactions')
+        }
+    finally:
+        conn.close()
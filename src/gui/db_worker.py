@@ -0,0 +1,95 @@
+"""Database thread of the register GUI."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+import itertools
+import queue
+import threading
+import traceback
+
+from PyQt5 import QtCore
+
+Callback = Callable[[Any], None]
+
+
+class DbWorker(QtCore.QObject):
+    """Runs submitted jobs on one background thread, strictly in order.
+
+    A single thread keeps SQLite writes serialized, so bookings never race
+    each other. Results travel back through ``finished``/``failed``, which
+    Qt delivers as queued signals in the GUI thread, where the callbacks
+    given to :meth:`submit` are invoked.
+    """
+
+    finished = QtCore.pyqtSignal(int, object)
+    failed = QtCore.pyqtSignal(int, str)
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._jobs: queue.Queue = queue.Queue()
+        self._callbacks: dict[int, tuple[Optional[Callback], Optional[Callback]]] = {}
+        self._background: set[int] = set()
+        self._ids = itertools.count(1)
+        self.finished.connect(self._on_finished)
+        self.failed.connect(self._on_failed)
+        self._thread = threading.Thread(target=self._run, name='gui-db', daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callback] = None,
+        on_error: Optional[Callback] = None,
+        background: bool = False,
+    ) -> int:
+        """Queue ``fn(*args)`` and return the job id.
+
+        ``on_done`` receives the return value, ``on_error`` the error text;
+        both run in the GUI thread. ``background`` jobs (cache refreshes,
+        maintenance) do not count as :attr:`pending`.
+        """
+        job_id = next(self._ids)
+        self._callbacks[job_id] = (on_done, on_error)
+        if background:
+            self._background.add(job_id)
+        self._jobs.put((job_id, fn, args))
+        return job_id
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running jobs the user is waiting for."""
+        return len(self._callbacks) - len(self._background)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Finish the queued jobs and end the thread."""
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            job_id, fn, args = job
+            try:
+                result = fn(*args)
+            except Exception as e:
+                traceback.print_exc()
+                self.failed.emit(job_id, str(e))
+            else:
+                self.finished.emit(job_id, result)
+
+    def _on_finished(self, job_id: int, result: object) -> None:
+        on_done, _ = self._callbacks.pop(job_id, (None, None))
+        self._background.discard(job_id)
+        if on_done is not None:
+            on_done(result)
+
+    def _on_failed(self, job_id: int, error: str) -> None:
+        _, on_error = self._callbacks.pop(job_id, (None, None))
+        self._background.discard(job_id)
+        print(f"Fehler im Datenbank-Thread: {error}")
+        if on_error is not None:
+            on_error(error)
@@ -1,36 +1,167 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 import platform
 import random
-from typing import Any
+from typing import Any, Callable
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 from .. import database
+from .. import images
 from .. import models
 from .. import rfid
 from .. import led
+from . import booking
+from .db_worker import DbWorker
+from .pixmap_cache import COVER, FIT, cache as pixmap_cache
+from .startup import StartupTimeline
+
+
+@lru_cache(maxsize=2)
+def _quantity_dialog_style(compact: bool) -> str:
+    """Stylesheet of :class:`QuantityDialog`, formatted once per layout size."""
+    style = {
+        "title_font": "24px" if compact else "32px",
+        "info_font": "13px" if compact else "16px",
+        "frame_padding": "16px" if compact else "28px",
+        "quantity_font": "34px" if compact else "48px",
+        "quantity_btn_radius": "28px" if compact else "44px",
+        "quantity_btn_size": "96px" if compact else "160px",
+        "quantity_btn_font": "30px" if compact else "42px",
+        "payment_font": "15px" if compact else "20px",
+        "payment_padding": "10px" if compact else "20px",
+        "payment_radius": "14px" if compact else "20px",
+        "payment_height": "64px" if compact else "110px",
+        "action_font": "13px" if compact else "18px",
+        "action_padding": "10px" if compact else "20px",
+        "action_height": "46px" if compact else "70px",
+        "cancel_font": "15px" if compact else "20px",
+        "cancel_height": "52px" if compact else "90px",
+        "cancel_width": "180px" if compact else "280px",
+        "payment_title_font": "18px" if compact else "24px",
+        "payment_container_padding": "12px" if compact else "26px",
+    }
+    return f"""
+        #quantity_dialog {{
+            background-color: #f4f6fb;
+        }}
+        #quantity_dialog QLabel#title_label {{
+            font-size: {style['title_font']};
+            font-weight: 700;
+            color: #0f172a;
+        }}
+        #quantity_dialog QLabel#info_label {{
+            font-size: {style['info_font']};
+            color: #475569;
+        }}
+        #quantity_dialog QFrame#quantity_content {{
+            background-color: transparent;
+        }}
+        #quantity_dialog QFrame#quantity_frame {{
+            background-color: #ffffff;
+            border-radius: 24px;
+            padding: {style['frame_padding']};
+            border: 2px solid #e2e8f0;
+        }}
+        #quantity_dialog QLabel#quantity_value {{
+            font-size: {style['quantity_font']};
+            font-weight: 700;
+            color: #0f172a;
+        }}
+        #quantity_dialog QLabel#payment_title {{
+            font-size: {style['payment_title_font']};
+            font-weight: 700;
+            color: #0f172a;
+        }}
+        #quantity_dialog QFrame#payment_frame {{
+            background-color: #ffffff;
+            border-radius: 24px;
+            padding: {style['payment_container_padding']};
+            border: 2px solid #e2e8f0;
+        }}
+        #quantity_dialog QPushButton[btnClass="quantity"] {{
+            border-radius: {style['quantity_btn_radius']};
+            background-color: #1f2937;
+            color: #ffffff;
+            font-size: {style['quantity_btn_font']};
+            min-width: {style['quantity_btn_size']};
+            min-height: {style['quantity_btn_size']};
+            font-weight: 700;
+        }}
+        #quantity_dialog QPushButton[btnClass="payment"] {{
+            border-radius: {style['payment_radius']};
+            background-color: #2563eb;
+            color: #ffffff;
+            font-size: {style['payment_font']};
+            font-weight: 600;
+            min-height: {style['payment_height']};
+            padding: {style['payment_padding']};
+            text-align: center;
+            qproperty-wordWrap: true;
+        }}
+        #quantity_dialog QPushButton[btnClass="payment"][variant="cash"] {{
+            background-color: #f97316;
+        }}
+        #quantity_dialog QPushButton[btnClass="payment"][variant="event"] {{
+            background-color: #0ea5e9;
+        }}
+        #quantity_dialog QPushButton[btnClass="payment"]:hover {{
+            background-color: #1d4ed8;
+        }}
+        #quantity_dialog QPushButton[btnClass="action"] {{
+            border-radius: 16px;
+            background-color: #e2e8f0;
+            color: #1f2937;
+            font-size: {style['action_font']};
+            font-weight: 600;
+            min-height: {style['action_height']};
+            padding: {style['action_padding']};
+        }}
+        #quantity_dialog QPushButton[btnClass="action"]:hover {{
+            background-color: #cbd5f5;
+        }}
+        #quantity_dialog QPushButton[btnClass="action"][variant="cancel"] {{
+            background-color: #ef4444;
+            color: #ffffff;
+            font-size: {style['cancel_font']};
+            min-height: {style['cancel_height']};
+            min-width: {style['cancel_width']};
+            font-weight: 600;
+        }}
+        #quantity_dialog QPushButton[btnClass="action"][variant="cancel"]:hover {{
+            background-color: #dc2626;
+        }}
+        #quantity_dialog QFrame#quantity_footer {{
+            background-color: rgba(15, 23, 42, 0.12);
+            border-top: 2px solid rgba(148, 163, 184, 0.45);
+        }}
+    """
 
 
 class QuantityDialog(QtWidgets.QDialog):
 
-    """Dialog zum Wählen der Menge über +/--Buttons."""
+    """Dialog zum Wählen der Menge über +/--Buttons.
 
+    Die MainWindow hält eine Instanz und bindet sie per :meth:`bind` an das
+    gewählte Getränk; Widgets und Stylesheet werden nur einmal aufgebaut.
+    """
 
-    def __init__(
-        self,
-        drink: models.Drink,
-        parent: QtWidgets.QWidget | None = None,
-        *,
-        free_mode: bool = False,
-    ):
+    COLUMNS = 3
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None):
         super().__init__(parent)
-        self.drink = drink
-        self._free_mode = free_mode
+        self.drink: models.Drink | None = None
+        self._free_mode = False
         self.setWindowTitle("Menge wählen")
         self.setWindowFlag(QtCore.Qt.FramelessWindowHint)
         self.setWindowState(QtCore.Qt.WindowFullScreen)
         self.quantity = 1
+        self._cash = False
+        self._to_basket = False
+        self._event_user_id: int | None = None
+        self._event_key: list[tuple[int, str, int]] | None = None
+        self._event_buttons: list[QtWidgets.QPushButton] = []
 
         screen = QtWidgets.QApplication.primaryScreen()
         screen_size = screen.size() if screen else QtCore.QSize()
@@ -42,6 +173,11 @@ class QuantityDialog(QtWidgets.QDialog):
         outer_layout.setContentsMargins(0, 0, 0, 0)
         outer_layout.setSpacing(0)
 
+        # Drink image in the top right corner, below all other widgets.
+        self.image_label = QtWidgets.QLabel(self)
+        self.image_label.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.image_label.hide()
+
         content = QtWidgets.QFrame()
         content.setObjectName("quantity_content")
         layout = QtWidgets.QVBoxLayout(content)
@@ -55,156 +191,25 @@ class QuantityDialog(QtWidgets.QDialog):
         outer_layout.addWidget(content, 1)
 
         self.setObjectName("quantity_dialog")
+        self.setStyleSheet(_quantity_dialog_style(self._compact_layout))
 
-        style = {
-            "title_font": "24px" if self._compact_layout else "32px",
-            "info_font": "13px" if self._compact_layout else "16px",
-            "frame_padding": "16px" if self._compact_layout else "28px",
-            "quantity_font": "34px" if self._compact_layout else "48px",
-            "quantity_btn_radius": "28px" if self._compact_layout else "44px",
-            "quantity_btn_size": "96px" if self._compact_layout else "160px",
-            "quantity_btn_font": "30px" if self._compact_layout else "42px",
-            "payment_font": "15px" if self._compact_layout else "20px",
-            "payment_padding": "10px" if self._compact_layout else "20px",
-            "payment_radius": "14px" if self._compact_layout else "20px",
-            "payment_height": "64px" if self._compact_layout else "110px",
-            "action_font": "13px" if self._compact_layout else "18px",
-            "action_padding": "10px" if self._compact_layout else "20px",
-            "action_height": "46px" if self._compact_layout else "70px",
-            "cancel_font": "15px" if self._compact_layout else "20px",
-            "cancel_height": "52px" if self._compact_layout else "90px",
-            "cancel_width": "180px" if self._compact_layout else "280px",
-            "payment_title_font": "18px" if self._compact_layout else "24px",
-            "payment_container_padding": "12px" if self._compact_layout else "26px",
-        }
-
-        base_style = f"""
-            #quantity_dialog {{
-                background-color: #f4f6fb;
-            }}
-            #quantity_dialog QLabel#title_label {{
-                font-size: {style['title_font']};
-                font-weight: 700;
-                color: #0f172a;
-            }}
-            #quantity_dialog QLabel#info_label {{
-                font-size: {style['info_font']};
-                color: #475569;
-            }}
-            #quantity_dialog QFrame#quantity_content {{
-                background-color: transparent;
-            }}
-            #quantity_dialog QFrame#quantity_frame {{
-                background-color: #ffffff;
-                border-radius: 24px;
-                padding: {style['frame_padding']};
-                border: 2px solid #e2e8f0;
-            }}
-            #quantity_dialog QLabel#quantity_value {{
-                font-size: {style['quantity_font']};
-                font-weight: 700;
-                color: #0f172a;
-            }}
-            #quantity_dialog QLabel#payment_title {{
-                font-size: {style['payment_title_font']};
-                font-weight: 700;
-                color: #0f172a;
-            }}
-            #quantity_dialog QFrame#payment_frame {{
-                background-color: #ffffff;
-                border-radius: 24px;
-                padding: {style['payment_container_padding']};
-                border: 2px solid #e2e8f0;
-            }}
-            #quantity_dialog QPushButton[btnClass="quantity"] {{
-                border-radius: {style['quantity_btn_radius']};
-                background-color: #1f2937;
-                color: #ffffff;
-                font-size: {style['quantity_btn_font']};
-                min-width: {style['quantity_btn_size']};
-                min-height: {style['quantity_btn_size']};
-                font-weight: 700;
-            }}
-            #quantity_dialog QPushButton[btnClass="payment"] {{
-                border-radius: {style['payment_radius']};
-                background-color: #2563eb;
-                color: #ffffff;
-                font-size: {style['payment_font']};
-                font-weight: 600;
-                min-height: {style['payment_height']};
-                padding: {style['payment_padding']};
-                text-align: center;
-                qproperty-wordWrap: true;
-            }}
-            #quantity_dialog QPushButton[btnClass="payment"][variant="cash"] {{
-                background-color: #f97316;
-            }}
-            #quantity_dialog QPushButton[btnClass="payment"][variant="event"] {{
-                background-color: #0ea5e9;
-            }}
-            #quantity_dialog QPushButton[btnClass="payment"]:hover {{
-                background-color: #1d4ed8;
-            }}
-            #quantity_dialog QPushButton[btnClass="action"] {{
-                border-radius: 16px;
-                background-color: #e2e8f0;
-                color: #1f2937;
-                font-size: {style['action_font']};
-                font-weight: 600;
-                min-height: {style['action_height']};
-                padding: {style['action_padding']};
-            }}
-            #quantity_dialog QPushButton[btnClass="action"]:hover {{
-                background-color: #cbd5f5;
-            }}
-            #quantity_dialog QPushButton[btnClass="action"][variant="cancel"] {{
-                background-color: #ef4444;
-                color: #ffffff;
-                font-size: {style['cancel_font']};
-                min-height: {style['cancel_height']};
-                min-width: {style['cancel_width']};
-                font-weight: 600;
-            }}
-            #quantity_dialog QPushButton[btnClass="action"][variant="cancel"]:hover {{
-                background-color: #dc2626;
-            }}
-            #quantity_dialog QFrame#quantity_footer {{
-                background-color: rgba(15, 23, 42, 0.12);
-                border-top: 2px solid rgba(148, 163, 184, 0.45);
-            }}
-        """
-        self.setStyleSheet(base_style)
-
-        pixmap = QtGui.QPixmap(drink.image) if drink.image else QtGui.QPixmap()
-        if not pixmap.isNull():
-            image_path = Path(drink.image).as_posix()
-            style = (
-                f"#quantity_dialog{{"
-                f"background-image: url('{image_path}');"
-                "background-repeat: no-repeat;"
-                "background-position: top right;"
-                "background-origin: content;"
-                "}}"
-            )
-            existing_style = self.styleSheet()
-            self.setStyleSheet(f"{existing_style}\n{style}" if existing_style else style)
-
-        self.product_label = QtWidgets.QLabel(drink.name)
+        self.product_label = QtWidgets.QLabel()
         self.product_label.setObjectName("title_label")
         self.product_label.setAlignment(QtCore.Qt.AlignCenter)
         self.product_label.setWordWrap(True)
         layout.addWidget(self.product_label)
 
-        info_message = (
-            "Bitte Menge wählen und danach kostenlos buchen."
-            if self._free_mode
-            else "Bitte Menge wählen und danach eine Zahlungsart antippen."
-        )
-        info_label = QtWidgets.QLabel(info_message)
-        info_label.setObjectName("info_label")
-        info_label.setAlignment(QtCore.Qt.AlignCenter)
-        info_label.setWordWrap(True)
-        layout.addWidget(info_label)
+        self.basket_label = QtWidgets.QLabel()
+        self.basket_label.setObjectName("payment_title")
+        self.basket_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.basket_label.setWordWrap(True)
+        layout.addWidget(self.basket_label)
+
+        self.info_label = QtWidgets.QLabel()
+        self.info_label.setObjectName("info_label")
+        self.info_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.info_label.setWordWrap(True)
+        layout.addWidget(self.info_label)
 
         quantity_row = QtWidgets.QHBoxLayout()
         quantity_row.setSpacing(14 if self._compact_layout else 28)
@@ -221,6 +226,7 @@ class QuantityDialog(QtWidgets.QDialog):
             )
 
         qty_frame = QtWidgets.QFrame()
+        self._qty_frame = qty_frame
         qty_frame.setObjectName("quantity_frame")
         qty_frame.setSizePolicy(
             QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding
@@ -244,146 +250,36 @@ class QuantityDialog(QtWidgets.QDialog):
         self.minus_btn.clicked.connect(self.dec)
         self.plus_btn.clicked.connect(self.inc)
 
-        if not self._free_mode:
-            payment_title = QtWidgets.QLabel("Zahlungsart wählen")
-            payment_title.setObjectName("payment_title")
-            payment_title.setAlignment(QtCore.Qt.AlignLeft)
-            layout.addWidget(payment_title)
-
-        if not self._free_mode:
-            payment_frame = QtWidgets.QFrame()
-            payment_frame.setObjectName("payment_frame")
-            payment_frame.setSizePolicy(
-                QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding
-            )
-            payment_layout = QtWidgets.QGridLayout(payment_frame)
-            if self._compact_layout:
-                payment_layout.setContentsMargins(4, 4, 4, 4)
-                payment_layout.setHorizontalSpacing(10)
-                payment_layout.setVerticalSpacing(10)
-            else:
-                payment_layout.setContentsMargins(12, 12, 12, 12)
-                payment_layout.setHorizontalSpacing(22)
-                payment_layout.setVerticalSpacing(22)
-
-        self._event_user_id: int | None = None
-        if not self._free_mode:
-            self.cash_btn = QtWidgets.QPushButton("Barzahlung")
-            self.cash_btn.setProperty("btnClass", "payment")
-            self.cash_btn.setProperty("variant", "cash")
-            self.cash_btn.setMinimumSize(
-                160 if self._compact_layout else 220,
-                66 if self._compact_layout else 110,
-            )
-            self.cash_btn.setSizePolicy(
-                QtWidgets.QSizePolicy.Expanding,
-                QtWidgets.QSizePolicy.Expanding,
-            )
-            self.cash_btn.clicked.connect(self.cash)
-            self.chip_btn = QtWidgets.QPushButton("Chip / Karte")
-            self.chip_btn.setProperty("btnClass", "payment")
-            self.chip_btn.setProperty("variant", "chip")
-            self.chip_btn.setMinimumSize(
-                160 if self._compact_layout else 220,
-                66 if self._compact_layout else 110,
-            )
-            self.chip_btn.setSizePolicy(
-                QtWidgets.QSizePolicy.Expanding,
-                QtWidgets.QSizePolicy.Expanding,
-            )
-            self.chip_btn.clicked.connect(self.accept)
-
-            payment_buttons: list[QtWidgets.QWidget] = [self.cash_btn, self.chip_btn]
-
-            event_users = models.get_event_payment_users()
-            for user in event_users:
-                btn = QtWidgets.QPushButton(
-                    f"{user.name}\n{user.balance / 100:.2f} €"
-                )
-                btn.setProperty("btnClass", "payment")
-                btn.setProperty("variant", "event")
-                btn.setToolTip("Veranstaltungskarte direkt belasten")
-                btn.setMinimumSize(
-                    160 if self._compact_layout else 220,
-                    66 if self._compact_layout else 110,
-                )
-                btn.setSizePolicy(
-                    QtWidgets.QSizePolicy.Expanding,
-                    QtWidgets.QSizePolicy.Expanding,
-                )
-                btn.clicked.connect(lambda _, uid=user.id: self._select_event_user(uid))
-                payment_buttons.append(btn)
-
-            many_payment_options = len(payment_buttons) > 3
-            if many_payment_options:
-                quantity_size = 72 if self._compact_layout else 120
-            else:
-                quantity_size = 96 if self._compact_layout else 160
-            for btn in (self.minus_btn, self.plus_btn):
-                btn.setMinimumSize(quantity_size, quantity_size)
-                btn.setMaximumSize(quantity_size, quantity_size)
-
-            base_payment_height = 66 if self._compact_layout else 110
-            reduced_payment_height = 58 if self._compact_layout else 84
-            payment_button_height = (
-                reduced_payment_height if many_payment_options else base_payment_height
-            )
-            for btn in payment_buttons:
-                btn.setMinimumHeight(payment_button_height)
-                if many_payment_options:
-                    btn.setMaximumHeight(payment_button_height)
-                else:
-                    btn.setMaximumHeight(QtWidgets.QWIDGETSIZE_MAX)
+        self.payment_title = QtWidgets.QLabel("Zahlungsart wählen")
+        self.payment_title.setObjectName("payment_title")
+        self.payment_title.setAlignment(QtCore.Qt.AlignLeft)
+        layout.addWidget(self.payment_title)
 
-            if many_payment_options:
-                payment_layout.setHorizontalSpacing(
-                    10 if self._compact_layout else 18
-                )
-                payment_layout.setVerticalSpacing(
-                    12 if self._compact_layout else 16
-                )
-                payment_frame.setSizePolicy(
-                    QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Maximum
-                )
-
-            columns = 3
-            for index, btn in enumerate(payment_buttons):
-                row, col = divmod(index, columns)
-                payment_layout.addWidget(btn, row, col)
-                payment_layout.setColumnStretch(col, 1)
-
-            for col in range(columns):
-                if payment_layout.columnStretch(col) == 0:
-                    payment_layout.setColumnStretch(col, 1)
-
-            rows_used = (len(payment_buttons) + columns - 1) // columns
-            if many_payment_options:
-                margins = payment_layout.contentsMargins()
-                total_height = (
-                    rows_used * payment_button_height
-                    + max(0, rows_used - 1) * payment_layout.verticalSpacing()
-                    + margins.top()
-                    + margins.bottom()
-                )
-                payment_frame.setMaximumHeight(total_height)
+        self.payment_frame = QtWidgets.QFrame()
+        self.payment_frame.setObjectName("payment_frame")
+        self.payment_layout = QtWidgets.QGridLayout(self.payment_frame)
+        if self._compact_layout:
+            self.payment_layout.setContentsMargins(4, 4, 4, 4)
+        else:
+            self.payment_layout.setContentsMargins(12, 12, 12, 12)
 
-            if not event_users:
-                hint = QtWidgets.QLabel(
-                    "Keine Veranstaltungskarten für die Schnellzahlung aktiviert."
-                )
-                hint.setObjectName("info_label")
-                hint.setAlignment(QtCore.Qt.AlignCenter)
-                hint.setWordWrap(True)
-                payment_layout.addWidget(hint, rows_used, 0, 1, columns)
+        self.cash_btn = self._payment_button("Barzahlung", "cash")
+        self.cash_btn.clicked.connect(self.cash)
+        self.chip_btn = self._payment_button("Chip / Karte", "chip")
+        self.chip_btn.clicked.connect(self.accept)
 
-            layout.addWidget(payment_frame, stretch=0)
+        self.no_event_hint = QtWidgets.QLabel(
+            "Keine Veranstaltungskarten für die Schnellzahlung aktiviert."
+        )
+        self.no_event_hint.setObjectName("info_label")
+        self.no_event_hint.setAlignment(QtCore.Qt.AlignCenter)
+        self.no_event_hint.setWordWrap(True)
 
-            if many_payment_options:
-                layout.addSpacing(12)
-            else:
-                layout.addStretch(1)
-        else:
-            layout.addStretch(1)
+        layout.addWidget(self.payment_frame, stretch=0)
+        # Fixed gap below many payment buttons, otherwise a stretch.
+        self._payment_spacer = QtWidgets.QSpacerItem(0, 0)
+        layout.addItem(self._payment_spacer)
+        self._content_layout = layout
 
         self.cancel_btn = QtWidgets.QPushButton("Abbrechen")
         self.cancel_btn.setProperty("btnClass", "action")
@@ -408,20 +304,197 @@ class QuantityDialog(QtWidgets.QDialog):
             footer_layout.setContentsMargins(48, 18, 48, 36)
             footer_layout.setSpacing(24)
         footer_layout.addWidget(self.cancel_btn, 0, QtCore.Qt.AlignLeft)
-        if self._free_mode:
-            self.confirm_btn = QtWidgets.QPushButton("Gratis buchen")
-            self.confirm_btn.setProperty("btnClass", "action")
-            self.confirm_btn.setSizePolicy(
-                QtWidgets.QSizePolicy.Expanding,
-                QtWidgets.QSizePolicy.Fixed,
-            )
-            self.confirm_btn.clicked.connect(self.accept)
-            footer_layout.addWidget(self.confirm_btn, 0, QtCore.Qt.AlignLeft)
+        self.confirm_btn = QtWidgets.QPushButton("Gratis buchen")
+        self.confirm_btn.setProperty("btnClass", "action")
+        self.confirm_btn.setSizePolicy(
+            QtWidgets.QSizePolicy.Expanding,
+            QtWidgets.QSizePolicy.Fixed,
+        )
+        self.confirm_btn.clicked.connect(self.accept)
+        footer_layout.addWidget(self.confirm_btn, 0, QtCore.Qt.AlignLeft)
         footer_layout.addStretch(1)
+        self.basket_btn = QtWidgets.QPushButton("In den Warenkorb")
+        self.basket_btn.setProperty("btnClass", "action")
+        self.basket_btn.setSizePolicy(
+            QtWidgets.QSizePolicy.Expanding,
+            QtWidgets.QSizePolicy.Fixed,
+        )
+        self.basket_btn.clicked.connect(self.add_to_basket)
+        footer_layout.addWidget(self.basket_btn, 0, QtCore.Qt.AlignRight)
 
         outer_layout.addWidget(footer, 0)
 
+        self.set_event_users([])
+
+    def _payment_button(self, text: str, variant: str) -> QtWidgets.QPushButton:
+        btn = QtWidgets.QPushButton(text)
+        btn.setProperty("btnClass", "payment")
+        btn.setProperty("variant", variant)
+        btn.setMinimumSize(
+            160 if self._compact_layout else 220,
+            66 if self._compact_layout else 110,
+        )
+        btn.setSizePolicy(
+            QtWidgets.QSizePolicy.Expanding,
+            QtWidgets.QSizePolicy.Expanding,
+        )
+        return btn
+
+    def _reset(self, free_mode: bool, basket: str) -> None:
+        self._free_mode = free_mode
+        self.quantity = 1
         self._cash = False
+        self._to_basket = False
+        self._event_user_id = None
+        self.label.setText(f"{self.quantity} Stück")
+        self.basket_label.setText(f"Im Warenkorb: {basket}" if basket else "")
+        self.basket_label.setVisible(bool(basket))
+        self.payment_title.setVisible(not free_mode)
+        self.payment_frame.setVisible(not free_mode)
+        self.confirm_btn.setVisible(free_mode)
+        self._update_spacer()
+
+    def bind(self, drink: models.Drink, *, free_mode: bool = False, basket: str = "") -> None:
+        """Reset the dialog for ``drink``; call before every ``exec_()``.
+
+        ``basket`` summarises drinks already in the basket; they are paid
+        together with this one unless it is added to the basket as well.
+        """
+        self.drink = drink
+        self._reset(free_mode, basket)
+        self.product_label.setText(drink.name)
+        self.info_label.setText(
+            "Bitte Menge wählen und danach kostenlos buchen."
+            if free_mode
+            else "Bitte Menge wählen und danach eine Zahlungsart antippen."
+        )
+        for widget in (self.minus_btn, self._qty_frame, self.plus_btn, self.basket_btn):
+            widget.show()
+
+        pixmap = pixmap_cache.pixmap(images.variant_path(drink.image, 'dialog'))
+        if pixmap.isNull():
+            self.image_label.hide()
+        else:
+            self.image_label.setPixmap(pixmap)
+            self.image_label.resize(pixmap.size())
+            self._place_image()
+            self.image_label.lower()
+            self.image_label.show()
+
+    def bind_checkout(self, basket: str, *, free_mode: bool = False) -> None:
+        """Show only the payment choice for the drinks in the basket."""
+        self.drink = None
+        self._reset(free_mode, basket)
+        self.product_label.setText("Warenkorb bezahlen")
+        self.info_label.setText(
+            "Bitte kostenlos buchen." if free_mode else "Bitte eine Zahlungsart antippen."
+        )
+        for widget in (self.minus_btn, self._qty_frame, self.plus_btn, self.basket_btn):
+            widget.hide()
+        self.image_label.hide()
+
+    def set_event_users(self, users: list[models.User]) -> None:
+        """Show one payment button per event card; rebuilds only on changes."""
+        key = [(user.id, user.name, user.balance) for user in users]
+        if key == self._event_key:
+            return
+        if self._event_key is not None and [k[0] for k in key] == [k[0] for k in self._event_key]:
+            # Same cards, new balances: only the captions change.
+            for btn, user in zip(self._event_buttons, users):
+                btn.setText(f"{user.name}\n{user.balance / 100:.2f} €")
+            self._event_key = key
+            return
+        self._event_key = key
+
+        for btn in self._event_buttons:
+            self.payment_layout.removeWidget(btn)
+            btn.deleteLater()
+        self.payment_layout.removeWidget(self.no_event_hint)
+        self._event_buttons = []
+        for user in users:
+            btn = self._payment_button(f"{user.name}\n{user.balance / 100:.2f} €", "event")
+            btn.setToolTip("Veranstaltungskarte direkt belasten")
+            btn.clicked.connect(lambda _, uid=user.id: self._select_event_user(uid))
+            self._event_buttons.append(btn)
+        payment_buttons = [self.cash_btn, self.chip_btn, *self._event_buttons]
+
+        many_payment_options = len(payment_buttons) > 3
+        if many_payment_options:
+            quantity_size = 72 if self._compact_layout else 120
+        else:
+            quantity_size = 96 if self._compact_layout else 160
+        for btn in (self.minus_btn, self.plus_btn):
+            btn.setMinimumSize(quantity_size, quantity_size)
+            btn.setMaximumSize(quantity_size, quantity_size)
+
+        base_payment_height = 66 if self._compact_layout else 110
+        reduced_payment_height = 58 if self._compact_layout else 84
+        payment_button_height = (
+            reduced_payment_height if many_payment_options else base_payment_height
+        )
+        for btn in payment_buttons:
+            btn.setMinimumHeight(payment_button_height)
+            if many_payment_options:
+                btn.setMaximumHeight(payment_button_height)
+            else:
+                btn.setMaximumHeight(QtWidgets.QWIDGETSIZE_MAX)
+
+        if many_payment_options:
+            self.payment_layout.setHorizontalSpacing(10 if self._compact_layout else 18)
+            self.payment_layout.setVerticalSpacing(12 if self._compact_layout else 16)
+            self.payment_frame.setSizePolicy(
+                QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Maximum
+            )
+        else:
+            self.payment_layout.setHorizontalSpacing(10 if self._compact_layout else 22)
+            self.payment_layout.setVerticalSpacing(10 if self._compact_layout else 22)
+            self.payment_frame.setSizePolicy(
+                QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding
+            )
+
+        columns = self.COLUMNS
+        for index, btn in enumerate(payment_buttons):
+            row, col = divmod(index, columns)
+            self.payment_layout.addWidget(btn, row, col)
+        for col in range(columns):
+            self.payment_layout.setColumnStretch(col, 1)
+
+        rows_used = (len(payment_buttons) + columns - 1) // columns
+        if many_payment_options:
+            margins = self.payment_layout.contentsMargins()
+            total_height = (
+                rows_used * payment_button_height
+                + max(0, rows_used - 1) * self.payment_layout.verticalSpacing()
+                + margins.top()
+                + margins.bottom()
+            )
+            self.payment_frame.setMaximumHeight(total_height)
+        else:
+            self.payment_frame.setMaximumHeight(QtWidgets.QWIDGETSIZE_MAX)
+
+        if not users:
+            self.payment_layout.addWidget(self.no_event_hint, rows_used, 0, 1, columns)
+        self.no_event_hint.setVisible(not users)
+        self._many_payment_options = many_payment_options
+        self._update_spacer()
+
+    def _update_spacer(self) -> None:
+        if not self._free_mode and self._many_payment_options:
+            self._payment_spacer.changeSize(
+                0, 12, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed
+            )
+        else:
+            self._payment_spacer.changeSize(
+                0, 0, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding
+            )
+        self._content_layout.invalidate()
+
+    def _place_image(self) -> None:
+        self.image_label.move(self.width() - self.image_label.width(), 0)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._place_image()
 
     def showEvent(self, event: QtGui.QShowEvent) -> None:
         super().showEvent(event)
@@ -445,6 +518,10 @@ class QuantityDialog(QtWidgets.QDialog):
         self._cash = True
         self.accept()
 
+    def add_to_basket(self) -> None:
+        self._to_basket = True
+        self.accept()
+
     def _select_event_user(self, uid: int) -> None:
         """Store the selected event user's id and close the dialog."""
         self._event_user_id = uid
@@ -454,6 +531,10 @@ class QuantityDialog(QtWidgets.QDialog):
     def is_cash(self) -> bool:
         return self._cash
 
+    @property
+    def adds_to_basket(self) -> bool:
+        return self._to_basket
+
     @property
     def event_user_id(self) -> int | None:
         return self._event_user_id
@@ -976,18 +1057,29 @@ class PurchasedPage(QtWidgets.QWidget):
             spin.setValue(min(max(dlg.value, spin.minimum()), spin.maximum()))
 
     def book(self) -> None:
-        booked = 0
+        quantities: dict[int, int] = {}
         for row, drink_id in enumerate(self._drink_ids):
             cell = self.table.cellWidget(row, 2)
             spin = cell.findChild(QtWidgets.QSpinBox) if isinstance(cell, QtWidgets.QWidget) else None
             qty = spin.value() if isinstance(spin, QtWidgets.QSpinBox) else 0
             if qty > 0:
-                models.update_drink_stock(drink_id, qty)
-                models.log_restock(drink_id, qty)
-                booked += qty
-        if booked == 0:
+                quantities[drink_id] = qty
+        if not quantities:
             QtWidgets.QMessageBox.information(self, "Eingekauft", "Keine Menge eingegeben.")
             return
+        self.book_btn.setEnabled(False)
+        self._main.db.submit(
+            booking.book_restock, quantities,
+            on_done=self._booked, on_error=self._book_failed,
+        )
+
+    def _book_failed(self, _error: str) -> None:
+        self.book_btn.setEnabled(True)
+        led.indicate_error()
+        QtWidgets.QMessageBox.warning(self, "Fehler", "Einkauf konnte nicht gebucht werden.")
+
+    def _booked(self, _booked: int) -> None:
+        self.book_btn.setEnabled(True)
         led.indicate_success()
         QtWidgets.QMessageBox.information(self, "Eingekauft", "Einkauf wurde gebucht.")
         self._main.show_admin_menu()
@@ -1095,31 +1187,37 @@ class TopupPage(QtWidgets.QWidget):
         layout.addWidget(self.info)
 
     def start_topup(self, amount: int) -> None:
+        if self._main.is_busy():
+            return
         self.info.setText("Bitte Zielkarte auflegen…")
-        QtWidgets.QApplication.processEvents()
-        uid = rfid.read_uid(show_dialog=False)
+        self._main.await_card(lambda uid: self._card_read(uid, amount), message=None)
+
+    def _card_read(self, uid: str | None, amount: int) -> None:
         if not uid:
             QtWidgets.QMessageBox.warning(self, "Fehler", "Karte konnte nicht gelesen werden")
             self.info.setText("")
             return
-        user = models.get_user_by_uid(uid)
-        if not user:
-            led.indicate_error()
-            QtWidgets.QMessageBox.warning(self, "Fehler", "Unbekannte Karte")
-            self.info.setText("")
-            return
-        old_balance = user.balance
-        if not models.update_balance(user.id, amount * 100):
-            led.indicate_error()
-            QtWidgets.QMessageBox.warning(self, "Fehler", "Aufladen fehlgeschlagen")
-            self.info.setText("")
+        self.info.setText("Wird gebucht…")
+        self._main.db.submit(
+            booking.topup_card, uid, amount * 100,
+            on_done=self._topup_done, on_error=lambda _e: self._topup_failed("Aufladen fehlgeschlagen"),
+        )
+
+    def _topup_failed(self, message: str) -> None:
+        led.indicate_error()
+        QtWidgets.QMessageBox.warning(self, "Fehler", message)
+        self.info.setText("")
+
+    def _topup_done(self, result: booking.BookingResult) -> None:
+        if not result.ok:
+            self._topup_failed(
+                "Unbekannte Karte" if result.reason == booking.UNKNOWN_CARD else "Aufladen fehlgeschlagen"
+            )
             return
-        models.add_topup(user.id, amount * 100)
-        new_user = models.get_user_by_uid(uid)
         led.indicate_success()
         msg = (
-            f"Aufgeladen!\nAltes Guthaben: {old_balance/100:.2f} €\n"
-            f"Neues Guthaben: {new_user.balance/100:.2f} €"
+            f"Aufgeladen!\nAltes Guthaben: {result.old_balance/100:.2f} €\n"
+            f"Neues Guthaben: {result.user.balance/100:.2f} €"
         )
         self.info.setText(msg)
         QtCore.QTimer.singleShot(3000, self._main.show_admin_menu)
@@ -1212,14 +1310,38 @@ class EventCardPage(QtWidgets.QWidget):
             )
         conn.commit()
         conn.close()
+        self._main.refresh_event_users()
         self._main.show_admin_menu()
 
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    # Admin pages are built on first use, or one by one once the register
+    # has been idle for this long after startup.
+    ADMIN_PREBUILD_DELAY_MS = 5000
+    # An abandoned basket is emptied after two minutes without a new drink.
+    BASKET_TIMEOUT_MS = 120_000
+
+    def __init__(
+        self,
+        timeline: StartupTimeline | None = None,
+        reader: rfid.CardReader | None = None,
+    ):
         super().__init__()
-        database.init_db()
+        self._timeline = timeline or StartupTimeline()
+        self.db = DbWorker(self)
+        if database.schema_is_current():
+            # Known schema: the idempotent checks can run after the first frame.
+            self.db.submit(database.init_db, background=True)
+        else:
+            database.init_db()
         database.clear_exit_flag()
+        self._timeline.mark("Datenbank")
+        self.reader = reader or rfid.get_reader()
+        self.reader.card_present.connect(self._on_card_present)
+        self._card_callback: Callable[[str | None], None] | None = None
+        self._card_timer = QtCore.QTimer(self)
+        self._card_timer.setSingleShot(True)
+        self._card_timer.timeout.connect(self._on_card_timeout)
         self.setWindowTitle("Getränkekasse")
         self.setWindowState(self.windowState() | QtCore.Qt.WindowFullScreen)
         self.central = QtWidgets.QWidget()
@@ -1231,6 +1353,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self._compact_display = bool(
             screen and min(screen_size.width(), screen_size.height()) <= 600
         )
+        if screen:
+            # Uploaded backgrounds are pre-scaled to this size by the web admin.
+            self.db.submit(
+                database.set_setting, 'screen_size', f"{screen_size.width()}x{screen_size.height()}",
+                background=True,
+            )
 
         self._game_enabled: bool = True
         self._setup_styles()
@@ -1240,35 +1368,46 @@ class MainWindow(QtWidgets.QMainWindow):
         self._thank_bg = data_dir / 'background_thanks.png'
         self._free_bg = data_dir / 'background_free.png'
         self._free_day_enabled = models.is_free_day_enabled()
-        self._background_pixmap: QtGui.QPixmap | None = None
-        self._apply_start_background()
+        # Backgrounds pre-scaled to the window, one ready palette per file;
+        # page switches only swap the palette reference.
+        self._backgrounds: dict[Path, QtGui.QPalette | None] = {}
+        self._backgrounds_size = QtCore.QSize()
+        self._background_stamps: tuple = ()
+        self._background_path: Path | None = None
+        self._background_palette: QtGui.QPalette | None = None
 
         self.stack = QtWidgets.QStackedLayout(self.central)
         self._info_timer = QtCore.QTimer(self)
         self._info_timer.setSingleShot(True)
         self._info_timer.timeout.connect(self.show_start_page)
 
-        self.refresh_mtime = database.REFRESH_FLAG.stat().st_mtime if database.REFRESH_FLAG.exists() else 0.0
+        self.refresh_mtime = database.refresh_mtime()
+        booking.sessions.clear()
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self.check_refresh)
         self.timer.start(3000)
 
+        # Card reads requested from the web admin are executed here, since
+        # this process owns the reader.
+        self._web_read_active = False
+        self.rfid_job_timer = QtCore.QTimer(self)
+        self.rfid_job_timer.timeout.connect(self.check_rfid_jobs)
+        self.rfid_job_timer.start(500)
+
         self.start_page = QtWidgets.QWidget()
-        self.start_layout = QtWidgets.QGridLayout(self.start_page)
-        self.start_layout.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignHCenter)
+        self.start_layout = QtWidgets.QVBoxLayout(self.start_page)
         if self._compact_display:
             self.start_layout.setContentsMargins(14, 14, 14, 14)
-            self.start_layout.setHorizontalSpacing(12)
-            self.start_layout.setVerticalSpacing(12)
+            self.start_layout.setSpacing(12)
         else:
             self.start_layout.setContentsMargins(30, 30, 30, 30)
-            self.start_layout.setHorizontalSpacing(24)
-            self.start_layout.setVerticalSpacing(24)
+            self.start_layout.setSpacing(24)
         self.current_page = 1
         self.page_count = 1
         self._start_page_needs_refresh = False
-        self._populate_start_page()
-
+        self._build_start_page()
+        self._sync_start_page()
+        self._timeline.mark("Startseite")
 
         self.stack.addWidget(self.start_page)
 
@@ -1302,82 +1441,194 @@ class MainWindow(QtWidgets.QMainWindow):
         info_layout.addStretch()
         self.stack.addWidget(self.info_page)
 
-        self.admin_menu = AdminMenu(self)
-        self.admin_menu.stock_btn.clicked.connect(self.show_shopping_forecast)
-        self.admin_menu.purchased_btn.clicked.connect(self.show_purchased_page)
-        self.admin_menu.topup_btn.clicked.connect(self.show_topup_page)
-        self.admin_menu.event_cards_btn.clicked.connect(self.show_event_cards_page)
-        self.admin_menu.status_btn.clicked.connect(self.show_status)
-        self.admin_menu.web_btn.clicked.connect(self.show_web_qr)
-        self.admin_menu.quit_btn.clicked.connect(self._quit)
-        self.admin_menu.back_btn.clicked.connect(self.show_start_page)
-        self.stack.addWidget(self.admin_menu)
-
-        self.stock_page = StockPage(self)
-        self.stock_page.back_btn.clicked.connect(self.show_admin_menu)
-        self.stack.addWidget(self.stock_page)
-        self.purchased_page = PurchasedPage(self)
-        self.purchased_page.back_btn.clicked.connect(self.show_admin_menu)
-        self.stack.addWidget(self.purchased_page)
-
-        self.topup_page = TopupPage(self)
-        self.topup_page.back_btn.clicked.connect(self.show_admin_menu)
-        self.stack.addWidget(self.topup_page)
-
-        self.event_card_page = EventCardPage(self)
-        self.stack.addWidget(self.event_card_page)
+        self._admin_pages: dict[str, QtWidgets.QWidget] = {}
+        self._quantity_dialog: QuantityDialog | None = None
+        self._event_users: list[models.User] = []
+        self.refresh_event_users()
 
         self._pending_game: dict[str, Any] | None = None
         self._admin_role = "admin"
         self._sync_game_setting()
         self.show_start_page()
+        self._timeline.mark("Fenster")
+        QtCore.QTimer.singleShot(0, self._on_first_frame)
 
-    def _apply_background(self, path: Path) -> None:
-        if path and path.exists():
-            pixmap = QtGui.QPixmap(str(path))
-            if pixmap.isNull():
-                self._background_pixmap = None
-                self.central.setAutoFillBackground(False)
-                self.central.setPalette(self.style().standardPalette())
-                return
-            self._background_pixmap = pixmap
-            self._refresh_background()
-        else:
-            self._background_pixmap = None
-            self.central.setAutoFillBackground(False)
-            self.central.setPalette(self.style().standardPalette())
+    def _on_first_frame(self) -> None:
+        # Runs from the event loop, i.e. once the window has been shown.
+        self._timeline.mark("Interaktiv")
+        self._timeline.log()
+        self._warm_pixmap_cache()
+        QtCore.QTimer.singleShot(0, lambda: self.quantity_dialog)
+        QtCore.QTimer.singleShot(self.ADMIN_PREBUILD_DELAY_MS, self._prebuild_admin_page)
 
-    def _refresh_background(self) -> None:
-        if not self._background_pixmap or self._background_pixmap.isNull():
+    @property
+    def quantity_dialog(self) -> QuantityDialog:
+        """The one quantity dialog of the window, re-bound for every drink."""
+        if self._quantity_dialog is None:
+            self._quantity_dialog = QuantityDialog(self)
+            self._quantity_dialog.set_event_users(self._event_users)
+        return self._quantity_dialog
+
+    def refresh_event_users(self) -> None:
+        """Reload the event cards offered as payment in the background."""
+        self.db.submit(
+            models.get_event_payment_users, on_done=self._set_event_users, background=True,
+        )
+
+    def _set_event_users(self, users: list[models.User]) -> None:
+        self._event_users = users
+        if self._quantity_dialog is not None:
+            self._quantity_dialog.set_event_users(users)
+
+    def _prebuild_admin_page(self) -> None:
+        """Build one missing admin page per idle turn of the event loop."""
+        if self.is_busy() or self.stack.currentWidget() is not self.start_page:
+            QtCore.QTimer.singleShot(self.ADMIN_PREBUILD_DELAY_MS, self._prebuild_admin_page)
             return
-        target_size = self.central.size()
-        if target_size.isEmpty():
+        for name, build in self._admin_builders():
+            if name not in self._admin_pages:
+                self._admin_page(name, build)
+                QtCore.QTimer.singleShot(0, self._prebuild_admin_page)
+                return
+
+    def _admin_builders(self) -> tuple[tuple[str, Callable[[], QtWidgets.QWidget]], ...]:
+        return (
+            ("admin_menu", self._build_admin_menu),
+            ("topup", self._build_topup_page),
+            ("purchased", self._build_purchased_page),
+            ("event_cards", self._build_event_card_page),
+            ("stock", self._build_stock_page),
+        )
+
+    def _admin_page(self, name: str, build: Callable[[], QtWidgets.QWidget]) -> Any:
+        page = self._admin_pages.get(name)
+        if page is None:
+            page = build()
+            self.stack.addWidget(page)
+            self._admin_pages[name] = page
+        return page
+
+    def _build_admin_menu(self) -> AdminMenu:
+        menu = AdminMenu(self)
+        menu.stock_btn.clicked.connect(self.show_shopping_forecast)
+        menu.purchased_btn.clicked.connect(self.show_purchased_page)
+        menu.topup_btn.clicked.connect(self.show_topup_page)
+        menu.event_cards_btn.clicked.connect(self.show_event_cards_page)
+        menu.status_btn.clicked.connect(self.show_status)
+        menu.web_btn.clicked.connect(self.show_web_qr)
+        menu.quit_btn.clicked.connect(self._quit)
+        menu.back_btn.clicked.connect(self.show_start_page)
+        return menu
+
+    def _build_stock_page(self) -> StockPage:
+        page = StockPage(self)
+        page.back_btn.clicked.connect(self.show_admin_menu)
+        return page
+
+    def _build_purchased_page(self) -> PurchasedPage:
+        page = PurchasedPage(self)
+        page.back_btn.clicked.connect(self.show_admin_menu)
+        return page
+
+    def _build_topup_page(self) -> TopupPage:
+        page = TopupPage(self)
+        page.back_btn.clicked.connect(self.show_admin_menu)
+        return page
+
+    def _build_event_card_page(self) -> EventCardPage:
+        return EventCardPage(self)
+
+    @property
+    def admin_menu(self) -> AdminMenu:
+        return self._admin_page("admin_menu", self._build_admin_menu)
+
+    @property
+    def stock_page(self) -> StockPage:
+        return self._admin_page("stock", self._build_stock_page)
+
+    @property
+    def purchased_page(self) -> PurchasedPage:
+        return self._admin_page("purchased", self._build_purchased_page)
+
+    @property
+    def topup_page(self) -> TopupPage:
+        return self._admin_page("topup", self._build_topup_page)
+
+    @property
+    def event_card_page(self) -> EventCardPage:
+        return self._admin_page("event_cards", self._build_event_card_page)
+
+    def _scaled_backgrounds(self) -> dict[Path, QtGui.QPalette | None]:
+        """Return the background palettes, rescaling only when the size changed."""
+        size = self.central.size()
+        if size != self._backgrounds_size:
+            base = self.style().standardPalette()
+            self._backgrounds = {}
+            self._background_stamps = self._read_background_stamps()
+            for path in (self._default_bg, self._thank_bg, self._free_bg):
+                scaled = pixmap_cache.pixmap(path, size, COVER) if not size.isEmpty() else None
+                if scaled is None or scaled.isNull():
+                    self._backgrounds[path] = None
+                    continue
+                palette = QtGui.QPalette(base)
+                palette.setBrush(QtGui.QPalette.Window, QtGui.QBrush(scaled))
+                self._backgrounds[path] = palette
+            self._backgrounds_size = QtCore.QSize(size)
+        return self._backgrounds
+
+    def _read_background_stamps(self) -> tuple:
+        stamps = []
+        for path in (self._default_bg, self._thank_bg, self._free_bg):
+            try:
+                st = path.stat()
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _invalidate_backgrounds(self) -> None:
+        """Re-read the background files if one changed (e.g. uploaded in the web admin)."""
+        if self._read_background_stamps() != self._background_stamps:
+            self._backgrounds_size = QtCore.QSize()
+
+    def _apply_background(self, path: Path | None) -> None:
+        palette = self._scaled_backgrounds().get(path) if path else None
+        self._background_path = path
+        if palette is self._background_palette:
             return
-        scaled = self._background_pixmap.scaled(
-            target_size,
-            QtCore.Qt.KeepAspectRatioByExpanding,
-            QtCore.Qt.SmoothTransformation,
+        self._background_palette = palette
+        if palette is None:
+            self.central.setAutoFillBackground(False)
+            self.central.setPalette(self.style().standardPalette())
+        else:
+            self.central.setAutoFillBackground(True)
+            self.central.setPalette(palette)
+
+    def _warm_pixmap_cache(self) -> None:
+        """Scale the backgrounds and decode the dialog images while idle."""
+        self._scaled_backgrounds()
+        pixmap_cache.warm(
+            (images.variant_path(drink.image, 'dialog'), None, FIT)
+            for drink in self._drinks_by_id.values() if drink.image
         )
-        palette = self.central.palette()
-        palette.setBrush(QtGui.QPalette.Window, QtGui.QBrush(scaled))
-        self.central.setAutoFillBackground(True)
-        self.central.setPalette(palette)
 
     def _apply_start_background(self) -> None:
         path = self._default_bg
-        if self._free_day_enabled and self._free_bg.exists():
+        if self._free_day_enabled and self._scaled_backgrounds().get(self._free_bg):
             path = self._free_bg
         self._apply_background(path)
 
     def _apply_thank_background(self) -> None:
-        if self._free_day_enabled and self._free_bg.exists():
+        backgrounds = self._scaled_backgrounds()
+        if self._free_day_enabled and backgrounds.get(self._free_bg):
             self._apply_background(self._free_bg)
-        elif self._thank_bg.exists():
+        elif backgrounds.get(self._thank_bg):
             self._apply_background(self._thank_bg)
 
     def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
         super().resizeEvent(event)
-        self._refresh_background()
+        if self.central.size() != self._backgrounds_size:
+            self._apply_background(self._background_path)
 
     def _setup_styles(self) -> None:
         self.setStyleSheet(
@@ -1468,62 +1719,78 @@ class MainWindow(QtWidgets.QMainWindow):
     def _game_message_duration(self) -> int:
         return 12000 if self._game_enabled else 3500
 
-    def _populate_start_page(self) -> None:
-        layout = self.start_layout
-        conn = database.get_connection()
-
-        self.page_count = models.get_max_page(conn)
-        drinks = models.get_drinks(conn, limit=8, page=self.current_page)
+    def _tile_font(self) -> QtGui.QFont:
         font = QtGui.QFont()
         font.setPointSize(13 if self._compact_display else 16)
+        return font
 
-        rows = ((len(drinks) + 1) + 2) // 3
-        for row in range(rows):
-            layout.setRowStretch(row, 0)
-
-        balance_btn = QtWidgets.QPushButton("Guthaben\nabfragen")
-        balance_btn.setFont(font)
+    def _size_tile(self, button: QtWidgets.QPushButton) -> None:
         if self._compact_display:
-            balance_btn.setMinimumSize(170, 110)
-            balance_btn.setMaximumHeight(140)
+            button.setMinimumSize(170, 110)
+            button.setMaximumHeight(140)
         else:
-            balance_btn.setMinimumSize(220, 130)
-            balance_btn.setMaximumHeight(170)
-        balance_btn.setProperty("btnClass", "tile")
-        balance_btn.setProperty("accent", "info")
-        self._apply_button_style(balance_btn)
-        balance_btn.clicked.connect(self._check_balance)
-        layout.addWidget(balance_btn, 0, 0)
+            button.setMinimumSize(220, 130)
+            button.setMaximumHeight(170)
+
+    def _build_start_page(self) -> None:
+        """Create the persistent widgets of the start page; drink tiles follow in ``_sync_start_page``."""
+        # One button per drink id, reused across refreshes; the snapshot holds
+        # what was last applied to it so unchanged tiles are not touched.
+        self._tiles: dict[int, QtWidgets.QPushButton] = {}
+        self._tile_snapshots: dict[int, tuple] = {}
+        self._tile_positions: dict[int, tuple[int, int, int]] = {}
+        self._drinks_by_id: dict[int, models.Drink] = {}
+        # Every drink page lives in the stack, so paging is an index switch.
+        # Pages are laid out lazily from the cached catalog: the visible one
+        # right away, the others when the event loop is idle.
+        self.drink_stack = QtWidgets.QStackedWidget()
+        self._drink_pages: list[QtWidgets.QWidget] = []
+        self._page_layouts: list[QtWidgets.QGridLayout] = []
+        self._page_drinks: dict[int, list[models.Drink]] = {}
+        self._stale_pages: set[int] = set()
+        self.start_layout.addWidget(self.drink_stack)
+
+        # Drinks collected for one payment; hidden while the basket is empty.
+        self._basket: list[tuple[models.Drink, int]] = []
+        self._basket_timer = QtCore.QTimer(self)
+        self._basket_timer.setSingleShot(True)
+        self._basket_timer.timeout.connect(self.clear_basket)
+        self.basket_bar = QtWidgets.QFrame()
+        self.basket_bar.setStyleSheet(
+            "QFrame { background: rgba(255,255,255,0.92); border-radius: 14px; }"
+        )
+        basket_layout = QtWidgets.QHBoxLayout(self.basket_bar)
+        basket_layout.setContentsMargins(14, 8, 14, 8)
+        self.basket_label = QtWidgets.QLabel()
+        self.basket_label.setWordWrap(True)
+        f = self.basket_label.font()
+        f.setPointSize(13 if self._compact_display else 16)
+        f.setBold(True)
+        self.basket_label.setFont(f)
+        basket_layout.addWidget(self.basket_label, 1)
+        self.basket_pay_button = QtWidgets.QPushButton("Bezahlen")
+        self.basket_clear_button = QtWidgets.QPushButton("Leeren")
+        for btn in (self.basket_pay_button, self.basket_clear_button):
+            btn.setFont(f)
+            btn.setMinimumHeight(48 if self._compact_display else 64)
+            btn.setProperty("btnClass", "nav")
+            self._apply_button_style(btn)
+            basket_layout.addWidget(btn)
+        self.basket_clear_button.setProperty("accent", "admin")
+        self._apply_button_style(self.basket_clear_button)
+        self.basket_pay_button.clicked.connect(self.checkout_basket)
+        self.basket_clear_button.clicked.connect(self.clear_basket)
+        self.basket_bar.hide()
+        self.start_layout.addWidget(self.basket_bar)
+
+        nav_row = QtWidgets.QGridLayout()
+        for col in range(3):
+            nav_row.setColumnStretch(col, 1)
+        self.start_layout.addLayout(nav_row)
+        self.start_layout.addStretch()
 
-        for idx, drink in enumerate(drinks):
-            button = QtWidgets.QPushButton()
-            price_cents = 0 if self._free_day_enabled else drink.price
-            button.setText(f"{drink.name}\n{price_cents/100:.2f} €")
-            button.setFont(font)
-            if drink.image:
-                button.setIcon(QtGui.QIcon(drink.image))
-                icon_size = 92 if self._compact_display else 120
-                button.setIconSize(QtCore.QSize(icon_size, icon_size))
-            if self._compact_display:
-                button.setMinimumSize(170, 110)
-                button.setMaximumHeight(140)
-            else:
-                button.setMinimumSize(220, 130)
-                button.setMaximumHeight(170)
-            button.setProperty("btnClass", "tile")
-            if drink.stock < 0:
-                button.setProperty("state", "error")
-            elif drink.stock < drink.min_stock:
-                button.setProperty("state", "warning")
-            else:
-                button.setProperty("state", "normal")
-            self._apply_button_style(button)
-            button.clicked.connect(lambda _, d=drink: self.on_drink_selected(d))
-            r, c = divmod(idx + 1, 3)
-            layout.addWidget(button, r, c)
         self.prev_button = QtWidgets.QPushButton("◀")
         self.next_button = QtWidgets.QPushButton("▶")
-
         nav_size = (
             QtCore.QSize(58, 34)
             if self._compact_display
@@ -1539,11 +1806,6 @@ class MainWindow(QtWidgets.QMainWindow):
         self.prev_button.clicked.connect(self.prev_page)
         self.next_button.clicked.connect(self.next_page)
 
-
-        bottom = rows
-        layout.addWidget(self.prev_button, bottom, 0, alignment=QtCore.Qt.AlignLeft)
-        layout.addWidget(self.next_button, bottom, 1, alignment=QtCore.Qt.AlignHCenter)
-
         self.admin_button = QtWidgets.QPushButton("Admin")
         f = self.admin_button.font()
         f.setPointSize(12 if not self._compact_display else 10)
@@ -1554,14 +1816,178 @@ class MainWindow(QtWidgets.QMainWindow):
         self.admin_button.setProperty("accent", "admin")
         self._apply_button_style(self.admin_button)
         self.admin_button.clicked.connect(self._open_admin)
-        layout.addWidget(
-            self.admin_button,
-            bottom,
-            2,
-            alignment=QtCore.Qt.AlignRight,
-        )
-        layout.setRowStretch(bottom, 0)
 
+        nav_row.addWidget(self.prev_button, 0, 0, alignment=QtCore.Qt.AlignLeft)
+        nav_row.addWidget(self.next_button, 0, 1, alignment=QtCore.Qt.AlignHCenter)
+        nav_row.addWidget(self.admin_button, 0, 2, alignment=QtCore.Qt.AlignRight)
+
+    def _add_drink_page(self) -> None:
+        page = QtWidgets.QWidget()
+        grid = QtWidgets.QGridLayout(page)
+        grid.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignHCenter)
+        grid.setContentsMargins(0, 0, 0, 0)
+        spacing = 12 if self._compact_display else 24
+        grid.setHorizontalSpacing(spacing)
+        grid.setVerticalSpacing(spacing)
+
+        balance_btn = QtWidgets.QPushButton("Guthaben\nabfragen")
+        balance_btn.setFont(self._tile_font())
+        self._size_tile(balance_btn)
+        balance_btn.setProperty("btnClass", "tile")
+        balance_btn.setProperty("accent", "info")
+        self._apply_button_style(balance_btn)
+        balance_btn.clicked.connect(self._check_balance)
+        grid.addWidget(balance_btn, 0, 0)
+
+        self._drink_pages.append(page)
+        self._page_layouts.append(grid)
+        self.drink_stack.addWidget(page)
+
+    def _tile_snapshot(self, drink: models.Drink) -> tuple:
+        price_cents = 0 if self._free_day_enabled else drink.price
+        if drink.stock < 0:
+            state = "error"
+        elif drink.stock < drink.min_stock:
+            state = "warning"
+        else:
+            state = "normal"
+        icon = images.variant_path(drink.image, 'tile') if drink.image else None
+        try:
+            icon_mtime = Path(icon).stat().st_mtime if icon else None
+        except OSError:
+            icon_mtime = None
+        return (f"{drink.name}\n{price_cents/100:.2f} €", state, icon, icon_mtime)
+
+    def _create_tile(self, drink_id: int) -> QtWidgets.QPushButton:
+        button = QtWidgets.QPushButton()
+        button.setFont(self._tile_font())
+        self._size_tile(button)
+        button.setProperty("btnClass", "tile")
+        icon_size = 92 if self._compact_display else 120
+        button.setIconSize(QtCore.QSize(icon_size, icon_size))
+        button.clicked.connect(lambda _, i=drink_id: self._on_tile_clicked(i))
+        return button
+
+    def _update_tile(self, button: QtWidgets.QPushButton, old: tuple | None, new: tuple) -> None:
+        text, state, icon, icon_mtime = new
+        if old is None or old[0] != text:
+            button.setText(text)
+        if old is None or old[1] != state:
+            button.setProperty("state", state)
+            self._apply_button_style(button)
+        if old is None or old[2:] != (icon, icon_mtime):
+            button.setIcon(pixmap_cache.icon(icon, button.iconSize()))
+
+    def _on_tile_clicked(self, drink_id: int) -> None:
+        drink = self._drinks_by_id.get(drink_id)
+        if drink is not None:
+            self.on_drink_selected(drink)
+
+    def _sync_start_page(self) -> None:
+        """Diff the drink catalog against the tiles and apply only the changes.
+
+        Every drink keeps its button while it exists. Pages whose drinks
+        changed are marked stale and laid out again before they are shown,
+        so a sale elsewhere repaints at most the tiles whose text, state or
+        icon changed.
+        """
+        catalog = models.get_drinks()
+        page_count = max((drink.page for drink in catalog), default=1)
+        page_drinks: dict[int, list[models.Drink]] = {}
+        for drink in catalog:
+            page_drinks.setdefault(drink.page, []).append(drink)
+        for page in page_drinks:
+            page_drinks[page] = page_drinks[page][:8]
+
+        existing = {drink.id for drink in catalog}
+        for drink_id in list(self._tiles):
+            if drink_id not in existing:
+                button = self._tiles.pop(drink_id)
+                self._tile_snapshots.pop(drink_id, None)
+                self._tile_positions.pop(drink_id, None)
+                button.deleteLater()
+        self._drinks_by_id = {drink.id: drink for drink in catalog}
+
+        while len(self._drink_pages) < page_count:
+            self._add_drink_page()
+        while len(self._drink_pages) > page_count:
+            # Detach surviving tiles before the page (their parent) goes away.
+            for drink_id, position in list(self._tile_positions.items()):
+                if position[0] == len(self._drink_pages):
+                    self._tiles[drink_id].setParent(None)
+                    del self._tile_positions[drink_id]
+            page = self._drink_pages.pop()
+            self._page_layouts.pop()
+            self.drink_stack.removeWidget(page)
+            page.deleteLater()
+
+        for page in range(1, page_count + 1):
+            ids = [d.id for d in page_drinks.get(page, [])]
+            old_ids = [d.id for d in self._page_drinks.get(page, [])]
+            if ids != old_ids or page not in self._page_drinks:
+                self._stale_pages.add(page)
+        self._stale_pages = {p for p in self._stale_pages if p <= page_count}
+        self._page_drinks = page_drinks
+        self.page_count = page_count
+        self.current_page = min(self.current_page, self.page_count)
+
+        # Text, state and icon changes apply to built tiles wherever they are.
+        for drink in catalog:
+            button = self._tiles.get(drink.id)
+            if button is not None:
+                self._refresh_tile(button, drink)
+
+        self._show_drink_page()
+        if self._stale_pages:
+            QtCore.QTimer.singleShot(0, self._build_idle_page)
+
+    def _refresh_tile(self, button: QtWidgets.QPushButton, drink: models.Drink) -> None:
+        snapshot = self._tile_snapshot(drink)
+        old = self._tile_snapshots.get(drink.id)
+        if snapshot != old:
+            self._update_tile(button, old, snapshot)
+            self._tile_snapshots[drink.id] = snapshot
+
+    def _layout_drink_page(self, page: int) -> None:
+        """Place the tiles of ``page`` from the cached catalog (no DB access)."""
+        grid = self._page_layouts[page - 1]
+        drinks = self._page_drinks.get(page, [])
+        wanted = {drink.id for drink in drinks}
+        for drink_id, position in list(self._tile_positions.items()):
+            if position[0] == page and drink_id not in wanted:
+                button = self._tiles[drink_id]
+                grid.removeWidget(button)
+                button.hide()
+                del self._tile_positions[drink_id]
+        for idx, drink in enumerate(drinks):
+            button = self._tiles.get(drink.id)
+            if button is None:
+                button = self._create_tile(drink.id)
+                self._tiles[drink.id] = button
+                self._refresh_tile(button, drink)
+            row, col = divmod(idx + 1, 3)
+            position = self._tile_positions.get(drink.id)
+            if position != (page, row, col):
+                if position is not None:
+                    self._page_layouts[position[0] - 1].removeWidget(button)
+                grid.addWidget(button, row, col)
+                button.show()
+                self._tile_positions[drink.id] = (page, row, col)
+        self._stale_pages.discard(page)
+
+    def _build_idle_page(self) -> None:
+        if not self._stale_pages:
+            return
+        # Prefer the neighbours of the visible page; they are the next taps.
+        page = min(self._stale_pages, key=lambda p: abs(p - self.current_page))
+        self._layout_drink_page(page)
+        if self._stale_pages:
+            QtCore.QTimer.singleShot(0, self._build_idle_page)
+
+    def _show_drink_page(self) -> None:
+        if self.current_page in self._stale_pages:
+            self._layout_drink_page(self.current_page)
+        self.drink_stack.setCurrentIndex(self.current_page - 1)
         self.prev_button.setEnabled(self.current_page > 1)
         self.next_button.setEnabled(self.current_page < self.page_count)
 
@@ -1571,7 +1997,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.game_button.hide()
         self.game_button.setEnabled(True)
         if self._start_page_needs_refresh:
-            self._rebuild_start_page()
+            self._sync_start_page()
             self._start_page_needs_refresh = False
         self._apply_start_background()
         self.stack.setCurrentWidget(self.start_page)
@@ -1704,11 +2130,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.stack.setCurrentWidget(self.event_card_page)
 
     def show_status(self) -> None:
-        conn = database.get_connection()
-        users = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
-        drinks = conn.execute('SELECT COUNT(*) FROM drinks').fetchone()[0]
-        transactions = conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
-        conn.close()
+        self.db.submit(booking.status_counts, on_done=self._show_status_counts)
+
+    def _show_status_counts(self, counts: dict[str, int]) -> None:
+        users = counts['users']
+        drinks = counts['drinks']
+        transactions = counts['transactions']
         system = platform.platform()
         python = platform.python_version()
         db_path = database.DB_PATH
@@ -1731,10 +2158,8 @@ class MainWindow(QtWidgets.QMainWindow):
         dlg = QtWidgets.QDialog(self)
         dlg.setWindowTitle("Webinterface QR-Code")
         dlg.setWindowState(QtCore.Qt.WindowFullScreen)
-        pixmap = QtGui.QPixmap(str(path))
         screen_size = QtWidgets.QApplication.primaryScreen().availableSize()
-        scaled = pixmap.scaled(screen_size, QtCore.Qt.KeepAspectRatio,
-                               QtCore.Qt.SmoothTransformation)
+        scaled = pixmap_cache.pixmap(path, screen_size)
         label = QtWidgets.QLabel(alignment=QtCore.Qt.AlignCenter)
         label.setPixmap(scaled)
         layout = QtWidgets.QVBoxLayout(dlg)
@@ -1746,22 +2171,94 @@ class MainWindow(QtWidgets.QMainWindow):
         dlg.mousePressEvent = close
         dlg.exec_()
 
-    def _check_balance(self) -> None:
-        self._show_info_message("Bitte Karte auflegen…", auto_return_ms=None)
-        uid = rfid.read_uid(show_dialog=False)
-        if not uid:
-            self._show_big_message("Fehler", "Karte konnte nicht gelesen werden.")
-            self.show_start_page()
+    def is_busy(self) -> bool:
+        """True while waiting for a card or for a booking to be written."""
+        return self._card_callback is not None or self.db.pending > 0
+
+    def await_card(
+        self,
+        on_card: Callable[[str | None], None],
+        message: str | None = "Bitte Karte auflegen…",
+    ) -> None:
+        """Call ``on_card`` with the next tapped UID, or ``None`` on timeout.
+
+        The reader thread reports the card through a signal, so the event
+        loop keeps running while the customer looks for their card.
+        """
+        if message is not None:
+            self._show_info_message(message, auto_return_ms=None)
+        if not self.reader.available:
+            print("RFID-Reader nicht verfügbar")
+            on_card(None)
             return
-        user = models.get_user_by_uid(uid)
-        if not user:
+        self._card_callback = on_card
+        led.indicate_waiting()
+        if self.reader.current_uid is not None:
+            self._deliver_card(self.reader.current_uid)
+        else:
+            self._card_timer.start(rfid.READ_TIMEOUT * 1000)
+
+    def _on_card_present(self, uid: str) -> None:
+        if self._card_callback is not None:
+            self._deliver_card(uid)
+
+    def _on_card_timeout(self) -> None:
+        print("Timeout: Keine Karte gelesen.")
+        self._deliver_card(None)
+
+    def _deliver_card(self, uid: str | None) -> None:
+        callback, self._card_callback = self._card_callback, None
+        self._card_timer.stop()
+        led.off()
+        if callback is not None:
+            callback(uid)
+
+    def _read_card(self, on_card: Callable[[str], None]) -> None:
+        """Ask for a card; on failure report it and return to the start page."""
+        def done(uid: str | None) -> None:
+            if not uid:
+                self._show_big_message("Fehler", "Karte konnte nicht gelesen werden.")
+                self.show_start_page()
+                return
+            on_card(uid)
+
+        self.await_card(done)
+
+    def _booking_failed(self, _error: str) -> None:
+        led.indicate_error()
+        self._show_big_message("Fehler", "Buchung fehlgeschlagen.")
+        self.show_start_page()
+
+    def _booking_refused(self, result: booking.BookingResult) -> None:
+        if result.reason == booking.UNKNOWN_CARD:
             led.indicate_error()
             self._show_big_message("Fehler", "Unbekannte Karte.")
-            self.show_start_page()
+        elif result.reason == booking.UNKNOWN_USER:
+            self._show_big_message("Fehler", "Benutzer nicht gefunden.")
+        elif result.reason == booking.LIMIT:
+            QtWidgets.QMessageBox.information(
+                self, "Guthaben", "Limit überschritten - bitte Guthaben aufladen"
+            )
+        else:
+            led.indicate_error()
+            self._show_big_message("Fehler", "Buchung fehlgeschlagen.")
+        self.show_start_page()
+
+    def _check_balance(self) -> None:
+        if self.is_busy():
+            return
+        self._read_card(lambda uid: self.db.submit(
+            booking.check_card, uid,
+            on_done=self._show_balance, on_error=self._booking_failed,
+        ))
+
+    def _show_balance(self, result: booking.BookingResult) -> None:
+        if not result.ok:
+            self._booking_refused(result)
             return
         led.indicate_success()
         self._show_info_message(
-            f"{user.name}\nGuthaben: {user.balance/100:.2f} €",
+            f"{result.user.name}\nGuthaben: {result.user.balance/100:.2f} €",
             auto_return_ms=1000,
         )
 
@@ -1785,41 +2282,42 @@ class MainWindow(QtWidgets.QMainWindow):
         if user_id is None:
             self._handle_cash_game_result(result, context)
             return
-        total_price = context["total_price"]
         drink_name = context.get("drink_name", "")
-        before_user = models.get_user(user_id)
-        if before_user is None:
+        self.db.submit(
+            booking.settle_game, user_id, result, context["total_price"],
+            on_done=lambda settled: self._show_game_result(settled, result, drink_name),
+            on_error=self._booking_failed,
+        )
+
+    def _show_game_result(self, settled: booking.BookingResult, result: str, drink_name: str) -> None:
+        if settled.reason == booking.UNKNOWN_USER:
             self._show_info_message(
                 "Benutzer konnte nicht ermittelt werden. Preis bleibt unverändert.",
                 auto_return_ms=4000,
             )
             return
-
+        user = settled.user
         message: str
         if result == 'win':
-            models.update_balance(user_id, total_price)
-            after_user = models.get_user(user_id) or before_user
             message = (
-                f"Glückwunsch {after_user.name}! Du hast gewonnen.\n"
-                f"{drink_name} ist gratis. Neues Guthaben: {after_user.balance/100:.2f} €"
+                f"Glückwunsch {user.name}! Du hast gewonnen.\n"
+                f"{drink_name} ist gratis. Neues Guthaben: {user.balance/100:.2f} €"
             )
         elif result == 'lose':
-            if models.update_balance(user_id, -total_price):
-                after_user = models.get_user(user_id) or before_user
+            if settled.ok:
                 message = (
-                    f"Leider verloren, {after_user.name}.\n"
-                    f"{drink_name} kostet nun doppelt. Neues Guthaben: {after_user.balance/100:.2f} €"
+                    f"Leider verloren, {user.name}.\n"
+                    f"{drink_name} kostet nun doppelt. Neues Guthaben: {user.balance/100:.2f} €"
                 )
             else:
                 message = (
                     "Leider verloren! Der Zusatzbetrag konnte nicht verbucht werden.\n"
-                    f"Guthaben bleibt bei {before_user.balance/100:.2f} €."
+                    f"Guthaben bleibt bei {settled.old_balance/100:.2f} €."
                 )
         elif result == 'draw':
-            after_user = models.get_user(user_id) or before_user
             message = (
                 "Unentschieden! Preis bleibt gleich.\n"
-                f"Aktuelles Guthaben: {after_user.balance/100:.2f} €."
+                f"Aktuelles Guthaben: {user.balance/100:.2f} €."
             )
         else:
             message = "Spiel abgebrochen. Preis bleibt unverändert."
@@ -1854,141 +2352,202 @@ class MainWindow(QtWidgets.QMainWindow):
         self._show_info_message(message, auto_return_ms=5000)
 
     def on_drink_selected(self, drink: models.Drink) -> None:
-        dialog = QuantityDialog(drink, self, free_mode=self._free_day_enabled)
-        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+        if self.is_busy():
+            # A card read or booking is still in progress; ignore the tap.
+            return
+        dialog = self.quantity_dialog
+        dialog.bind(
+            drink,
+            free_mode=self._free_day_enabled,
+            basket=self._basket_summary(self._basket),
+        )
+        # Show the cached cards at once; balances are refreshed while open.
+        self.refresh_event_users()
+        basket = list(self._basket)
+        if not self._exec_with_basket(dialog):
+            return
+        if dialog.adds_to_basket:
+            self._add_to_basket(drink, dialog.quantity)
+            return
+        self._settle([*basket, (drink, dialog.quantity)], dialog)
+
+    def checkout_basket(self) -> None:
+        """Pay for the whole basket with one payment choice."""
+        if self.is_busy() or not self._basket:
+            return
+        dialog = self.quantity_dialog
+        dialog.bind_checkout(self._basket_summary(self._basket), free_mode=self._free_day_enabled)
+        self.refresh_event_users()
+        basket = list(self._basket)
+        if not self._exec_with_basket(dialog):
             return
-        quantity = dialog.quantity
+        self._settle(basket, dialog)
+
+    def _exec_with_basket(self, dialog: QuantityDialog) -> bool:
+        """Run ``dialog`` without the basket expiring underneath it."""
+        self._basket_timer.stop()
+        try:
+            return dialog.exec_() == QtWidgets.QDialog.Accepted
+        finally:
+            if self._basket:
+                self._basket_timer.start(self.BASKET_TIMEOUT_MS)
+
+    def _basket_summary(self, items: list[tuple[models.Drink, int]]) -> str:
+        if not items:
+            return ""
+        text = ", ".join(f"{quantity}× {drink.name}" for drink, quantity in items)
+        if not self._free_day_enabled:
+            text += f" – {sum(d.price * q for d, q in items) / 100:.2f} €"
+        return text
+
+    def _add_to_basket(self, drink: models.Drink, quantity: int) -> None:
+        for index, (entry, count) in enumerate(self._basket):
+            if entry.id == drink.id:
+                self._basket[index] = (entry, count + quantity)
+                break
+        else:
+            self._basket.append((drink, quantity))
+        self._basket_timer.start(self.BASKET_TIMEOUT_MS)
+        self._update_basket_bar()
+
+    def clear_basket(self) -> None:
+        self._basket = []
+        self._basket_timer.stop()
+        self._update_basket_bar()
+
+    def _update_basket_bar(self) -> None:
+        count = sum(quantity for _, quantity in self._basket)
+        self.basket_label.setText(f"Warenkorb ({count}): {self._basket_summary(self._basket)}")
+        self.basket_bar.setVisible(bool(self._basket))
+
+    def _settle(self, items: list[tuple[models.Drink, int]], dialog: QuantityDialog) -> None:
+        """Book ``items`` with the payment chosen in ``dialog`` as one transaction."""
+        pairs = [(drink.id, quantity) for drink, quantity in items if quantity > 0]
+        if not pairs:
+            return
+        label = items[0][0].name if len(items) == 1 else "dein Einkauf"
         if self._free_day_enabled:
-            self._show_info_message("Bitte Karte auflegen…", auto_return_ms=None)
-            uid = rfid.read_uid(show_dialog=False)
-            if not uid:
-                self._show_big_message("Fehler", "Karte konnte nicht gelesen werden.")
-                self.show_start_page()
-                return
-            user = models.get_user_by_uid(uid)
-            if not user:
-                led.indicate_error()
-                self._show_big_message("Fehler", "Unbekannte Karte.")
-                self.show_start_page()
-                return
-            total_price = 0
-            if not models.update_balance(user.id, -total_price):
-                QtWidgets.QMessageBox.information(
-                    self, "Guthaben", "Limit überschritten - bitte Guthaben aufladen"
-                )
-                self.show_start_page()
-                return
-            models.update_drink_stock(drink.id, -quantity)
-            models.add_transaction(user.id, drink.id, quantity)
-            led.indicate_success()
-            self._apply_thank_background()
-            msg = (
-                f"Danke {user.name}!\n"
-                "Heute kostenlos - Kauf wurde verbucht."
-            )
-            self._show_info_message(
-                msg,
-                allow_game=False,
-                game_context=None,
-                auto_return_ms=3500,
+            self._read_card(
+                lambda uid: self._charge_card(uid, pairs, True, self._finish_free_purchase)
             )
             return
         if dialog.is_cash:
-            models.update_drink_stock(drink.id, -quantity)
-            cash_id = models.get_cash_user_id()
-            models.add_transaction(cash_id, drink.id, quantity)
-            led.indicate_success()
-            total_price = drink.price * quantity
-            message = f"Bitte {total_price/100:.2f} \u20ac passend in die Getränkekasse legen."
-            game_context: dict[str, Any] | None = None
-            auto_return = 1000
-            if self._game_enabled:
-                message += (
-                    "\n\nGewinne im Tic Tac Toe, dann darfst du dein Geld behalten. "
-                    "Bei einer Niederlage kostet das Getränk doppelt!"
-                    "\n\nTippe auf \"Tic Tac Toe spielen\" oder warte kurz,"
-                    " dann kehrst du automatisch zum Start zurück."
-                )
-                game_context = {
-                    "user_id": None,
-                    "drink_id": drink.id,
-                    "quantity": quantity,
-                    "total_price": total_price,
-                    "drink_name": drink.name,
-                    "payment": "cash",
-                }
-                auto_return = self._game_message_duration()
-            else:
-                message += "\n\nDu kehrst gleich automatisch zum Startbildschirm zurück."
-            self._show_info_message(
-                message,
-                allow_game=self._game_enabled,
-                game_context=game_context,
-                auto_return_ms=auto_return,
+            self.db.submit(
+                booking.sell_cash, pairs,
+                on_done=lambda result: self._finish_cash_purchase(result, label),
+                on_error=self._booking_failed,
             )
             return
         if dialog.event_user_id is not None:
-            user = models.get_user(dialog.event_user_id)
-            if not user:
-                self._show_big_message("Fehler", "Benutzer nicht gefunden.")
-                self.show_start_page()
-                return
-            total_price = drink.price * quantity
-            if not models.update_balance(user.id, -total_price):
-                QtWidgets.QMessageBox.information(
-                    self, "Guthaben", "Limit überschritten - bitte Guthaben aufladen"
-                )
-                self.show_start_page()
-                return
-            models.update_drink_stock(drink.id, -quantity)
-            models.add_transaction(user.id, drink.id, quantity)
-            led.indicate_success()
-            self._apply_thank_background()
-            thank_message = f"Danke {user.name}!\nKauf wird verbucht."
-            thank_message += "\n\nDu kehrst gleich automatisch zum Startbildschirm zurück."
-            self._show_info_message(
-                thank_message,
-                allow_game=False,
-                game_context=None,
-                auto_return_ms=3500,
+            self._show_info_message("Wird gebucht…", auto_return_ms=None)
+            self.db.submit(
+                booking.charge_user, dialog.event_user_id, pairs,
+                on_done=self._finish_event_purchase, on_error=self._booking_failed,
             )
             return
-        self._show_info_message("Bitte Karte auflegen…", auto_return_ms=None)
-        uid = rfid.read_uid(show_dialog=False)
-        if not uid:
-            self._show_big_message("Fehler", "Karte konnte nicht gelesen werden.")
-            self.show_start_page()
+        self._read_card(lambda uid: self._charge_card(
+            uid, pairs, False, lambda result: self._finish_card_purchase(result, label),
+        ))
+
+    def _charge_card(
+        self,
+        uid: str,
+        pairs: booking.Items,
+        free: bool,
+        on_done: Callable[[booking.BookingResult], None],
+    ) -> None:
+        self._show_info_message("Wird gebucht…", auto_return_ms=None)
+        self.db.submit(
+            booking.charge_card, uid, pairs, free,
+            on_done=on_done, on_error=self._booking_failed,
+        )
+
+    def _finish_free_purchase(self, result: booking.BookingResult) -> None:
+        if not result.ok:
+            self._booking_refused(result)
             return
-        user = models.get_user_by_uid(uid)
-        if not user:
-            led.indicate_error()
-            self._show_big_message("Fehler", "Unbekannte Karte.")
-            self.show_start_page()
+        self.clear_basket()
+        led.indicate_success()
+        self._apply_thank_background()
+        msg = (
+            f"Danke {result.user.name}!\n"
+            "Heute kostenlos - Kauf wurde verbucht."
+        )
+        self._show_info_message(
+            msg,
+            allow_game=False,
+            game_context=None,
+            auto_return_ms=3500,
+        )
+
+    def _finish_cash_purchase(self, result: booking.BookingResult, label: str) -> None:
+        if not result.ok:
+            self._booking_refused(result)
             return
-        total_price = drink.price * quantity
-        old_balance = user.balance
-        if not models.update_balance(user.id, -total_price):
-            QtWidgets.QMessageBox.information(self, "Guthaben", "Limit überschritten - bitte Guthaben aufladen")
-            self.show_start_page()
+        self.clear_basket()
+        led.indicate_success()
+        total_price = result.total
+        message = f"Bitte {total_price/100:.2f} € passend in die Getränkekasse legen."
+        game_context: dict[str, Any] | None = None
+        auto_return = 1000
+        if self._game_enabled:
+            message += (
+                "\n\nGewinne im Tic Tac Toe, dann darfst du dein Geld behalten. "
+                "Bei einer Niederlage kostet das Getränk doppelt!"
+                "\n\nTippe auf \"Tic Tac Toe spielen\" oder warte kurz,"
+                " dann kehrst du automatisch zum Start zurück."
+            )
+            game_context = {
+                "user_id": None,
+                "total_price": total_price,
+                "drink_name": label,
+                "payment": "cash",
+            }
+            auto_return = self._game_message_duration()
+        else:
+            message += "\n\nDu kehrst gleich automatisch zum Startbildschirm zurück."
+        self._show_info_message(
+            message,
+            allow_game=self._game_enabled,
+            game_context=game_context,
+            auto_return_ms=auto_return,
+        )
+
+    def _finish_event_purchase(self, result: booking.BookingResult) -> None:
+        if not result.ok:
+            self._booking_refused(result)
             return
-        models.update_drink_stock(drink.id, -quantity)
-        models.add_transaction(user.id, drink.id, quantity)
-        new_user = models.get_user_by_uid(uid)
+        self.clear_basket()
+        led.indicate_success()
+        self._apply_thank_background()
+        thank_message = f"Danke {result.user.name}!\nKauf wird verbucht."
+        thank_message += "\n\nDu kehrst gleich automatisch zum Startbildschirm zurück."
+        self._show_info_message(
+            thank_message,
+            allow_game=False,
+            game_context=None,
+            auto_return_ms=3500,
+        )
+
+    def _finish_card_purchase(self, result: booking.BookingResult, label: str) -> None:
+        if not result.ok:
+            self._booking_refused(result)
+            return
+        self.clear_basket()
+        new_user = result.user
         led.indicate_success()
         self._apply_thank_background()
         msg = (
-            f"Danke {new_user.name}!\nAltes Guthaben: {old_balance/100:.2f} €\n"
+            f"Danke {new_user.name}!\nAltes Guthaben: {result.old_balance/100:.2f} €\n"
             f"Neues Guthaben: {new_user.balance/100:.2f} €"
         )
         if new_user.balance < 0:
             msg += "\nBitte Guthaben aufladen!"
         game_context = {
-            "user_id": user.id,
-            "drink_id": drink.id,
-            "quantity": quantity,
-            "total_price": total_price,
+            "user_id": new_user.id,
+            "total_price": result.total,
             "user_name": new_user.name,
-            "drink_name": drink.name,
+            "drink_name": label,
             "event_user": False,
         }
         if self._game_enabled:
@@ -2006,64 +2565,91 @@ class MainWindow(QtWidgets.QMainWindow):
             game_context=game_context if self._game_enabled else None,
             auto_return_ms=self._game_message_duration(),
         )
-        QtWidgets.QApplication.processEvents()
-
 
     def check_refresh(self) -> None:
         if database.exit_flag_set():
             database.clear_exit_flag()
+            self.db.stop()
+            self.reader.stop()
+            led.flush(1.0)
             QtWidgets.QApplication.quit()
             return
         if database.refresh_needed(self.refresh_mtime):
             self.refresh_mtime = database.REFRESH_FLAG.stat().st_mtime
             self._start_page_needs_refresh = True
             self._sync_game_setting()
-            free_day_changed = self._sync_free_day_setting()
+            self._sync_free_day_setting()
+            # The register's own sales touch the flag too; only changes
+            # made elsewhere (web admin) drop the cached card users and
+            # look at the background files again.
+            if booking.sessions.check_flag():
+                self._invalidate_backgrounds()
             if self.stack.currentWidget() is self.start_page:
-                self._rebuild_start_page()
+                self._sync_start_page()
                 self._start_page_needs_refresh = False
-                if free_day_changed:
-                    self._apply_start_background()
-
-    def _rebuild_start_page(self) -> None:
-        layout = self.start_layout
-        for i in reversed(range(layout.count())):
-            item = layout.takeAt(i)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-        for r in range(layout.rowCount()):
-            layout.setRowStretch(r, 0)
-        self._populate_start_page()
+                self._apply_start_background()
+
+    def check_rfid_jobs(self) -> None:
+        """Carry out a card read queued by the web admin while the register is idle."""
+        if self._web_read_active or self.is_busy() or self.stack.currentWidget() is not self.start_page:
+            return
+        if QtWidgets.QApplication.activeModalWidget() is not None:
+            return
+        job_id = models.claim_rfid_job()
+        if job_id is None:
+            return
+        self._web_read_active = True
+        self.await_card(
+            lambda uid: self._finish_web_read(job_id, uid),
+            "Web-Admin: Bitte Karte auflegen…",
+        )
+
+    def _finish_web_read(self, job_id: int, uid: str | None) -> None:
+        try:
+            models.finish_rfid_job(job_id, uid)
+        except Exception as e:
+            print(f"Fehler beim Lesen für den Web-Admin: {e}")
+        finally:
+            self._web_read_active = False
+            self.show_start_page()
 
     def _open_admin(self) -> None:
-        self._show_info_message("Bitte Admin-Karte auflegen…", auto_return_ms=None)
-        uid = rfid.read_uid(show_dialog=False)
-        user = models.get_user_by_uid(uid) if uid else None
-        self._admin_role = "admin"
+        if self.is_busy():
+            return
+        self.await_card(self._admin_card_read, "Bitte Admin-Karte auflegen…")
+
+    def _admin_card_read(self, uid: str | None) -> None:
+        if not uid:
+            self._admin_card_checked(booking.BookingResult(False))
+            return
+        self.db.submit(
+            booking.check_card, uid,
+            on_done=self._admin_card_checked, on_error=self._booking_failed,
+        )
+
+    def _admin_card_checked(self, result: booking.BookingResult) -> None:
+        user = result.user if result.ok else None
         if user and user.is_admin:
-            self._admin_role = "admin"
+            self._admin_granted("admin")
         elif user and user.is_buyer:
-            self._admin_role = "buyer"
+            self._admin_granted("buyer")
         else:
             pin_dialog = PinDialog(self)
             if pin_dialog.exec_() != QtWidgets.QDialog.Accepted:
-                led.indicate_error()
-                self._show_big_message("Fehler", "Kein Zugang.")
-                self.show_start_page()
-                return
-            entered_pin = pin_dialog.pin
-            admin_pin = models.get_admin_pin()
-            buyer_pin = models.get_buyer_pin()
-            if entered_pin == admin_pin:
-                self._admin_role = "admin"
-            elif entered_pin == buyer_pin:
-                self._admin_role = "buyer"
-            else:
-                led.indicate_error()
-                self._show_big_message("Fehler", "Kein Zugang.")
-                self.show_start_page()
+                self._admin_granted(None)
                 return
+            self.db.submit(
+                booking.pin_role, pin_dialog.pin,
+                on_done=self._admin_granted, on_error=self._booking_failed,
+            )
+
+    def _admin_granted(self, role: str | None) -> None:
+        if role is None:
+            led.indicate_error()
+            self._show_big_message("Fehler", "Kein Zugang.")
+            self.show_start_page()
+            return
+        self._admin_role = role
         led.indicate_success()
         self.show_admin_menu()
 
@@ -2076,14 +2662,17 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         if reply == QtWidgets.QMessageBox.Yes:
             database.set_exit_flag()
+            self.db.stop()
+            self.reader.stop()
+            led.flush(1.0)
             QtWidgets.QApplication.quit()
 
     def next_page(self) -> None:
         if self.current_page < self.page_count:
             self.current_page += 1
-            self._rebuild_start_page()
+            self._show_drink_page()
 
     def prev_page(self) -> None:
         if self.current_page > 1:
             self.current_page -= 1
-            self._rebuild_start_page()
+            self._show_drink_page()
@@ -0,0 +1,109 @@
+"""Process-wide cache for decoded and pre-scaled pixmaps."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from PyQt5 import QtCore, QtGui
+
+# Upper bound for the pixel data kept alive by the cache.
+MAX_BYTES = 64 * 1024 * 1024
+
+# Scaling modes: keep the whole image inside the box or fill the box.
+FIT = 'fit'
+COVER = 'cover'
+
+_Key = tuple[str, int, int, int, int, str]
+
+
+class PixmapCache:
+    """LRU of pixmaps keyed by path, mtime, file size and target size.
+
+    A changed file gets a new key, so edits from the web admin are picked up
+    on the next lookup; the outdated entries are dropped at the same time.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[_Key, QtGui.QPixmap] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _cost(pixmap: QtGui.QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def _store(self, key: _Key, pixmap: QtGui.QPixmap) -> None:
+        for old in [k for k in self._items if k[0] == key[0] and k[1:3] != key[1:3]]:
+            self._bytes -= self._cost(self._items.pop(old))
+        self._items[key] = pixmap
+        self._bytes += self._cost(pixmap)
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self._bytes -= self._cost(evicted)
+
+    def _lookup(self, key: _Key) -> Optional[QtGui.QPixmap]:
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return pixmap
+
+    def pixmap(
+        self,
+        path: str | Path | None,
+        size: QtCore.QSize | None = None,
+        mode: str = FIT,
+    ) -> QtGui.QPixmap:
+        """Return ``path`` decoded (and scaled into ``size``); a null pixmap if unreadable."""
+        if not path:
+            return QtGui.QPixmap()
+        try:
+            st = Path(path).stat()
+        except OSError:
+            return QtGui.QPixmap()
+        width, height = (size.width(), size.height()) if size is not None else (0, 0)
+        key = (str(path), st.st_mtime_ns, st.st_size, width, height, mode if size is not None else '')
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        if size is None:
+            pixmap = QtGui.QPixmap(str(path))
+        else:
+            original = self.pixmap(path)
+            if original.isNull() or size.isEmpty():
+                return original
+            pixmap = original.scaled(
+                size,
+                QtCore.Qt.KeepAspectRatioByExpanding if mode == COVER else QtCore.Qt.KeepAspectRatio,
+                QtCore.Qt.SmoothTransformation,
+            )
+        if not pixmap.isNull():
+            self._store(key, pixmap)
+        return pixmap
+
+    def icon(self, path: str | Path | None, size: QtCore.QSize) -> QtGui.QIcon:
+        """Return an icon backed by the pre-scaled pixmap of ``path``."""
+        pixmap = self.pixmap(path, size)
+        return QtGui.QIcon(pixmap) if not pixmap.isNull() else QtGui.QIcon()
+
+    def warm(self, entries: Iterable[tuple[str | Path | None, QtCore.QSize | None, str]]) -> None:
+        """Decode and scale ``(path, size, mode)`` entries ahead of use."""
+        for path, size, mode in entries:
+            self.pixmap(path, size, mode)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+cache = PixmapCache()
@@ -0,0 +1,31 @@
+"""Startup timeline of the register GUI, printed to the log on every boot."""
+
+from __future__ import annotations
+
+from typing import Optional
+import time
+
+
+class StartupTimeline:
+    """Collects named milestones relative to the start of the process."""
+
+    def __init__(self, started: Optional[float] = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, label: str) -> float:
+        """Record ``label`` now and return the seconds since the start."""
+        elapsed = time.perf_counter() - self.started
+        self.marks.append((label, elapsed))
+        return elapsed
+
+    def summary(self) -> str:
+        steps = []
+        previous = 0.0
+        for label, elapsed in self.marks:
+            steps.append(f"{label} {elapsed * 1000:.0f} ms (+{(elapsed - previous) * 1000:.0f})")
+            previous = elapsed
+        return "Startzeiten: " + ", ".join(steps)
+
+    def log(self) -> None:
+        print(self.summary(), flush=True)
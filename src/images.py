@@ -0,0 +1,124 @@
+"""Normalise uploaded images once so the GUI only decodes display-sized files."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Optional
+import hashlib
+import io
+
+try:
+    from PIL import Image, ImageOps  # type: ignore
+except Exception as e:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+    ImageOps = None  # type: ignore
+    print(f"Pillow not available - images are stored unscaled: {e}")
+
+from .database import get_setting
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+IMAGE_DIR = DATA_DIR / 'images'
+
+# Bounding boxes of the pre-scaled variants. The tile size matches the largest
+# icon size used on the start page, the dialog size the drink image shown in
+# the quantity dialog.
+VARIANTS = {
+    'tile': (120, 120),
+    'dialog': (320, 320),
+}
+DEFAULT_SCREEN_SIZE = (1920, 1080)
+
+
+def screen_size() -> tuple[int, int]:
+    """Return the GUI screen size recorded by the main window."""
+    val = get_setting('screen_size') or ''
+    try:
+        w, h = (int(x) for x in val.split('x'))
+        if w > 0 and h > 0:
+            return w, h
+    except ValueError:
+        pass
+    return DEFAULT_SCREEN_SIZE
+
+
+def _open(data: bytes):
+    img = Image.open(io.BytesIO(data))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA')
+    return img
+
+
+def _save_scaled(img, size: tuple[int, int], dest: Path, cover: bool = False) -> None:
+    """Write ``img`` downscaled to fit (or, with ``cover``, to cover) ``size`` as PNG."""
+    scaled = img.copy()
+    if cover:
+        ratio = max(size[0] / img.width, size[1] / img.height)
+        if ratio < 1:
+            target = (max(1, round(img.width * ratio)), max(1, round(img.height * ratio)))
+            scaled = img.resize(target, Image.LANCZOS)
+    else:
+        scaled.thumbnail(size, Image.LANCZOS)
+    tmp = dest.with_name(f"tmp_{dest.name}")
+    scaled.save(tmp, format='PNG', optimize=True)
+    tmp.replace(dest)
+
+
+def _store_original(data: bytes, filename: str) -> Path:
+    """Store ``data`` under its content hash and return the path."""
+    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    suffix = Path(filename).suffix.lower() or '.png'
+    dest = IMAGE_DIR / f"{digest}{suffix}"
+    if not dest.exists():
+        dest.write_bytes(data)
+    return dest
+
+
+def save_drink_image(stream: IO[bytes], filename: str) -> str:
+    """Store an uploaded drink logo and its display variants.
+
+    Returns the path of the kept original, which is what ``drinks.image``
+    stores; use :func:`variant_path` to get a pre-scaled file.
+    """
+    data = stream.read()
+    original = _store_original(data, filename)
+    if Image is not None:
+        try:
+            img = _open(data)
+            for name, size in VARIANTS.items():
+                dest = original.with_name(f"{original.stem}_{name}.png")
+                if not dest.exists():
+                    _save_scaled(img, size, dest)
+        except Exception as exc:
+            print(f"Bild konnte nicht skaliert werden: {exc}")
+    return str(original)
+
+
+def save_background(stream: IO[bytes], filename: str, dest: Path, cover: bool = True) -> None:
+    """Store an uploaded screen image and write a screen-sized copy to ``dest``.
+
+    Backgrounds ``cover`` the screen; pass ``cover=False`` for images that
+    are shown whole, like the web QR code.
+    """
+    data = stream.read()
+    _store_original(data, filename)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if Image is not None:
+        try:
+            _save_scaled(_open(data), screen_size(), dest, cover=cover)
+            return
+        except Exception as exc:
+            print(f"Hintergrund konnte nicht skaliert werden: {exc}")
+    dest.write_bytes(data)
+
+
+def variant_path(image: Optional[str], variant: str) -> Optional[str]:
+    """Return the pre-scaled ``variant`` of ``image`` or ``image`` itself."""
+    if not image:
+        return image
+    path = Path(image)
+    candidate = path.with_name(f"{path.stem}_{variant}.png")
+    if candidate.exists():
+        return str(candidate)
+    return image
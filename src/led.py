@@ -1,9 +1,22 @@
-from __future__ import annotations
+"""Control for an external Arduino NeoPixel controller.
+
+The controller is chosen by ``$KASSE_LED`` or the ``led_backend`` setting:
+``serial`` (default) talks to the Arduino, ``sim`` only records the commands
+and ``off`` ignores them. It is opened on the first command, not on import.
+
+Commands are handed to a background worker, so the GUI never waits on the
+USB port. Every command sets the whole strip, so one that is still queued
+when a newer one arrives shortly after is skipped.
+"""
 
-"""Serial based control for an external Arduino NeoPixel controller."""
+from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from collections import deque
 from typing import Optional
 import os
+import threading
+import time
 
 try:
     import serial  # type: ignore
@@ -14,36 +27,246 @@ except Exception as e:  # pragma: no cover - optional dependency
 
 _PORT_CANDIDATES = ["/dev/ttyUSB0", "/dev/ttyACM0"]
 _BAUDRATE = 9600
+# Seconds between attempts to reopen a missing or unplugged controller.
+RECONNECT_INTERVAL = 2.0
+# Commands waiting for the worker; the oldest are dropped beyond this.
+QUEUE_SIZE = 16
+# A queued command is superseded by a newer one arriving within this time.
+COALESCE_WINDOW = 0.25
 
-_serial: Optional["serial.Serial"] = None
+# Environment variable that overrides the ``led_backend`` setting.
+BACKEND_ENV = 'KASSE_LED'
 
 
-def _init_serial() -> None:
-    global _serial
-    if serial is None:
-        return
-    for port in _PORT_CANDIDATES:
-        if not os.path.exists(port):
-            continue
-        try:
-            _serial = serial.Serial(port, _BAUDRATE, timeout=1)
-            break
-        except Exception as exc:  # pragma: no cover - hardware might be missing
-            print(f"LED serial port {port} could not be opened: {exc}")
-            _serial = None
-    if _serial is None:
-        print("LED controller not found - LEDs disabled")
+class LedController(ABC):
+    """Backend interface: receives one newline-terminated command at a time."""
 
+    @abstractmethod
+    def send(self, cmd: str) -> None:
+        ...
 
-_init_serial()
 
+class NullLed(LedController):
+    def send(self, cmd: str) -> None:
+        pass
 
-def _send(cmd: str) -> None:
-    if _serial and _serial.is_open:
+
+class SerialLed(LedController):
+    """Arduino on a USB serial port; reopened when it is plugged in again."""
+
+    def __init__(self) -> None:
+        self._serial: Optional["serial.Serial"] = None
+        self._next_attempt = 0.0
+        self._missing_reported = False
+        self.reconnects = 0
+        self._open()
+
+    def _open(self) -> bool:
+        self._next_attempt = time.monotonic() + RECONNECT_INTERVAL
+        if serial is None:
+            return False
+        for port in _PORT_CANDIDATES:
+            if not os.path.exists(port):
+                continue
+            try:
+                self._serial = serial.Serial(port, _BAUDRATE, timeout=1, write_timeout=1)
+            except Exception as exc:  # pragma: no cover - hardware might be missing
+                print(f"LED serial port {port} could not be opened: {exc}")
+                self._serial = None
+                continue
+            if self._missing_reported:
+                print(f"LED controller reconnected on {port}")
+                self.reconnects += 1
+            self._missing_reported = False
+            return True
+        if not self._missing_reported:
+            print("LED controller not found - LEDs disabled until it is plugged in")
+            self._missing_reported = True
+        return False
+
+    def _close(self) -> None:
+        try:
+            if self._serial:
+                self._serial.close()
+        except Exception:  # pragma: no cover - port already gone
+            pass
+        self._serial = None
+
+    def send(self, cmd: str) -> None:
+        if self._serial is None and (
+            time.monotonic() < self._next_attempt or not self._open()
+        ):
+            return
         try:
-            _serial.write(cmd.encode("utf-8"))
+            self._serial.write(cmd.encode("utf-8"))
         except Exception as exc:  # pragma: no cover - serial failure
             print(f"Error sending to LED controller: {exc}")
+            self._close()
+            self._missing_reported = True
+            self._next_attempt = time.monotonic()
+
+
+class SimulatedLed(LedController):
+    """Keeps the last commands with their time, for tests and load tests."""
+
+    def __init__(self, maxlen: int = 1000) -> None:
+        self.history: deque[tuple[float, str]] = deque(maxlen=maxlen)
+        self.counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def send(self, cmd: str) -> None:
+        cmd = cmd.strip()
+        with self._lock:
+            self.history.append((time.monotonic(), cmd))
+            self.counts[cmd] = self.counts.get(cmd, 0) + 1
+
+
+BACKENDS: dict[str, type[LedController]] = {
+    'serial': SerialLed,
+    'sim': SimulatedLed,
+    'off': NullLed,
+}
+
+_controller: Optional[LedController] = None
+_controller_lock = threading.Lock()
+
+
+def backend_name() -> str:
+    """Configured backend: ``$KASSE_LED``, else the ``led_backend`` setting."""
+    name = os.environ.get(BACKEND_ENV)
+    if not name:
+        try:
+            from . import database
+            name = database.get_setting('led_backend')
+        except Exception:
+            name = None
+    return name or 'serial'
+
+
+def get_controller() -> LedController:
+    """Return the process-wide controller, opening it on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            name = backend_name()
+            backend = BACKENDS.get(name)
+            if backend is None:
+                print(f"Unknown LED backend {name!r}, using serial")
+                backend = SerialLed
+            _controller = backend()
+        return _controller
+
+
+def set_controller(controller: Optional[LedController]) -> None:
+    """Replace the controller; ``None`` selects the configured one again."""
+    global _controller
+    with _controller_lock:
+        _controller = controller
+
+
+class LedWorker:
+    """Sends queued commands to the controller on a daemon thread."""
+
+    def __init__(
+        self,
+        queue_size: int = QUEUE_SIZE,
+        coalesce_window: float = COALESCE_WINDOW,
+    ) -> None:
+        self.coalesce_window = coalesce_window
+        self._queue: deque[tuple[float, str]] = deque()
+        self._queue_size = queue_size
+        self._cond = threading.Condition()
+        self._busy = False
+        self._last_sent: Optional[str] = None
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._thread = threading.Thread(target=self._run, name='led', daemon=True)
+        self._thread.start()
+
+    def submit(self, cmd: str) -> None:
+        now = time.monotonic()
+        with self._cond:
+            while self._queue and now - self._queue[-1][0] < self.coalesce_window:
+                self._queue.pop()
+                self.coalesced += 1
+            if not self._queue and not self._busy and cmd == self._last_sent:
+                # The strip already shows this state.
+                self.coalesced += 1
+                return
+            if len(self._queue) >= self._queue_size:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append((now, cmd))
+            self._cond.notify()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until all queued commands are sent; ``False`` on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def stats(self) -> dict[str, float]:
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "sent": self.sent,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "latency_avg_ms": round(self._latency_total / self.sent * 1000, 2) if self.sent else 0.0,
+                "latency_max_ms": round(self._latency_max * 1000, 2),
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue)
+                queued_at, cmd = self._queue.popleft()
+                self._busy = True
+            try:
+                get_controller().send(cmd)
+            except Exception as exc:  # pragma: no cover - backend failure
+                print(f"Error sending to LED controller: {exc}")
+                with self._cond:
+                    self.errors += 1
+            latency = time.monotonic() - queued_at
+            with self._cond:
+                self._busy = False
+                self._last_sent = cmd
+                self.sent += 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+                self._cond.notify_all()
+
+
+_worker: Optional[LedWorker] = None
+
+
+def _get_worker() -> LedWorker:
+    global _worker
+    with _controller_lock:
+        if _worker is None:
+            _worker = LedWorker()
+        return _worker
+
+
+def _send(cmd: str) -> None:
+    _get_worker().submit(cmd)
+
+
+def flush(timeout: float = 2.0) -> bool:
+    """Wait until the queued commands reached the controller."""
+    return _get_worker().flush(timeout)
+
+
+def stats() -> dict[str, float]:
+    """Queue and latency figures of the LED worker."""
+    result = _get_worker().stats()
+    result["reconnects"] = getattr(get_controller(), "reconnects", 0)
+    return result
 
 
 def indicate_waiting() -> None:
@@ -0,0 +1,227 @@
+"""Rotation, paging and search for the program logs written by ``start.sh``."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, Optional
+import gzip
+import io
+import re
+import shutil
+import threading
+import time
+
+LOG_DIR = Path(__file__).resolve().parent.parent / 'logs'
+
+# ``start.sh`` appends with ``tee -a``; the active file is rotated in place
+# (copy, then truncate), finished files are compressed as a whole.
+MAX_BYTES = 5 * 1024 * 1024
+MAX_AGE = 24 * 3600
+MAX_ARCHIVES = 200
+ROTATE_INTERVAL = 600
+
+PAGE_BYTES = 64 * 1024
+TAIL_BYTES = 256 * 1024
+MAX_MATCHES = 500
+
+_NAME_RE = re.compile(r'^log_[\w.-]+\.txt(\.gz)?$')
+_rotate_lock = threading.Lock()
+
+
+def log_path(name: str) -> Optional[Path]:
+    """Return the path of log ``name`` or ``None`` if it is not a log file."""
+    if not _NAME_RE.match(name):
+        return None
+    path = LOG_DIR / name
+    return path if path.is_file() else None
+
+
+def list_logs() -> list[dict]:
+    """Return all logs, newest first, with size and compression flag."""
+    if not LOG_DIR.exists():
+        return []
+    items = []
+    for path in LOG_DIR.iterdir():
+        if not _NAME_RE.match(path.name) or not path.is_file():
+            continue
+        st = path.stat()
+        items.append({
+            'name': path.name,
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'compressed': path.suffix == '.gz',
+        })
+    items.sort(key=lambda item: (item['mtime'], item['name']), reverse=True)
+    return items
+
+
+def _active_log() -> Optional[Path]:
+    plain = [LOG_DIR / item['name'] for item in list_logs() if not item['compressed']]
+    return plain[0] if plain else None
+
+
+def _gzip_file(src: Path, dest: Path, length: Optional[int] = None) -> None:
+    tmp = dest.with_name(f"tmp_{dest.name}")
+    with open(src, 'rb') as fin, gzip.open(tmp, 'wb') as fout:
+        if length is None:
+            shutil.copyfileobj(fin, fout)
+        else:
+            remaining = length
+            while remaining > 0:
+                chunk = fin.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                fout.write(chunk)
+                remaining -= len(chunk)
+    tmp.replace(dest)
+
+
+def _next_part(path: Path) -> Path:
+    n = 1
+    while True:
+        candidate = path.with_name(f"{path.stem}.{n}.txt.gz")
+        if not candidate.exists():
+            return candidate
+        n += 1
+
+
+def rotate(now: Optional[float] = None) -> list[str]:
+    """Compress finished logs older than ``MAX_AGE`` and split the active one above ``MAX_BYTES``.
+
+    Returns the names of the archives written.
+    """
+    if not LOG_DIR.exists():
+        return []
+    now = time.time() if now is None else now
+    written: list[str] = []
+    with _rotate_lock:
+        active = _active_log()
+        for item in list_logs():
+            if item['compressed']:
+                continue
+            path = LOG_DIR / item['name']
+            try:
+                if path == active:
+                    if item['size'] > MAX_BYTES:
+                        # copytruncate: the writer keeps its O_APPEND handle.
+                        dest = _next_part(path)
+                        _gzip_file(path, dest, item['size'])
+                        with open(path, 'r+b') as f:
+                            f.truncate(0)
+                        written.append(dest.name)
+                elif item['size'] > MAX_BYTES or now - item['mtime'] > MAX_AGE:
+                    dest = path.with_name(path.name + '.gz')
+                    _gzip_file(path, dest)
+                    path.unlink()
+                    written.append(dest.name)
+            except OSError as e:
+                print(f"Log konnte nicht rotiert werden: {path.name}: {e}")
+        archives = [item for item in list_logs() if item['compressed']]
+        for item in archives[MAX_ARCHIVES:]:
+            (LOG_DIR / item['name']).unlink(missing_ok=True)
+    return written
+
+
+def start_rotation(interval: float = ROTATE_INTERVAL) -> threading.Thread:
+    """Run :func:`rotate` now and then every ``interval`` seconds in the background."""
+    def run() -> None:
+        while True:
+            try:
+                rotate()
+            except Exception as e:  # pragma: no cover - keep the thread alive
+                print(f"Fehler bei der Logrotation: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _uncompressed_size(path: Path) -> int:
+    if path.suffix != '.gz':
+        return path.stat().st_size
+    # The gzip trailer stores the input size modulo 2**32.
+    with open(path, 'rb') as f:
+        f.seek(-4, io.SEEK_END)
+        return int.from_bytes(f.read(4), 'little')
+
+
+def _open_binary(path: Path):
+    return gzip.open(path, 'rb') if path.suffix == '.gz' else open(path, 'rb')
+
+
+def read_page(path: Path, offset: Optional[int] = None, length: int = PAGE_BYTES) -> dict:
+    """Read about ``length`` bytes from ``offset`` (``None`` = tail), cut at line ends.
+
+    Only the requested window is read; compressed files are decompressed up
+    to the window without being held in memory.
+    """
+    size = _uncompressed_size(path)
+    if offset is None:
+        offset = max(size - length, 0)
+    offset = min(max(offset, 0), size)
+    with _open_binary(path) as f:
+        f.seek(offset)
+        data = f.read(length)
+    start, end = offset, offset + len(data)
+    if start > 0:
+        cut = data.find(b'\n')
+        if cut >= 0:
+            data = data[cut + 1:]
+            start += cut + 1
+    if end < size:
+        cut = data.rfind(b'\n')
+        if cut >= 0:
+            end -= len(data) - cut - 1
+            data = data[:cut + 1]
+    return {
+        'text': data.decode('utf-8', errors='replace'),
+        'start': start,
+        'end': end,
+        'size': size,
+    }
+
+
+def search(
+    pattern: str,
+    names: Optional[list[str]] = None,
+    regex: bool = False,
+    ignore_case: bool = True,
+    max_matches: int = MAX_MATCHES,
+) -> Iterator[tuple[str, int, str]]:
+    """Yield ``(file, line number, line)`` for matching lines, newest file first.
+
+    Files are read line by line, compressed ones through gzip, so matches
+    can be streamed to the browser as they are found.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    matcher = re.compile(pattern if regex else re.escape(pattern), flags)
+    if names is None:
+        names = [item['name'] for item in list_logs()]
+    found = 0
+    for name in names:
+        path = log_path(name)
+        if path is None:
+            continue
+        with _open_binary(path) as f:
+            for number, raw in enumerate(f, 1):
+                line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+                if matcher.search(line):
+                    yield name, number, line
+                    found += 1
+                    if found >= max_matches:
+                        return
+
+
+def compressed_tail(max_bytes: int = TAIL_BYTES) -> Optional[tuple[str, bytes]]:
+    """Return the newest log's last ``max_bytes`` bytes gzip-compressed."""
+    active = _active_log()
+    if active is None:
+        return None
+    page = read_page(active, None, max_bytes)
+    return f"{active.name}.tail.gz", gzip.compress(page['text'].encode('utf-8'))
+
+
+if __name__ == '__main__':
+    for archive in rotate():
+        print(f"Rotiert: {archive}")
@@ -1,13 +1,19 @@
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, IO, Iterable, Optional
+import calendar
+import csv
+import io
+import itertools
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 import json
 from zoneinfo import ZoneInfo
 
 from .database import get_connection, get_setting, set_setting
-
-from . import rfid
+from .rfid_daemon import READ_TIMEOUT
 
 # Maximum number of transactions to keep in the log
 MAX_TRANSACTIONS = 10000
@@ -178,6 +184,11 @@ def get_event_payment_users() -> list[User]:
 
 
 def update_balance(user_id: int, diff: int) -> bool:
+    return change_balance(user_id, diff) is not None
+
+
+def change_balance(user_id: int, diff: int) -> Optional[int]:
+    """Add ``diff`` cents and return the new balance; ``None`` if refused."""
     try:
         with get_connection() as conn:
             cur = conn.execute(
@@ -188,18 +199,18 @@ def update_balance(user_id: int, diff: int) -> bool:
             )
             row = cur.fetchone()
             if not row or row['active'] == 0:
-                return False
+                return None
             new_balance = row['balance'] + diff
             if row['is_event'] == 0:
                 limit = get_overdraft_limit(conn)
                 if new_balance < -limit:
-                    return False
+                    return None
             conn.execute('UPDATE users SET balance = ? WHERE id = ?', (new_balance, user_id))
             conn.commit()
-        return True
+        return new_balance
     except sqlite3.Error as e:  # pragma: no cover - DB failure
         print(f"Fehler beim Aktualisieren des Guthabens: {e}")
-        return False
+        return None
 
 
 def add_transaction(user_id: int, drink_id: int, quantity: int) -> None:
@@ -261,6 +272,83 @@ def get_cash_user_id(conn: Optional[sqlite3.Connection] = None) -> int:
     return uid
 
 
+def book_basket(
+    user_id: int,
+    items: Iterable[tuple[int, int]],
+    charge: bool = True,
+    free: bool = False,
+) -> Optional[tuple[int, Optional[int]]]:
+    """Book several drinks for one user in a single transaction.
+
+    ``items`` are ``(drink_id, quantity)`` pairs. The total at the current
+    prices is debited unless ``charge`` is False (cash sales); on free days
+    the total is 0 but the card must still be valid. Returns the total in
+    cents and the new balance (``None`` without ``charge``), or ``None`` if
+    the basket is empty, contains a drink that no longer exists, or the user
+    is inactive or would exceed the overdraft limit, in which case nothing is
+    written.
+    """
+    quantities: dict[int, int] = {}
+    for drink_id, quantity in items:
+        if quantity > 0:
+            quantities[drink_id] = quantities.get(drink_id, 0) + quantity
+    if not quantities:
+        return None
+    conn = get_connection()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        prices = {
+            row['id']: row['price']
+            for row in conn.execute(
+                f"SELECT id, price FROM drinks WHERE id IN ({','.join('?' * len(quantities))})",
+                tuple(quantities),
+            )
+        }
+        if len(prices) != len(quantities):
+            # A drink was deleted while it sat in the basket.
+            conn.rollback()
+            return None
+        total = 0 if free else sum(prices[d] * q for d, q in quantities.items())
+        new_balance = None
+        if charge:
+            row = conn.execute(
+                'SELECT balance, is_event, active FROM users WHERE id = ? '
+                'AND (valid_from IS NULL OR valid_from <= DATE("now")) '
+                'AND (valid_until IS NULL OR valid_until >= DATE("now"))',
+                (user_id,),
+            ).fetchone()
+            if not row or row['active'] == 0:
+                conn.rollback()
+                return None
+            new_balance = row['balance'] - total
+            if row['is_event'] == 0 and new_balance < -get_overdraft_limit(conn):
+                conn.rollback()
+                return None
+            conn.execute('UPDATE users SET balance = ? WHERE id = ?', (new_balance, user_id))
+        now = _now()
+        for drink_id, quantity in quantities.items():
+            conn.execute('UPDATE drinks SET stock = stock - ? WHERE id = ?', (quantity, drink_id))
+            conn.execute(
+                'INSERT INTO transactions (user_id, drink_id, quantity, timestamp) '
+                'VALUES (?, ?, ?, ?)',
+                (user_id, drink_id, quantity, now),
+            )
+        conn.execute(
+            'DELETE FROM transactions WHERE id NOT IN ('
+            'SELECT id FROM transactions ORDER BY id DESC LIMIT ?)',
+            (MAX_TRANSACTIONS,))
+        conn.commit()
+    except sqlite3.Error as e:  # pragma: no cover - DB failure
+        conn.rollback()
+        print(f"Fehler beim Buchen des Warenkorbs: {e}")
+        return None
+    finally:
+        conn.close()
+    from . import database
+    database.touch_refresh_flag()
+    return total, new_balance
+
+
 def log_restock(drink_id: int, quantity: int) -> None:
     """Record a restock event."""
     try:
@@ -491,9 +579,311 @@ def get_new_low_stock_recommendations(days: int = 30, coverage_days: int = 21, r
     return [r for r in recs if r['id'] in new_low_ids]
 
 
-def rfid_read_for_web() -> Optional[str]:
-    """Read a UID for the web interface using the normal reader dialog."""
-    return rfid.read_uid()
+# Rows per executemany batch when importing users. Also bounds the number of
+# parameters of the "which UIDs exist already" lookup below SQLite's limit.
+IMPORT_CHUNK_SIZE = 500
+
+
+def _parse_import_rows(lines: Iterable[str]) -> Iterable[tuple[int, str, str, int | None]]:
+    """Yield ``(line, name, uid, balance)`` for each CSV data row."""
+    lines = iter(lines)
+    first = next(lines, '')
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=',;')
+    except csv.Error:
+        dialect = csv.get_dialect('excel')
+    reader = csv.DictReader(itertools.chain([first], lines), dialect=dialect)
+    for row in reader:
+        name = (row.get('name') or '').strip()
+        uid = (row.get('uid') or '').strip()
+        val = (row.get('balance_euro') or row.get('balance') or '0').strip()
+        try:
+            balance: int | None = round(float(val.replace(',', '.')) * 100)
+        except ValueError:
+            balance = None
+        yield reader.line_num, name, uid, balance
+
+
+def import_users_csv(
+    stream: IO[bytes],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress: Callable[[dict[str, int]], None] | None = None,
+) -> dict:
+    """Insert or update users from a CSV upload in a single transaction.
+
+    Existing UIDs get their name and balance replaced, so importing the same
+    file twice yields the same result. Returns counts of inserted, updated and
+    rejected rows plus the first few rejection reasons.
+    """
+    summary: dict = {'inserted': 0, 'updated': 0, 'rejected': 0, 'errors': []}
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    rows = _parse_import_rows(text)
+    seen: set[str] = set()
+    conn = get_connection()
+    try:
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            batch: list[tuple[str, str, int]] = []
+            for line, name, uid, balance in chunk:
+                if not name or not uid or balance is None:
+                    summary['rejected'] += 1
+                    if len(summary['errors']) < 20:
+                        reason = 'Betrag ungültig' if balance is None else 'Name oder UID fehlt'
+                        summary['errors'].append(f"Zeile {line}: {reason}")
+                    continue
+                batch.append((name, uid, balance))
+            uids = [uid for _, uid, _ in batch if uid not in seen]
+            if uids:
+                placeholders = ','.join('?' * len(uids))
+                seen.update(
+                    row[0] for row in conn.execute(
+                        f'SELECT rfid_uid FROM users WHERE rfid_uid IN ({placeholders})', uids
+                    )
+                )
+            for _, uid, _ in batch:
+                if uid in seen:
+                    summary['updated'] += 1
+                else:
+                    summary['inserted'] += 1
+                    seen.add(uid)
+            conn.executemany(
+                'INSERT INTO users (name, rfid_uid, balance) VALUES (?, ?, ?) '
+                'ON CONFLICT(rfid_uid) DO UPDATE SET '
+                'name=excluded.name, balance=excluded.balance',
+                batch,
+            )
+            if progress:
+                progress({k: summary[k] for k in ('inserted', 'updated', 'rejected')})
+        conn.commit()
+    except (sqlite3.Error, UnicodeDecodeError) as e:
+        conn.rollback()
+        summary['inserted'] = summary['updated'] = 0
+        summary['errors'].append(f"Import abgebrochen: {e}")
+    finally:
+        text.detach()
+        conn.close()
+    return summary
+
+
+# Sortable columns of the admin lists; the first entry is the default.
+USER_SORT_COLUMNS = {
+    'name': 'name COLLATE NOCASE',
+    'uid': 'rfid_uid COLLATE NOCASE',
+    'balance': 'balance',
+    'valid_until': 'valid_until',
+    'active': 'active',
+}
+DRINK_SORT_COLUMNS = {
+    'name': 'name COLLATE NOCASE',
+    'price': 'price',
+    'stock': 'stock',
+    'min_stock': 'min_stock',
+    'page': 'page',
+}
+
+
+def _like_prefix(query: str) -> str:
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+
+def _paged(
+    conn: sqlite3.Connection,
+    table: str,
+    where: list[str],
+    params: list,
+    order: str,
+    page: int,
+    per_page: int,
+) -> tuple[list[sqlite3.Row], int]:
+    clause = f" WHERE {' AND '.join(where)}" if where else ''
+    total = conn.execute(f'SELECT COUNT(*) FROM {table}{clause}', params).fetchone()[0]
+    rows = conn.execute(
+        f'SELECT * FROM {table}{clause} ORDER BY {order}, id LIMIT ? OFFSET ?',
+        [*params, per_page, (max(page, 1) - 1) * per_page],
+    ).fetchall()
+    return rows, total
+
+
+def search_users(
+    query: str = '',
+    is_event: bool = False,
+    sort: str = 'name',
+    desc: bool = False,
+    page: int = 1,
+    per_page: int = 25,
+) -> tuple[list[sqlite3.Row], int]:
+    """Return one page of users whose name or UID starts with ``query`` and the total count."""
+    where = ['is_event=?']
+    params: list = [1 if is_event else 0]
+    if query:
+        where.append("(name LIKE ? ESCAPE '\\' OR rfid_uid LIKE ? ESCAPE '\\')")
+        params += [_like_prefix(query)] * 2
+    order = USER_SORT_COLUMNS.get(sort, USER_SORT_COLUMNS['name']) + (' DESC' if desc else '')
+    with get_connection() as conn:
+        return _paged(conn, 'users', where, params, order, page, per_page)
+
+
+def search_drinks(
+    query: str = '', sort: str = 'name', desc: bool = False, page: int = 1, per_page: int = 25
+) -> tuple[list[sqlite3.Row], int]:
+    """Return one page of drinks whose name starts with ``query`` and the total count."""
+    where: list[str] = []
+    params: list = []
+    if query:
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append(_like_prefix(query))
+    order = DRINK_SORT_COLUMNS.get(sort, DRINK_SORT_COLUMNS['name']) + (' DESC' if desc else '')
+    with get_connection() as conn:
+        return _paged(conn, 'drinks', where, params, order, page, per_page)
+
+
+# Card reads requested by the web admin are queued in ``rfid_jobs`` and
+# carried out by the process that owns the reader (the GUI or the reader
+# daemon). Jobs nobody picked up within RFID_JOB_TIMEOUT seconds expire, as
+# do running ones without a result long after the reader gave up on them
+# (e.g. the GUI was restarted mid-read).
+RFID_JOB_TIMEOUT = 30
+RFID_JOB_RUNNING_TIMEOUT = READ_TIMEOUT + 20
+RFID_JOB_KEEP = 3600
+
+
+def create_rfid_job(running: bool = False) -> int:
+    """Queue a card read and return its job id.
+
+    ``running`` jobs are carried out by the caller, not by the GUI.
+    """
+    now = time.time()
+    with get_connection() as conn:
+        conn.execute("DELETE FROM rfid_jobs WHERE created < ?", (now - RFID_JOB_KEEP,))
+        cur = conn.execute(
+            "INSERT INTO rfid_jobs (status, created, updated) VALUES (?, ?, ?)",
+            ('running' if running else 'pending', now, now if running else None),
+        )
+        conn.commit()
+        return int(cur.lastrowid)
+
+
+def claim_rfid_job() -> Optional[int]:
+    """Mark the oldest pending job as running and return its id."""
+    now = time.time()
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE rfid_jobs SET status='failed', error='Zeitüberschreitung', updated=? "
+            "WHERE status='pending' AND created < ?",
+            (now, now - RFID_JOB_TIMEOUT),
+        )
+        conn.execute(
+            "UPDATE rfid_jobs SET status='failed', error='Lesevorgang abgebrochen', updated=? "
+            "WHERE status='running' AND updated < ?",
+            (now, now - RFID_JOB_RUNNING_TIMEOUT),
+        )
+        row = conn.execute(
+            "SELECT id FROM rfid_jobs WHERE status='pending' ORDER BY id LIMIT 1"
+        ).fetchone()
+        job_id = None
+        if row:
+            cur = conn.execute(
+                "UPDATE rfid_jobs SET status='running', updated=? WHERE id=? AND status='pending'",
+                (now, row['id']),
+            )
+            if cur.rowcount:
+                job_id = int(row['id'])
+        conn.commit()
+        return job_id
+
+
+def finish_rfid_job(job_id: int, uid: Optional[str], error: str | None = None) -> None:
+    """Store the result of a card read."""
+    if uid:
+        status, error = 'done', None
+    else:
+        status, error = 'failed', error or 'Keine Karte gelesen'
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE rfid_jobs SET status=?, uid=?, error=?, updated=? WHERE id=?",
+            (status, uid, error, time.time(), job_id),
+        )
+        conn.commit()
+
+
+def get_rfid_job(job_id: int) -> Optional[dict]:
+    """Return the state of a card-read job, expiring it if it got stuck."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT * FROM rfid_jobs WHERE id=?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = {'id': row['id'], 'status': row['status'], 'uid': row['uid'] or '', 'error': row['error'] or ''}
+    if job['status'] == 'pending' and row['created'] < time.time() - RFID_JOB_TIMEOUT:
+        job['status'] = 'failed'
+        job['error'] = 'Kein Kartenleser erreichbar (Kasse nicht gestartet?)'
+    elif job['status'] == 'running' and row['updated'] < time.time() - RFID_JOB_RUNNING_TIMEOUT:
+        job['status'] = 'failed'
+        job['error'] = 'Lesevorgang abgebrochen'
+    return job
+
+
+def wait_rfid_job(job_id: int, timeout: float, interval: float = 0.25) -> Optional[dict]:
+    """Return the job once it is finished or ``timeout`` seconds have passed."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_rfid_job(job_id)
+        if job is None or job['status'] in ('done', 'failed') or time.monotonic() >= deadline:
+            return job
+        time.sleep(interval)
+
+
+# Undelivered Telegram messages are given up after two days.
+TELEGRAM_MAX_AGE = 2 * 24 * 3600
+
+
+def queue_telegram(
+    method: str,
+    chat_id: str,
+    text: str | None = None,
+    filename: str | None = None,
+    document: bytes | None = None,
+) -> int:
+    """Store an outgoing Telegram message until it has been delivered."""
+    now = time.time()
+    with get_connection() as conn:
+        cur = conn.execute(
+            'INSERT INTO telegram_outbox (method, chat_id, text, filename, document, '
+            'next_attempt, created) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (method, chat_id, text, filename, document, now, now),
+        )
+        conn.commit()
+        return int(cur.lastrowid)
+
+
+def next_telegram_message() -> Optional[sqlite3.Row]:
+    """Return the oldest queued message; messages go out in order."""
+    with get_connection() as conn:
+        return conn.execute('SELECT * FROM telegram_outbox ORDER BY id LIMIT 1').fetchone()
+
+
+def delete_telegram_message(message_id: int) -> None:
+    with get_connection() as conn:
+        conn.execute('DELETE FROM telegram_outbox WHERE id=?', (message_id,))
+        conn.commit()
+
+
+def defer_telegram_message(message_id: int, delay: float, error: str) -> None:
+    """Count a failed attempt and schedule the next one in ``delay`` seconds."""
+    with get_connection() as conn:
+        conn.execute(
+            'UPDATE telegram_outbox SET attempts = attempts + 1, next_attempt = ?, error = ? '
+            'WHERE id = ?',
+            (time.time() + delay, error, message_id),
+        )
+        conn.commit()
+
+
+def count_telegram_messages() -> int:
+    with get_connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM telegram_outbox').fetchone()[0]
 
 
 def _month_list(months: int) -> list[str]:
@@ -584,6 +974,38 @@ def get_monthly_stats(months: int = 12) -> tuple[list[dict[str, int]], dict[str,
         conn.close()
 
 
+def get_today_totals(conn: Optional[sqlite3.Connection] = None) -> dict[str, int]:
+    """Return today's sale and topup counters for the live view."""
+    today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
+    own = conn is None
+    if own:
+        conn = get_connection()
+    try:
+        sales = conn.execute(
+            "SELECT COALESCE(SUM(t.quantity), 0) AS cnt, "
+            "COALESCE(SUM(t.quantity * d.price), 0) AS val, "
+            "COALESCE(SUM(CASE WHEN u.name='BARZAHLUNG' THEN t.quantity * d.price END), 0) AS cash "
+            "FROM transactions t JOIN drinks d ON d.id = t.drink_id "
+            "JOIN users u ON u.id = t.user_id WHERE t.timestamp >= ?",
+            (today,),
+        ).fetchone()
+        topups = conn.execute(
+            "SELECT COUNT(*) AS cnt, COALESCE(SUM(amount), 0) AS val "
+            "FROM topups WHERE timestamp >= ?",
+            (today,),
+        ).fetchone()
+    finally:
+        if own:
+            conn.close()
+    return {
+        "sales_count": int(sales["cnt"]),
+        "sales_value": int(sales["val"]),
+        "cash_value": int(sales["cash"]),
+        "topup_count": int(topups["cnt"]),
+        "topup_value": int(topups["val"]),
+    }
+
+
 def get_period_clause(period: str) -> str:
     """Return SQLite strftime clause for day/week/month grouping."""
     if period == "day":
@@ -593,39 +1015,225 @@ def get_period_clause(period: str) -> str:
     return "%Y-%m"
 
 
-def get_report_metrics(start: str | None = None, end: str | None = None) -> dict[str, list[sqlite3.Row]]:
-    """Return top articles, out-of-stock history and topup volumes."""
-    where = []
-    params: list[str] = []
+REPORT_PRESETS = ('day', 'week', 'month')
+REPORT_CACHE_SIZE = 16
+_report_cache: "OrderedDict[tuple, Report]" = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+@dataclass
+class Report:
+    """Figures shown on /reports, exported as CSV and sent via Telegram."""
+
+    start: str
+    end: str | None
+    top_articles: list[dict]
+    topup_count: int
+    topup_amount: int
+    stock: list[dict]
+    stockouts: list[dict]
+
+
+def report_range(period: str | None = None, start: str | None = None, end: str | None = None) -> tuple[str, str | None]:
+    """Resolve a day/week/month preset or explicit dates into ``[start, end)``.
+
+    Presets count back from today's local date; an explicit ``start``
+    without ``end`` is open-ended.
+    """
     if start:
-        where.append("timestamp >= ?")
-        params.append(start)
-    if end:
-        where.append("timestamp <= ?")
+        return start, end or None
+    today = datetime.now(LOCAL_TZ).date()
+    if period == 'day':
+        first = today - timedelta(days=1)
+    elif period == 'week':
+        first = today - timedelta(days=7)
+    else:
+        month = today.month - 1 or 12
+        year = today.year - (1 if today.month == 1 else 0)
+        first = today.replace(year=year, month=month, day=min(today.day, calendar.monthrange(year, month)[1]))
+    return first.isoformat(), None
+
+
+def _report_fingerprint(conn: sqlite3.Connection) -> tuple:
+    """Cheap snapshot of everything a report depends on."""
+    row = conn.execute(
+        "SELECT (SELECT MAX(id) FROM transactions), (SELECT COUNT(*) FROM transactions), "
+        "(SELECT MAX(id) FROM restocks), (SELECT COUNT(*) FROM restocks), "
+        "(SELECT MAX(id) FROM topups), (SELECT COUNT(*) FROM topups), "
+        "(SELECT group_concat(id || ':' || stock || ':' || min_stock || ':' || price || ':' || name) FROM drinks)"
+    ).fetchone()
+    return tuple(row)
+
+
+def _build_report(conn: sqlite3.Connection, start: str, end: str | None) -> Report:
+    drinks = {
+        row['id']: row
+        for row in conn.execute('SELECT id, name, price, stock, min_stock FROM drinks')
+    }
+    # Walk all sales and restocks since ``start`` backwards from the current
+    # stock. This yields the sold quantities per drink and every sale that
+    # emptied a drink. Manual stock corrections are not logged, so the
+    # reconstructed history is a best effort.
+    level = {drink_id: row['stock'] for drink_id, row in drinks.items()}
+    sold: dict[int, int] = {}
+    stockouts: dict[int, list[str]] = {}
+    events = conn.execute(
+        "SELECT drink_id, -quantity AS diff, timestamp FROM transactions WHERE timestamp >= ? "
+        "UNION ALL "
+        "SELECT drink_id, quantity AS diff, timestamp FROM restocks WHERE timestamp >= ? "
+        "ORDER BY timestamp DESC",
+        (start, start),
+    )
+    for drink_id, diff, ts in events:
+        if drink_id not in level:
+            continue
+        after = level[drink_id]
+        before = after - diff
+        level[drink_id] = before
+        if end is not None and ts >= end:
+            continue
+        if diff < 0:
+            sold[drink_id] = sold.get(drink_id, 0) - diff
+            if before > 0 >= after:
+                stockouts.setdefault(drink_id, []).append(ts)
+
+    top = sorted(
+        (
+            {
+                'drink_name': drinks[d]['name'],
+                'quantity': qty,
+                'revenue': qty * drinks[d]['price'],
+            }
+            for d, qty in sold.items()
+        ),
+        key=lambda r: (-r['quantity'], -r['revenue']),
+    )[:10]
+
+    params: list[str] = [start]
+    clause = 'timestamp >= ?'
+    if end is not None:
+        clause += ' AND timestamp < ?'
         params.append(end)
-    tx_where = f"WHERE {' AND '.join(where)}" if where else ""
-    topup_where = tx_where
+    topups = conn.execute(
+        f"SELECT COUNT(*) AS cnt, COALESCE(SUM(amount), 0) AS amount FROM topups WHERE {clause}",
+        params,
+    ).fetchone()
+
+    stock = []
+    for row in sorted(drinks.values(), key=lambda r: (r['stock'], r['name'])):
+        if row['stock'] <= 0:
+            status = 'kritisch'
+        elif row['stock'] < row['min_stock']:
+            status = 'niedrig'
+        else:
+            status = 'ok'
+        stock.append({
+            'name': row['name'],
+            'stock': row['stock'],
+            'min_stock': row['min_stock'],
+            'ratio': round(row['stock'] / row['min_stock'], 2) if row['min_stock'] > 0 else None,
+            'status': status,
+        })
 
+    history = sorted(
+        (
+            {
+                'drink_name': drinks[d]['name'],
+                'stockout_count': len(times),
+                'last_stockout': times[0],
+            }
+            for d, times in stockouts.items()
+        ),
+        key=lambda r: (-r['stockout_count'], r['drink_name']),
+    )
+    return Report(
+        start=start,
+        end=end,
+        top_articles=top,
+        topup_count=int(topups['cnt']),
+        topup_amount=int(topups['amount']),
+        stock=stock,
+        stockouts=history,
+    )
+
+
+def get_report(period: str | None = 'month', start: str | None = None, end: str | None = None) -> Report:
+    """Return the report for a preset or a ``[start, end)`` range.
+
+    Results are cached until sales, restocks, topups or drinks change.
+    """
+    start, end = report_range(period, start, end)
     with get_connection() as conn:
-        top_articles = conn.execute(
-            "SELECT d.name AS drink_name, SUM(t.quantity) AS quantity, "
-            "SUM(t.quantity * d.price) AS revenue "
-            "FROM transactions t JOIN drinks d ON d.id = t.drink_id "
-            f"{tx_where} GROUP BY d.id ORDER BY quantity DESC, revenue DESC LIMIT 10",
-            params,
-        ).fetchall()
-        out_of_stock = conn.execute(
-            "SELECT d.name AS drink_name, r.timestamp, d.stock "
-            "FROM restocks r JOIN drinks d ON d.id = r.drink_id "
-            "WHERE d.stock <= 0 ORDER BY r.timestamp DESC LIMIT 100"
-        ).fetchall()
-        topup_volume = conn.execute(
-            "SELECT SUM(amount) AS total_amount, COUNT(*) AS total_count FROM topups "
-            f"{topup_where}",
-            params,
-        ).fetchall()
-    return {
-        "top_articles": top_articles,
-        "out_of_stock": out_of_stock,
-        "topup_volume": topup_volume,
-    }
+        key = (start, end, _report_fingerprint(conn))
+        with _report_cache_lock:
+            report = _report_cache.get(key)
+            if report is not None:
+                _report_cache.move_to_end(key)
+                return report
+        report = _build_report(conn, start, end)
+    with _report_cache_lock:
+        _report_cache[key] = report
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    return report
+
+
+# Column lists and cursor columns for the JSON read API. ``since`` values
+# consisting only of digits are compared against the id column, everything
+# else against the timestamp column.
+_API_TABLES: dict[str, tuple[str, str, str | None]] = {
+    'drinks': (
+        'SELECT id, name, price, stock, min_stock, page, image FROM drinks',
+        'id',
+        None,
+    ),
+    'users': (
+        'SELECT id, name, rfid_uid, balance, is_event, active, show_on_payment, '
+        'valid_from, valid_until, created_at FROM users',
+        'id',
+        'created_at',
+    ),
+    'transactions': (
+        'SELECT t.id, t.timestamp, t.user_id, t.drink_id, d.name AS drink_name, '
+        't.quantity, d.price FROM transactions t JOIN drinks d ON d.id = t.drink_id',
+        't.id',
+        't.timestamp',
+    ),
+    'restocks': (
+        'SELECT r.id, r.timestamp, r.drink_id, d.name AS drink_name, r.quantity '
+        'FROM restocks r JOIN drinks d ON d.id = r.drink_id',
+        'r.id',
+        'r.timestamp',
+    ),
+    'topups': (
+        'SELECT t.id, t.timestamp, t.user_id, u.name AS user_name, t.amount '
+        'FROM topups t JOIN users u ON u.id = t.user_id',
+        't.id',
+        't.timestamp',
+    ),
+}
+
+
+def get_api_rows(
+    table: str, since: str | None = None, limit: int | None = None
+) -> list[dict]:
+    """Return rows of ``table`` in id order, optionally only newer than ``since``."""
+    base, id_col, ts_col = _API_TABLES[table]
+    query = base
+    params: list = []
+    if since:
+        if since.isdigit():
+            query += f' WHERE {id_col} > ?'
+            params.append(int(since))
+        elif ts_col is not None:
+            query += f' WHERE {ts_col} > ?'
+            params.append(since)
+    query += f' ORDER BY {id_col}'
+    if limit is not None:
+        query += f' LIMIT {int(limit)}'
+    try:
+        with get_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+    except sqlite3.Error as e:  # pragma: no cover
+        print(f"Fehler beim Lesen von {table}: {e}")
+        return []
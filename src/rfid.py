@@ -1,47 +1,271 @@
 """RFID UID Reader für MFRC522 — saubere UID-Abfrage ohne AUTH ERRORs."""
 
 from __future__ import annotations
+from abc import ABCMeta, abstractmethod
 from typing import Optional
-import time
+import json
+import os
+import socket
+import threading
 from PyQt5 import QtWidgets, QtCore
 
+from . import database
 from . import led
+from . import rfid_daemon
+from .rfid_daemon import (
+    DEBOUNCE,
+    POLL_INTERVAL,
+    READ_TIMEOUT,
+    CardScanner,
+    CardSource,
+    Mfrc522Source,
+    SimulatedSource,
+    setting_seconds,
+)
 
-try:
-    from mfrc522 import MFRC522
-    import RPi.GPIO as GPIO
-    GPIO.setwarnings(False)
-except Exception as e:  # pragma: no cover - hardware might be missing
-    MFRC522 = None  # type: ignore
-    GPIO = None  # type: ignore
-    print(f"RFID-Initialisierung fehlgeschlagen: {e}")
+# Environment variable that overrides the ``rfid_backend`` setting.
+BACKEND_ENV = 'KASSE_RFID'
 
-def read_uid(timeout: int = 10, show_dialog: bool = True) -> Optional[str]:
-    """Liest nur die UID mit MFRC522, zeigt GUI an, keine AUTH ERRORs mehr."""
 
-    if MFRC522 is None:
-        print("RFID-Reader nicht verfügbar")
-        if show_dialog:
-            QtWidgets.QMessageBox.warning(None, "RFID", "RFID-Reader nicht verfügbar")
-        return None
+class _CardReaderMeta(ABCMeta, type(QtCore.QObject)):
+    """QObject brings its own metaclass; combine it with ABCMeta."""
 
-    try:
-        reader = MFRC522()
-    except Exception as e:  # pragma: no cover - hardware might be missing
-        print(f"RFID-Reader nicht verfügbar: {e}")
+
+class CardReader(QtCore.QObject, metaclass=_CardReaderMeta):
+    """Reports cards on the reader to the GUI for the lifetime of the process.
+
+    A tap emits ``card_present`` once; the card is reported as removed via
+    ``card_removed`` only after it has been out of range for ``debounce``
+    seconds, so flickering reads and bouncing taps count as one.
+    """
+
+    card_present = QtCore.pyqtSignal(str)
+    card_removed = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self,
+        poll_interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+        parent: QtCore.QObject | None = None,
+    ) -> None:
+        if type(self).__abstractmethods__:
+            # sip creates the object itself, bypassing Python's abstract check.
+            raise TypeError(f"Can't instantiate abstract class {type(self).__name__}")
+        super().__init__(parent)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.available = False
+        self._uid: Optional[str] = None
+        self._cond = threading.Condition()
+
+    @abstractmethod
+    def start(self) -> bool:
+        """Start reporting cards; ``False`` if there is no reader."""
+
+    def stop(self) -> None:
+        """Stop and release the reader."""
+
+    @property
+    def current_uid(self) -> Optional[str]:
+        """UID of the card on the reader, ``None`` if there is none."""
+        return self._uid
+
+    def wait_for_card(self, timeout: float = READ_TIMEOUT) -> Optional[str]:
+        """Block the calling thread until a card is on the reader or ``timeout`` passes."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._uid is not None, timeout)
+            return self._uid
+
+    def _set_uid(self, uid: Optional[str]) -> None:
+        with self._cond:
+            old, self._uid = self._uid, uid
+            self._cond.notify_all()
+        if uid is None:
+            if old is not None:
+                self.card_removed.emit(old)
+        else:
+            print(f"Gelesene UID: {uid}")
+            self.card_present.emit(uid)
+
+
+class LocalReader(CardReader):
+    """Scans a :class:`~src.rfid_daemon.CardSource` owned by this process."""
+
+    def __init__(self, source: CardSource, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.source = source
+        self._scanner = CardScanner(source, self._set_uid, self.poll_interval, self.debounce)
+
+    def start(self) -> bool:
+        self.available = self._scanner.start()
+        return self.available
+
+    def stop(self) -> None:
+        self._scanner.stop()
+
+
+class Mfrc522Reader(LocalReader):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(Mfrc522Source(), *args, **kwargs)
+
+
+class SimulatedReader(LocalReader):
+    """Reader without hardware, for tests, benchmarks and load tests.
+
+    :meth:`tap` puts a card on the reader, e.g. when replaying a tap script
+    (see :mod:`src.tapscript`).
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(SimulatedSource(), *args, **kwargs)
+
+    def tap(self, uid: str, hold: float = 0.1) -> None:
+        """Hold the card ``uid`` on the reader for ``hold`` seconds."""
+        self.source.tap(uid, hold)
+
+
+class DaemonReader(CardReader):
+    """Client of the reader daemon (:mod:`src.rfid_daemon`).
+
+    Subscribes to the daemon's card events and reconnects when the daemon
+    restarts; the daemon applies polling and debouncing.
+    """
+
+    RECONNECT_INTERVAL = 1.0
+
+    def __init__(self, *args, path: str | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.path = path
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        if self._thread and self._thread.is_alive():
+            return True
+        if not rfid_daemon.daemon_running(self.path):
+            print("RFID-Daemon nicht erreichbar, verbinde sobald er läuft")
+        # Cards arrive as soon as the daemon is up; until then reads time out.
+        self.available = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='rfid-client', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(2.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with rfid_daemon.connect(self.path) as sock:
+                    self._sock = sock
+                    sock.sendall(b'{"op": "subscribe"}\n')
+                    with sock.makefile('rb') as events:
+                        for line in events:
+                            event = json.loads(line)
+                            if event.get('event') in ('state', 'present'):
+                                if event.get('uid') != self._uid:
+                                    self._set_uid(event.get('uid'))
+                            elif event.get('event') == 'removed':
+                                self._set_uid(None)
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._sock = None
+            if self._uid is not None:
+                self._set_uid(None)
+            self._stop.wait(self.RECONNECT_INTERVAL)
+
+
+BACKENDS: dict[str, type[CardReader]] = {
+    'mfrc522': Mfrc522Reader,
+    'sim': SimulatedReader,
+    'daemon': DaemonReader,
+}
+
+_reader: Optional[CardReader] = None
+
+
+def backend_name() -> str:
+    """Configured backend: ``$KASSE_RFID``, else the ``rfid_backend`` setting."""
+    name = os.environ.get(BACKEND_ENV)
+    if not name:
+        try:
+            name = database.get_setting('rfid_backend')
+        except Exception:
+            name = None
+    return name or 'mfrc522'
+
+
+def get_reader() -> CardReader:
+    """Return the process-wide reader, starting it on first use."""
+    global _reader
+    if _reader is None:
+        name = backend_name()
+        backend = BACKENDS.get(name)
+        if backend is None:
+            print(f"Unbekanntes RFID-Backend {name!r}, verwende mfrc522")
+            backend = Mfrc522Reader
+        _reader = backend(
+            poll_interval=setting_seconds('rfid_poll_ms', POLL_INTERVAL),
+            debounce=setting_seconds('rfid_debounce_ms', DEBOUNCE),
+        )
+        _reader.start()
+    return _reader
+
+
+def _wait_in_event_loop(reader: CardReader, timeout: float) -> Optional[str]:
+    if reader.current_uid is not None:
+        return reader.current_uid
+    loop = QtCore.QEventLoop()
+    found: list[str] = []
+
+    def on_card(uid: str) -> None:
+        found.append(uid)
+        loop.quit()
+
+    reader.card_present.connect(on_card)
+    timer = QtCore.QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+    timer.start(int(timeout * 1000))
+    # Re-check after connecting: a tap in between would otherwise be missed.
+    if reader.current_uid is None:
+        loop.exec_()
+    timer.stop()
+    reader.card_present.disconnect(on_card)
+    return found[0] if found else reader.current_uid
+
+
+def read_uid(timeout: int = READ_TIMEOUT, show_dialog: bool = True) -> Optional[str]:
+    """Wartet auf eine Karte am dauerhaft laufenden Leser und gibt ihre UID zurück.
+
+    Synchroner Wrapper um :class:`CardReader`: im GUI-Thread läuft die
+    Ereignisschleife weiter, in anderen Threads wird blockierend gewartet.
+    """
+    reader = get_reader()
+    if not reader.available:
+        print("RFID-Reader nicht verfügbar")
         if show_dialog:
             QtWidgets.QMessageBox.warning(None, "RFID", "RFID-Reader nicht verfügbar")
         return None
     led.indicate_waiting()
 
     app = QtWidgets.QApplication.instance()
-    created_app = False
-    if app is None:
-        app = QtWidgets.QApplication([])
-        created_app = True
+    in_gui_thread = app is not None and threading.current_thread() is threading.main_thread()
 
     msg_box = None
-    if show_dialog:
+    if show_dialog and in_gui_thread:
         msg_box = QtWidgets.QMessageBox()
         msg_box.setWindowTitle("RFID")
         msg_box.setText("Bitte Karte auflegen…")
@@ -60,49 +284,27 @@ def read_uid(timeout: int = 10, show_dialog: bool = True) -> Optional[str]:
         msg_box.showFullScreen()
         msg_box.show()
 
-    start_time = time.time()
-    uid_hex: Optional[str] = None
-
+    print("Bitte Karte auflegen...")
     try:
-        print("Bitte Karte auflegen...")
-        while time.time() - start_time < timeout:
-            app.processEvents()
-
-            (status, tag_type) = reader.MFRC522_Request(reader.PICC_REQIDL)
-
-            if status == reader.MI_OK:
-                (status, uid) = reader.MFRC522_Anticoll()
-                if status == reader.MI_OK:
-                    # The MFRC522 library returns five bytes where the last
-                    # byte is a BCC/checksum. Only return the first four bytes
-                    # to match the actual card UID.
-                    uid_hex = ''.join(f"{x:02X}" for x in uid[:4])
-                    print(f"Gelesene UID: {uid_hex}")
-                    time.sleep(1)
-                    break
-
-            time.sleep(0.1)
-
+        if in_gui_thread:
+            uid_hex = _wait_in_event_loop(reader, timeout)
+        else:
+            uid_hex = reader.wait_for_card(timeout)
         if uid_hex is None:
             print("Timeout: Keine Karte gelesen.")
-    except Exception as e:
-        print(f"Fehler beim Lesen: {e}")
     finally:
         if msg_box:
             msg_box.close()
-            app.processEvents()
-        if created_app:
-            app.quit()
-        if GPIO:
-            GPIO.cleanup()
         led.off()
 
     return uid_hex
 
 # Dummy-Test
 if __name__ == "__main__":
+    app = QtWidgets.QApplication([])
     uid = read_uid(timeout=10, show_dialog=True)
     if uid:
         print(f"UID erfolgreich gelesen: {uid}")
     else:
         print("Keine UID gelesen.")
+    get_reader().stop()
@@ -0,0 +1,406 @@
+"""Card reader daemon: the only process that touches the RFID hardware.
+
+The daemon scans the reader and serves a Unix domain socket speaking
+newline-delimited JSON. Each request is one object with an ``op``:
+
+- ``{"op": "subscribe"}`` turns the connection into an event stream: first
+  ``{"event": "state", "uid": ...}``, then ``present``/``removed`` events.
+- ``{"op": "read", "wait": 10}`` answers ``{"uid": ...}`` with the card
+  on the reader or the next one tapped (``null`` on timeout).
+- ``{"op": "status"}`` answers backend, current card and subscriber count.
+- ``{"op": "tap", "uid": ..., "hold": 0.1}`` puts a card on the simulated
+  reader (``--backend sim`` only).
+
+Start it with ``python -m src.rfid_daemon``; GUI and web admin connect as
+clients when ``KASSE_RFID=daemon``. This module does not need Qt.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Optional
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+# Seconds between two scans and how long a card may go unseen before it
+# counts as removed; both can be overridden with the settings
+# ``rfid_poll_ms`` and ``rfid_debounce_ms``.
+POLL_INTERVAL = 0.05
+DEBOUNCE = 0.4
+READ_TIMEOUT = 10
+
+SOCKET_PATH = Path(__file__).resolve().parent.parent / 'data' / 'rfid.sock'
+# Environment variable that overrides SOCKET_PATH for daemon and clients.
+SOCKET_ENV = 'KASSE_RFID_SOCKET'
+
+
+def socket_path() -> Path:
+    return Path(os.environ.get(SOCKET_ENV) or SOCKET_PATH)
+
+
+class CardSource(ABC):
+    """A card reader that can be asked for the UID currently in range."""
+
+    def open(self) -> bool:
+        return True
+
+    @abstractmethod
+    def scan(self) -> Optional[str]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class Mfrc522Source(CardSource):
+    """MFRC522 on the Raspberry Pi's SPI bus; the driver is imported on open."""
+
+    def __init__(self) -> None:
+        self._reader = None
+        self._gpio = None
+
+    def open(self) -> bool:
+        try:
+            from mfrc522 import MFRC522
+            import RPi.GPIO as GPIO
+            GPIO.setwarnings(False)
+            self._reader = MFRC522()
+        except Exception as e:  # pragma: no cover - hardware might be missing
+            print(f"RFID-Initialisierung fehlgeschlagen: {e}")
+            return False
+        self._gpio = GPIO
+        return True
+
+    def scan(self) -> Optional[str]:
+        reader = self._reader
+        (status, _tag_type) = reader.MFRC522_Request(reader.PICC_REQIDL)
+        if status != reader.MI_OK:
+            return None
+        (status, uid) = reader.MFRC522_Anticoll()
+        if status != reader.MI_OK:
+            return None
+        # The MFRC522 library returns five bytes where the last byte is a
+        # BCC/checksum. Only return the first four bytes to match the actual
+        # card UID.
+        return ''.join(f"{x:02X}" for x in uid[:4])
+
+    def close(self) -> None:
+        if self._gpio:
+            self._gpio.cleanup()
+
+
+class SimulatedSource(CardSource):
+    """Reader without hardware; :meth:`tap` holds a card on it for a while."""
+
+    def __init__(self) -> None:
+        self._card: Optional[tuple[str, float]] = None
+        self._lock = threading.Lock()
+
+    def tap(self, uid: str, hold: float = 0.1) -> None:
+        with self._lock:
+            self._card = (uid, time.monotonic() + hold)
+
+    def scan(self) -> Optional[str]:
+        with self._lock:
+            if self._card is None:
+                return None
+            uid, until = self._card
+            if time.monotonic() > until:
+                self._card = None
+                return None
+            return uid
+
+
+SOURCES: dict[str, type[CardSource]] = {
+    'mfrc522': Mfrc522Source,
+    'sim': SimulatedSource,
+}
+
+
+class CardScanner:
+    """Polls a :class:`CardSource` in a thread and debounces the result.
+
+    ``on_change`` is called from the scan thread with the new UID, or with
+    ``None`` once the card has been out of range for ``debounce`` seconds.
+    """
+
+    def __init__(
+        self,
+        source: CardSource,
+        on_change: Callable[[Optional[str]], None],
+        poll_interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+    ) -> None:
+        self.source = source
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.uid: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        if self._thread and self._thread.is_alive():
+            return True
+        if not self.source.open():
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='rfid', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(max(1.0, self.poll_interval * 4))
+            self._thread = None
+        self.source.close()
+
+    def _change(self, uid: Optional[str]) -> None:
+        self.uid = uid
+        self.on_change(uid)
+
+    def _run(self) -> None:
+        last_seen = 0.0
+        while not self._stop.is_set():
+            try:
+                uid = self.source.scan()
+            except Exception as e:
+                print(f"Fehler beim Lesen: {e}")
+                uid = None
+            now = time.monotonic()
+            if uid is not None:
+                last_seen = now
+                if uid != self.uid:
+                    if self.uid is not None:
+                        self._change(None)
+                    self._change(uid)
+            elif self.uid is not None and now - last_seen > self.debounce:
+                self._change(None)
+            self._stop.wait(self.poll_interval)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: '_Server'
+
+    def handle(self) -> None:
+        daemon = self.server.owner
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request.get('op')
+            except (ValueError, AttributeError):
+                self._reply({'error': 'ungültige Anfrage'})
+                continue
+            if op == 'subscribe':
+                daemon._subscribe(self.wfile)
+                # Keep the connection open until the client goes away.
+                for _ in self.rfile:
+                    pass
+                daemon._unsubscribe(self.wfile)
+                return
+            try:
+                if op == 'read':
+                    wait = float(request.get('wait', READ_TIMEOUT))
+                    self._reply({'uid': daemon.wait_for_card(wait)})
+                elif op == 'status':
+                    self._reply(daemon.status())
+                elif op == 'tap' and isinstance(daemon.scanner.source, SimulatedSource):
+                    daemon.scanner.source.tap(str(request['uid']), float(request.get('hold', 0.1)))
+                    self._reply({'ok': True})
+                else:
+                    self._reply({'error': f'unbekannte Operation {op!r}'})
+            except (KeyError, ValueError, TypeError) as e:
+                self._reply({'error': f'ungültige Anfrage für {op!r}: {e!r}'})
+
+    def _reply(self, message: dict) -> None:
+        self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    owner: 'ReaderDaemon'
+
+
+class ReaderDaemon:
+    """Owns a card source and publishes its events on a Unix socket."""
+
+    def __init__(
+        self,
+        source: CardSource,
+        path: Path | str | None = None,
+        poll_interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+    ) -> None:
+        self.path = Path(path) if path else socket_path()
+        self.scanner = CardScanner(source, self._on_change, poll_interval, debounce)
+        self._cond = threading.Condition()
+        self._subscribers: list = []
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Open the reader and start serving.
+
+        Returns ``False`` if there is no reader or another daemon already
+        serves ``path``; its socket is left alone then.
+        """
+        if daemon_running(self.path):
+            print(f"RFID-Daemon läuft bereits auf {self.path}")
+            return False
+        if not self.scanner.start():
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        self._server = _Server(str(self.path), _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name='rfid-daemon', daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.scanner.stop()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def wait_for_card(self, timeout: float) -> Optional[str]:
+        with self._cond:
+            self._cond.wait_for(lambda: self.scanner.uid is not None, timeout)
+            return self.scanner.uid
+
+    def status(self) -> dict:
+        with self._cond:
+            subscribers = len(self._subscribers)
+        return {
+            'backend': type(self.scanner.source).__name__,
+            'uid': self.scanner.uid,
+            'subscribers': subscribers,
+        }
+
+    def _subscribe(self, wfile) -> None:
+        with self._cond:
+            self._send(wfile, {'event': 'state', 'uid': self.scanner.uid})
+            self._subscribers.append(wfile)
+
+    def _unsubscribe(self, wfile) -> None:
+        with self._cond:
+            if wfile in self._subscribers:
+                self._subscribers.remove(wfile)
+
+    @staticmethod
+    def _send(wfile, message: dict) -> bool:
+        try:
+            wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+            wfile.flush()
+            return True
+        except (OSError, ValueError):
+            # ValueError: the handler already closed the stream.
+            return False
+
+    def _on_change(self, uid: Optional[str]) -> None:
+        if uid is None:
+            message = {'event': 'removed'}
+        else:
+            print(f"Gelesene UID: {uid}")
+            message = {'event': 'present', 'uid': uid}
+        with self._cond:
+            self._subscribers = [w for w in self._subscribers if self._send(w, message)]
+            self._cond.notify_all()
+
+
+def connect(path: Path | str | None = None, timeout: Optional[float] = None) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path or socket_path()))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(op: str, path: Path | str | None = None, timeout: float = 5.0, **fields) -> dict:
+    """Send one request to the daemon and return its answer."""
+    with connect(path, timeout) as sock:
+        sock.sendall(json.dumps({'op': op, **fields}).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("RFID-Daemon hat die Verbindung geschlossen")
+    return json.loads(line)
+
+
+def daemon_running(path: Path | str | None = None) -> bool:
+    try:
+        request('status', path, timeout=1.0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def read_card(timeout: float = READ_TIMEOUT, path: Path | str | None = None) -> Optional[str]:
+    """Wait for a card at the daemon's reader; ``None`` on timeout or error."""
+    try:
+        return request('read', path, timeout=timeout + 5, wait=timeout).get('uid')
+    except (OSError, ValueError) as e:
+        print(f"RFID-Daemon nicht erreichbar: {e}")
+        return None
+
+
+def setting_seconds(key: str, default: float) -> float:
+    """Read a millisecond setting such as ``rfid_poll_ms`` as seconds."""
+    try:
+        from . import database
+        value = database.get_setting(key)
+        return int(value) / 1000 if value else default
+    except Exception:
+        return default
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="RFID-Daemon der Getränkekasse")
+    parser.add_argument('--backend', choices=sorted(SOURCES), default='mfrc522')
+    parser.add_argument('--socket', help=f"Socket-Pfad (Standard: {SOCKET_PATH})")
+    args = parser.parse_args(argv)
+
+    daemon = ReaderDaemon(
+        SOURCES[args.backend](),
+        args.socket,
+        poll_interval=setting_seconds('rfid_poll_ms', POLL_INTERVAL),
+        debounce=setting_seconds('rfid_debounce_ms', DEBOUNCE),
+    )
+    if not daemon.start():
+        raise SystemExit("RFID-Daemon nicht gestartet")
+    print(f"RFID-Daemon ({args.backend}) lauscht auf {daemon.path}", flush=True)
+    # start.sh ends the daemon with SIGTERM; release the GPIO pins then, too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Tap scripts for the simulated card reader.
+
+A tap script is a list of ``(offset_seconds, uid)`` pairs. As a file it is
+plain text with one tap per line, e.g. ``12.5 TESTCARD123``; blank lines
+and lines starting with ``#`` are ignored.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+import random
+
+Tap = tuple[float, str]
+
+
+def generate(
+    rate_per_hour: float,
+    duration: float,
+    cards: Mapping[str, float],
+    seed: Optional[int] = None,
+) -> list[Tap]:
+    """Random taps over ``duration`` seconds at ``rate_per_hour`` on average.
+
+    Arrivals follow a Poisson process; ``cards`` maps each UID to its
+    relative weight, so regulars can tap more often than occasional guests.
+    """
+    if rate_per_hour <= 0 or duration <= 0 or not cards:
+        return []
+    rng = random.Random(seed)
+    uids = list(cards)
+    weights = [cards[uid] for uid in uids]
+    taps: list[Tap] = []
+    offset = rng.expovariate(rate_per_hour / 3600)
+    while offset < duration:
+        taps.append((round(offset, 3), rng.choices(uids, weights)[0]))
+        offset += rng.expovariate(rate_per_hour / 3600)
+    return taps
+
+
+def parse_distribution(text: str) -> dict[str, float]:
+    """Parse ``"UID1=5,UID2=1"``; a UID without weight counts 1."""
+    cards: dict[str, float] = {}
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        uid, _, weight = part.partition('=')
+        cards[uid.strip()] = float(weight) if weight else 1.0
+    return cards
+
+
+def scenario(
+    uids: Iterable[str],
+    rate_per_hour: float,
+    duration: float,
+    cards: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> list[Tap]:
+    """Generated taps for a load test.
+
+    ``cards`` is a distribution as accepted by :func:`parse_distribution`;
+    without it the ``uids`` are weighted so that regulars tap far more often
+    than occasional guests.
+    """
+    if cards:
+        weights = parse_distribution(cards)
+    else:
+        weights = {uid: 1 / (rank + 1) for rank, uid in enumerate(uids)}
+    return generate(rate_per_hour, duration, weights, seed)
+
+
+def parse(lines: Iterable[str]) -> list[Tap]:
+    taps: list[Tap] = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            offset, uid = line.split(None, 1)
+            taps.append((float(offset), uid.strip()))
+        except ValueError:
+            raise ValueError(f"Ungültige Zeile {number} im Tap-Skript: {line!r}") from None
+    taps.sort(key=lambda tap: tap[0])
+    return taps
+
+
+def load(path: str | Path) -> list[Tap]:
+    with open(path, encoding='utf-8') as f:
+        return parse(f)
+
+
+def dump(taps: Iterable[Tap], path: str | Path) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Sekunden UID\n")
+        for offset, uid in taps:
+            f.write(f"{offset:.3f} {uid}\n")
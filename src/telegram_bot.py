@@ -1,6 +1,5 @@
 import threading
 import time
-from pathlib import Path
 from typing import Optional
 import io
 import csv
@@ -8,14 +7,27 @@ import calendar   # <--- hinzugefügt
 
 import requests
 
-from . import models
+from . import logfiles, models
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-LOG_DIR = BASE_DIR / 'logs'
+# (connect, read) timeouts of the outgoing requests in seconds.
+SEND_TIMEOUT = (5, 30)
+# Telegram allows about one message per second in a private chat and
+# 20 per minute in a group (negative chat ids).
+SEND_INTERVAL = 1.0
+GROUP_SEND_INTERVAL = 3.0
+# Retry delays after network or server errors: 5 s, 10 s, ... up to 10 min.
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 600.0
 
 
 class TelegramNotifier:
-    """Simple Telegram bot for status reports."""
+    """Simple Telegram bot for status reports.
+
+    Outgoing messages are stored in the ``telegram_outbox`` table and sent
+    by a worker thread over one keep-alive session, in order, paced to
+    Telegram's rate limits and retried after errors, so a network outage
+    only delays them.
+    """
 
     def __init__(self) -> None:
         self.token: str = ''
@@ -23,7 +35,12 @@ class TelegramNotifier:
         self.offset: int = 0
         self.last_month: str = ''
         self.thread: Optional[threading.Thread] = None
+        self.sender: Optional[threading.Thread] = None
         self.running = False
+        self.session = requests.Session()
+        self._poll_session = requests.Session()
+        self._wake = threading.Event()
+        self._not_before = 0.0
         self.reload_settings()
 
     def reload_settings(self) -> None:
@@ -39,47 +56,127 @@ class TelegramNotifier:
         return bool(self.token and self.chat_id)
 
     # --- Sending --------------------------------------------------------------
-    def send_message(self, text: str) -> None:
+    def _enqueue(
+        self,
+        method: str,
+        text: str | None = None,
+        filename: str | None = None,
+        document: bytes | None = None,
+    ) -> None:
         if not self._enabled():
             return
-        try:
-            requests.post(self._api('sendMessage'), json={'chat_id': self.chat_id, 'text': text})
-        except Exception:
-            pass
+        models.queue_telegram(method, self.chat_id, text, filename, document)
+        self._start_sender()
+        self._wake.set()
+
+    def send_message(self, text: str) -> None:
+        self._enqueue('sendMessage', text=text)
 
     def send_logfile(self) -> None:
         if not self._enabled():
             return
-        try:
-            logs = sorted(LOG_DIR.glob('log_*.txt'))
-            if not logs:
-                return
-            with open(logs[-1], 'rb') as f:
-                requests.post(
-                    self._api('sendDocument'),
-                    data={'chat_id': self.chat_id},
-                    files={'document': f},
-                )
-        except Exception:
-            pass
+        tail = logfiles.compressed_tail()
+        if tail is None:
+            return
+        filename, data = tail
+        self._enqueue('sendDocument', filename=filename, document=data)
 
     def _send_csv(self, filename: str, headers: list[str], rows: list[tuple]) -> None:
         if not self._enabled():
             return
-        try:
-            buf = io.StringIO()
-            writer = csv.writer(buf)
-            writer.writerow(headers)
-            for row in rows:
-                writer.writerow(row)
-            data = buf.getvalue().encode('utf-8')
-            requests.post(
-                self._api('sendDocument'),
-                data={'chat_id': self.chat_id},
-                files={'document': (filename, data)},
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+        self._enqueue('sendDocument', filename=filename, document=buf.getvalue().encode('utf-8'))
+
+    # --- Delivery -------------------------------------------------------------
+    def _post(self, message) -> requests.Response:
+        if message['method'] == 'sendMessage':
+            return self.session.post(
+                self._api('sendMessage'),
+                json={'chat_id': message['chat_id'], 'text': message['text']},
+                timeout=SEND_TIMEOUT,
             )
-        except Exception:
-            pass
+        return self.session.post(
+            self._api(message['method']),
+            data={'chat_id': message['chat_id']},
+            files={'document': (message['filename'], message['document'])},
+            timeout=SEND_TIMEOUT,
+        )
+
+    def _retry(self, message, error: str) -> None:
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** message['attempts'])
+        print(f"Telegram: Senden fehlgeschlagen ({error}), neuer Versuch in {delay:.0f} s")
+        models.defer_telegram_message(message['id'], delay, error)
+
+    def deliver_pending(self) -> Optional[float]:
+        """Send the oldest queued message if it is due.
+
+        Returns the seconds to wait before the next call, ``0`` to continue
+        at once, or ``None`` when the queue is empty.
+        """
+        message = models.next_telegram_message()
+        if message is None:
+            return None
+        now = time.time()
+        if message['created'] < now - models.TELEGRAM_MAX_AGE:
+            print(f"Telegram: Nachricht {message['id']} nach {message['attempts']} Versuchen verworfen")
+            models.delete_telegram_message(message['id'])
+            return 0
+        wait = max(message['next_attempt'], self._not_before) - now
+        if wait > 0:
+            return wait
+        if not self.token:
+            models.defer_telegram_message(message['id'], 60, 'Kein Bot-Token')
+            return 0
+        try:
+            resp = self._post(message)
+        except requests.RequestException as e:
+            self._retry(message, type(e).__name__)
+            return 0
+        interval = GROUP_SEND_INTERVAL if str(message['chat_id']).startswith('-') else SEND_INTERVAL
+        self._not_before = time.time() + interval
+        if resp.ok:
+            models.delete_telegram_message(message['id'])
+            return 0
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        description = body.get('description') or f"HTTP {resp.status_code}"
+        if resp.status_code == 429:
+            retry_after = float(body.get('parameters', {}).get('retry_after', BACKOFF_BASE))
+            self._not_before = time.time() + retry_after
+            models.defer_telegram_message(message['id'], retry_after, description)
+        elif resp.status_code in (400, 403):
+            # Rejected content or a bot removed from the chat: retrying cannot help.
+            print(f"Telegram lehnt Nachricht {message['id']} ab: {description}")
+            models.delete_telegram_message(message['id'])
+        else:
+            self._retry(message, description)
+        return 0
+
+    def _deliver_loop(self) -> None:
+        while self.running:
+            self._wake.clear()
+            try:
+                wait = self.deliver_pending()
+            except Exception as e:
+                print(f"Telegram: Fehler in der Zustellung: {e}")
+                wait = BACKOFF_BASE
+            if wait is None:
+                self._wake.wait()
+            elif wait > 0:
+                self._wake.wait(wait)
+
+    def _start_sender(self) -> None:
+        if self.sender and self.sender.is_alive():
+            return
+        self.running = True
+        self.sender = threading.Thread(target=self._deliver_loop, name='telegram-send', daemon=True)
+        self.sender.start()
 
     def send_datafiles(self) -> None:
         if not self._enabled():
@@ -103,8 +200,8 @@ class TelegramNotifier:
                 ['drink', 'stock'],
                 [(d.name, d.stock) for d in drinks],
             )
-        except Exception:
-            pass
+        except Exception as e:
+            print(f"Telegram: Datendateien konnten nicht erstellt werden: {e}")
 
     def build_status(self) -> str:
         drinks = models.get_drinks_below_min()
@@ -131,6 +228,16 @@ class TelegramNotifier:
             lines.append(
                 f"Barverkäufe: {s['cash_value']/100:.2f} € ({s['cash_count']})"
             )
+        report = models.get_report('month')
+        if report.top_articles:
+            lines.append('')
+            lines.append('Top-Artikel (letzter Monat):')
+            for r in report.top_articles[:5]:
+                lines.append(f"- {r['drink_name']}: {r['quantity']}")
+        if report.stockouts:
+            lines.append('Ausverkauft: ' + ', '.join(
+                f"{r['drink_name']} ({r['stockout_count']}x)" for r in report.stockouts
+            ))
         return '\n'.join(lines)
 
 
@@ -156,7 +263,7 @@ class TelegramNotifier:
         while self.running:
             try:
                 if self._enabled():
-                    resp = requests.get(
+                    resp = self._poll_session.get(
                         self._api('getUpdates'),
                         params={'timeout': 60, 'offset': self.offset + 1},
                         timeout=70,
@@ -166,6 +273,7 @@ class TelegramNotifier:
                         self.offset = max(self.offset, upd['update_id'])
                         msg = upd.get('message', {}).get('text', '')
                         if msg.strip() == '/status':
+                            # Only queues the report; the sender thread delivers it.
                             self.send_status()
 
                 # --- Monatsreport: am letzten Tag des Monats um 13:00 ---
@@ -180,11 +288,12 @@ class TelegramNotifier:
                         self.last_month = month_tag
                         self.send_status(include_files=False)
 
-            except Exception:
-                pass
+            except Exception as e:
+                print(f"Telegram: Abfrage fehlgeschlagen: {e}")
             time.sleep(5)
 
     def start(self) -> None:
+        self._start_sender()
         if self.thread and self.thread.is_alive():
             return
         self.running = True
@@ -193,6 +302,7 @@ class TelegramNotifier:
 
     def stop(self) -> None:
         self.running = False
+        self._wake.set()
 
 
 notifier = TelegramNotifier()
@@ -1,35 +1,32 @@
 from __future__ import annotations
 
+from datetime import datetime
 from functools import wraps
 from pathlib import Path
 from typing import Optional
 import sqlite3
+import threading
 
 from .. import admin_auth
 
 from flask import Flask, redirect, render_template, request, session, url_for, send_file
-from flask import jsonify, make_response
+from flask import Response, jsonify, make_response, stream_template, stream_with_context
 import csv
 import io
-from fpdf import FPDF
+import re
 
 
-from .. import database, models
+from .. import database, images, logfiles, models, rfid_daemon
+from . import live, statements
+from .metrics import metrics
 from ..telegram_bot import notifier
 
 
-def _date_filter_clause(period: str) -> str:
-    if period == "day":
-        return "date('now', '-1 day')"
-    if period == "week":
-        return "date('now', '-7 day')"
-    return "date('now', '-1 month')"
-
-
 def create_app() -> Flask:
     app = Flask(__name__)
     app.secret_key = 'change-me'
     PER_PAGE = 25
+    metrics.install(app)
 
     def login_required(func):
         @wraps(func)
@@ -40,13 +37,33 @@ def create_app() -> Flask:
         return wrapper
 
 
-    @app.route('/read_uid')
+    def _daemon_read(job_id: int) -> None:
+        try:
+            models.finish_rfid_job(job_id, rfid_daemon.read_card())
+        except Exception as e:
+            print(f"Fehler beim Lesen über den RFID-Daemon: {e}")
+            models.finish_rfid_job(job_id, None, str(e))
+
+    @app.route('/read_uid', methods=['POST'])
     @login_required
     def read_uid():
-        uid = models.rfid_read_for_web()
-        if uid is None:
-            return jsonify({'uid': '', 'error': 'RFID-Reader nicht verfügbar'})
-        return jsonify({'uid': uid})
+        # The hardware belongs to the reader daemon or, without one, to the
+        # GUI process; never touch it from a request thread.
+        if rfid_daemon.daemon_running():
+            job_id = models.create_rfid_job(running=True)
+            threading.Thread(target=_daemon_read, args=(job_id,), daemon=True).start()
+        else:
+            job_id = models.create_rfid_job()
+        return jsonify({'job': job_id, 'url': url_for('read_uid_result', job_id=job_id)}), 202
+
+    @app.route('/read_uid/<int:job_id>')
+    @login_required
+    def read_uid_result(job_id: int):
+        wait = min(max(request.args.get('wait', 20, type=float), 0), 25)
+        job = models.wait_rfid_job(job_id, wait)
+        if job is None:
+            return jsonify({'status': 'failed', 'uid': '', 'error': 'Unbekannter Leseauftrag'}), 404
+        return jsonify(job)
 
     @app.route('/user_name')
     @login_required
@@ -81,37 +98,67 @@ def create_app() -> Flask:
         stats, totals = models.get_monthly_stats()
         return render_template('dashboard.html', stats=stats, totals=totals)
 
-    @app.route('/reports')
+    @app.route('/metrics')
+    def metrics_export():
+        # Scrapers on the register itself need no login.
+        if not session.get('user') and request.remote_addr not in ('127.0.0.1', '::1'):
+            return redirect(url_for('login'))
+        return Response(metrics.exposition(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/status', methods=['GET', 'POST'])
     @login_required
-    def reports():
+    def status():
+        if request.method == 'POST':
+            metrics.reset()
+            return redirect(url_for('status'))
+        return render_template(
+            'status.html',
+            stats=metrics.snapshot(),
+            started=datetime.fromtimestamp(metrics.started).strftime('%d.%m.%Y %H:%M:%S'),
+        )
+
+    @app.route('/live')
+    @login_required
+    def live_view():
+        conn = database.get_connection()
+        try:
+            # One read transaction, so the counters and the cursor the
+            # browser subscribes from describe the same state.
+            conn.execute('BEGIN')
+            totals = models.get_today_totals(conn)
+            cursor = live.format_cursor(live.max_cursor(conn))
+            conn.commit()
+        finally:
+            conn.close()
+        drinks = models.get_drinks()
+        return render_template('live.html', totals=totals, drinks=drinks, cursor=cursor)
+
+    @app.route('/live/events')
+    @login_required
+    def live_events():
+        last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        resp = Response(
+            stream_with_context(live.feed.stream(last_id)),
+            mimetype='text/event-stream',
+        )
+        resp.headers['Cache-Control'] = 'no-cache'
+        resp.headers['X-Accel-Buffering'] = 'no'
+        return resp
+
+    def _report_args() -> tuple[str, Optional[str], Optional[str]]:
         period = request.args.get('period', default='month', type=str)
-        if period not in {'day', 'week', 'month'}:
+        if period not in models.REPORT_PRESETS:
             period = 'month'
-        date_clause = _date_filter_clause(period)
-        conn = database.get_connection()
-        top_articles = conn.execute(
-            "SELECT d.name AS drink_name, SUM(t.quantity) AS quantity, "
-            "SUM(t.quantity * d.price) AS revenue "
-            "FROM transactions t JOIN drinks d ON d.id = t.drink_id "
-            f"WHERE DATE(t.timestamp) >= {date_clause} "
-            "GROUP BY d.id ORDER BY quantity DESC, revenue DESC LIMIT 10"
-        ).fetchall()
-        topups = conn.execute(
-            "SELECT COALESCE(SUM(amount), 0) AS amount, COUNT(*) AS count "
-            f"FROM topups WHERE DATE(timestamp) >= {date_clause}"
-        ).fetchone()
-        stock = conn.execute(
-            "SELECT name, stock, min_stock, CASE WHEN min_stock > 0 THEN ROUND(stock * 1.0 / min_stock, 2) ELSE NULL END AS ratio "
-            "FROM drinks ORDER BY stock ASC, name"
-        ).fetchall()
-        conn.close()
-        recommendations = models.get_purchase_recommendations(days=30, coverage_days=21, replenish_cycle_days=45)
-        forecast = []
-        for row in stock:
-            ratio = row["ratio"]
-            status = "kritisch" if row["stock"] <= 0 else ("niedrig" if row["stock"] < row["min_stock"] else "ok")
-            forecast.append({"name": row["name"], "stock": row["stock"], "min_stock": row["min_stock"], "ratio": ratio, "status": status})
-        return render_template("reports.html", period=period, top_articles=top_articles, topups=topups, forecast=forecast, recommendations=recommendations)
+        start = request.args.get('start') or None
+        end = request.args.get('end') or None
+        return period, start, end
+
+    @app.route('/reports')
+    @login_required
+    def reports():
+        period, start, end = _report_args()
+        report = models.get_report(period, start, end)
+        return render_template('reports.html', period=period, start=start or '', end=end or '', report=report)
 
 
 
@@ -213,20 +260,16 @@ def create_app() -> Flask:
             current_free_day = new_free_day
             qr_file = request.files.get('qr_code')
             if qr_file and qr_file.filename:
-                data_dir.mkdir(parents=True, exist_ok=True)
-                qr_file.save(qr_path)
+                images.save_background(qr_file.stream, qr_file.filename, qr_path, cover=False)
             bg_file = request.files.get('background')
             if bg_file and bg_file.filename:
-                data_dir.mkdir(parents=True, exist_ok=True)
-                bg_file.save(bg_path)
+                images.save_background(bg_file.stream, bg_file.filename, bg_path)
             thank_file = request.files.get('thank_background')
             if thank_file and thank_file.filename:
-                data_dir.mkdir(parents=True, exist_ok=True)
-                thank_file.save(thank_path)
+                images.save_background(thank_file.stream, thank_file.filename, thank_path)
             free_file = request.files.get('free_background')
             if free_file and free_file.filename:
-                data_dir.mkdir(parents=True, exist_ok=True)
-                free_file.save(free_path)
+                images.save_background(free_file.stream, free_file.filename, free_path)
             database.touch_refresh_flag()
             conn.close()
             return redirect(url_for('settings'))
@@ -314,14 +357,31 @@ def create_app() -> Flask:
         session.pop('user', None)
         return redirect(url_for('login'))
 
+    def _list_args(endpoint: str, columns: dict[str, str]) -> dict:
+        """Read search, sort and page parameters of an admin list."""
+        default = next(iter(columns))
+        sort = request.args.get('sort', default=default, type=str)
+        return {
+            'endpoint': endpoint,
+            'q': (request.args.get('q') or '').strip(),
+            'sort': sort if sort in columns else default,
+            'desc': request.args.get('dir') == 'desc',
+            'page': max(request.args.get('page', default=1, type=int) or 1, 1),
+        }
+
+    def _paginate(listing: dict, total: int) -> dict:
+        listing['total'] = total
+        listing['pages'] = max((total + PER_PAGE - 1) // PER_PAGE, 1)
+        return listing
+
     @app.route('/drinks')
     @login_required
     def drinks(error: Optional[str] = None):
-        conn = database.get_connection()
-        cur = conn.execute('SELECT * FROM drinks ORDER BY name')
-        items = cur.fetchall()
-        conn.close()
-        return render_template('drinks.html', drinks=items, error=error)
+        listing = _list_args('drinks', models.DRINK_SORT_COLUMNS)
+        items, total = models.search_drinks(
+            listing['q'], listing['sort'], listing['desc'], listing['page'], PER_PAGE
+        )
+        return render_template('drinks.html', drinks=items, listing=_paginate(listing, total), error=error)
 
     @app.route('/drinks/add', methods=['POST'])
     @login_required
@@ -334,22 +394,15 @@ def create_app() -> Flask:
         image_file = request.files.get('image')
         image_path = None
         if image_file and image_file.filename:
-            image_dir = Path(__file__).resolve().parent.parent / 'data' / 'images'
-            image_dir.mkdir(parents=True, exist_ok=True)
-            dest = image_dir / image_file.filename
-            image_file.save(dest)
-            image_path = str(dest)
+            image_path = images.save_drink_image(image_file.stream, image_file.filename)
 
         if name and price_euro is not None:
             price = int(price_euro * 100)
             conn = database.get_connection()
             count = conn.execute('SELECT COUNT(*) FROM drinks WHERE page=?', (page,)).fetchone()[0]
             if count >= 9:
-                cur = conn.execute('SELECT * FROM drinks ORDER BY name')
-                items = cur.fetchall()
                 conn.close()
-                return render_template('drinks.html', drinks=items,
-                                       error='Maximal 9 Getränke pro Seite erlaubt')
+                return drinks(error='Maximal 9 Getränke pro Seite erlaubt')
             conn.execute(
                 'INSERT INTO drinks (name, price, stock, min_stock, page, image) VALUES (?, ?, ?, ?, ?, ?)',
                 (name, price, stock or 0, min_stock or 0, page, image_path))
@@ -400,11 +453,7 @@ def create_app() -> Flask:
             image_path = request.form.get('current_image') or None
             image_file = request.files.get('image')
             if image_file and image_file.filename:
-                image_dir = Path(__file__).resolve().parent.parent / 'data' / 'images'
-                image_dir.mkdir(parents=True, exist_ok=True)
-                dest = image_dir / image_file.filename
-                image_file.save(dest)
-                image_path = str(dest)
+                image_path = images.save_drink_image(image_file.stream, image_file.filename)
             cur = conn.execute('SELECT page FROM drinks WHERE id=?', (drink_id,))
             old_page = cur.fetchone()['page']
             count = conn.execute('SELECT COUNT(*) FROM drinks WHERE page=?', (page,)).fetchone()[0]
@@ -429,29 +478,37 @@ def create_app() -> Flask:
     @app.route('/users')
     @login_required
     def users(error: Optional[str] = None):
-        conn = database.get_connection()
-        cur = conn.execute('SELECT * FROM users WHERE is_event=0 ORDER BY name')
-        items = cur.fetchall()
-        conn.close()
-        return render_template('users.html', users=items, error=error)
+        listing = _list_args('users', models.USER_SORT_COLUMNS)
+        items, total = models.search_users(
+            listing['q'], False, listing['sort'], listing['desc'], listing['page'], PER_PAGE
+        )
+        return render_template('users.html', users=items, listing=_paginate(listing, total), error=error)
+
+    @app.route('/users/search')
+    @login_required
+    def users_search():
+        query = (request.args.get('q') or '').strip()
+        if not query:
+            return jsonify([])
+        items, _ = models.search_users(query, per_page=10)
+        return jsonify([
+            {'id': u['id'], 'name': u['name'], 'uid': u['rfid_uid'], 'balance': u['balance']}
+            for u in items
+        ])
 
     @app.route('/event_cards')
     @login_required
     def event_cards(error: Optional[str] = None):
-        conn = database.get_connection()
-        cur = conn.execute('SELECT * FROM users WHERE is_event=1 ORDER BY name')
-        items = cur.fetchall()
-        conn.close()
-        return render_template('event_cards.html', users=items, error=error)
+        listing = _list_args('event_cards', models.USER_SORT_COLUMNS)
+        items, total = models.search_users(
+            listing['q'], True, listing['sort'], listing['desc'], listing['page'], PER_PAGE
+        )
+        return render_template('event_cards.html', users=items, listing=_paginate(listing, total), error=error)
 
     @app.route('/topup')
     @login_required
     def topup():
-        conn = database.get_connection()
-        cur = conn.execute('SELECT id, name FROM users WHERE is_event=0 ORDER BY name')
-        items = cur.fetchall()
-        conn.close()
-        return render_template('topup.html', users=items)
+        return render_template('topup.html')
 
     @app.route('/topup/submit', methods=['POST'])
     @login_required
@@ -533,11 +590,7 @@ def create_app() -> Flask:
             finally:
                 conn.close()
         if error:
-            conn = database.get_connection()
-            cur = conn.execute('SELECT * FROM users WHERE is_event=0 ORDER BY name')
-            items = cur.fetchall()
-            conn.close()
-            return render_template('users.html', users=items, error=error)
+            return users(error=error)
         return redirect(url_for('users'))
 
     @app.route('/event_cards/add', methods=['POST'])
@@ -563,11 +616,7 @@ def create_app() -> Flask:
             finally:
                 conn.close()
         if error:
-            conn = database.get_connection()
-            cur = conn.execute('SELECT * FROM users WHERE is_event=1 ORDER BY name')
-            items = cur.fetchall()
-            conn.close()
-            return render_template('event_cards.html', users=items, error=error)
+            return event_cards(error=error)
         return redirect(url_for('event_cards'))
 
 
@@ -612,66 +661,40 @@ def create_app() -> Flask:
         models.reset_event_card(user_id)
         return redirect(url_for('event_cards'))
 
+    def _statement_response(job_id: Optional[str], download_name: str):
+        # Rendering runs in the background; until the file is ready the
+        # browser tab reloads the job URL instead of holding a worker.
+        job = statements.job_status(job_id) if job_id else None
+        if job is None:
+            return redirect(url_for('event_cards'))
+        if job['status'] == 'done':
+            mimetype = 'application/zip' if download_name.endswith('.zip') else 'application/pdf'
+            return send_file(job['path'], mimetype=mimetype, download_name=download_name)
+        url = url_for('event_card_print_job', job_id=job_id, name=download_name)
+        resp = make_response(render_template('statement_job.html', job=job, url=url), 202)
+        if job['status'] == 'running':
+            resp.headers['Refresh'] = f'2; url={url}'
+        return resp
+
     @app.route('/event_cards/print/<int:user_id>')
     @login_required
     def event_card_print(user_id: int):
-        conn = database.get_connection()
-        user = conn.execute(
-            'SELECT * FROM users WHERE id=? AND is_event=1', (user_id,)
-        ).fetchone()
-        if not user:
-            conn.close()
-            return redirect(url_for('event_cards'))
-        query = (
-            'SELECT t.timestamp, d.name, t.quantity, d.price '
-            'FROM transactions t JOIN drinks d ON d.id = t.drink_id '
-            'WHERE t.user_id=? '
-        )
-        params: list = [user_id]
-        if user['active'] and (user['valid_from'] or user['valid_until']):
-            if user['valid_from']:
-                query += 'AND DATE(t.timestamp) >= ? '
-                params.append(user['valid_from'])
-            if user['valid_until']:
-                query += 'AND DATE(t.timestamp) <= ? '
-                params.append(user['valid_until'])
-        query += 'ORDER BY t.timestamp'
-        cur = conn.execute(query, params)
-        items = cur.fetchall()
-        conn.close()
-        total = sum(r['quantity'] * r['price'] for r in items)
-
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font('Helvetica', size=12)
-        pdf.cell(0, 10, f'Firma: {user["name"]}', ln=1)
-        if user['valid_from'] or user['valid_until']:
-            pdf.cell(0, 10, f'Gültig: {user["valid_from"] or ""} - {user["valid_until"] or ""}', ln=1)
-        if user['created_at']:
-            pdf.cell(0, 10, f'Erstellt am: {user["created_at"][:10]}', ln=1)
-        pdf.ln(4)
-        pdf.set_font('Helvetica', size=10)
-        pdf.cell(40, 8, 'Datum', 1)
-        pdf.cell(70, 8, 'Getränk', 1)
-        pdf.cell(20, 8, 'Anzahl', 1, align='R')
-        pdf.cell(20, 8, 'Preis', 1, align='R')
-        pdf.cell(20, 8, 'Summe', 1, align='R')
-        pdf.ln()
-        for r in items:
-            pdf.cell(40, 8, r['timestamp'][:10], 1)
-            pdf.cell(70, 8, r['name'], 1)
-            pdf.cell(20, 8, str(r['quantity']), 1, align='R')
-            pdf.cell(20, 8, f"{r['price']/100:.2f}", 1, align='R')
-            pdf.cell(20, 8, f"{r['quantity']*r['price']/100:.2f}", 1, align='R')
-            pdf.ln()
-        pdf.cell(150, 8, 'Gesamt', 1)
-        pdf.cell(20, 8, f"{total/100:.2f}", 1, align='R')
-        pdf_bytes = pdf.output()
-        return send_file(
-            io.BytesIO(pdf_bytes),
-            mimetype='application/pdf',
-            download_name=f'event_{user_id}.pdf',
-        )
+        return _statement_response(statements.start_statement(user_id), f'event_{user_id}.pdf')
+
+    @app.route('/event_cards/print')
+    @login_required
+    def event_card_print_batch():
+        ids = request.args.getlist('ids', type=int)
+        fmt = 'zip' if request.args.get('format', default='pdf', type=str) == 'zip' else 'pdf'
+        return _statement_response(statements.start_batch(ids or None, fmt), f'event_cards.{fmt}')
+
+    @app.route('/event_cards/print/job/<job_id>')
+    @login_required
+    def event_card_print_job(job_id: str):
+        name = request.args.get('name', default='', type=str)
+        if not re.fullmatch(r'event(_\d+|_cards)\.(pdf|zip)', name):
+            name = job_id
+        return _statement_response(job_id, name)
 
     @app.route('/users/edit/<int:user_id>', methods=['GET', 'POST'])
     @login_required
@@ -818,14 +841,15 @@ def create_app() -> Flask:
     @login_required
     def export_transactions_anonymized():
         period = request.args.get('period', default='month', type=str)
-        date_clause = _date_filter_clause(period)
+        start, _ = models.report_range(period)
         conn = database.get_connection()
         cur = conn.execute(
             'SELECT t.timestamp, d.name as drink_name, t.quantity '
             'FROM transactions t '
             'JOIN drinks d ON d.id = t.drink_id '
-            f"WHERE DATE(t.timestamp) >= {date_clause} "
-            'ORDER BY t.timestamp DESC'
+            'WHERE t.timestamp >= ? '
+            'ORDER BY t.timestamp DESC',
+            (start,),
         )
         rows = cur.fetchall()
         conn.close()
@@ -844,34 +868,20 @@ def create_app() -> Flask:
     @app.route('/export/report_metrics')
     @login_required
     def export_report_metrics():
-        period = request.args.get('period', default='month', type=str)
-        date_clause = _date_filter_clause(period)
-        conn = database.get_connection()
-        top_articles = conn.execute(
-            "SELECT d.name AS drink_name, SUM(t.quantity) AS quantity, "
-            "SUM(t.quantity * d.price) AS revenue "
-            "FROM transactions t JOIN drinks d ON d.id = t.drink_id "
-            f"WHERE DATE(t.timestamp) >= {date_clause} "
-            "GROUP BY d.id ORDER BY quantity DESC, revenue DESC LIMIT 10"
-        ).fetchall()
-        out_of_stock = conn.execute(
-            "SELECT d.name AS drink_name, COUNT(*) AS stockout_count "
-            "FROM drinks d WHERE d.stock <= 0 GROUP BY d.id ORDER BY stockout_count DESC"
-        ).fetchall()
-        topup_stats = conn.execute(
-            "SELECT COUNT(*) AS total_topups, COALESCE(SUM(amount), 0) AS topup_volume "
-            f"FROM topups WHERE DATE(timestamp) >= {date_clause}"
-        ).fetchone()
-        conn.close()
+        period, start, end = _report_args()
+        report = models.get_report(period, start, end)
+        label = f"{report.start}..{report.end or ''}" if start else period
 
         out = io.StringIO()
         writer = csv.writer(out)
         writer.writerow(['metric', 'name', 'value', 'value2', 'period'])
-        for row in top_articles:
-            writer.writerow(['top_article', row['drink_name'], row['quantity'], f"{row['revenue']/100:.2f}", period])
-        for row in out_of_stock:
-            writer.writerow(['out_of_stock_history', row['drink_name'], row['stockout_count'], '', period])
-        writer.writerow(['topup_volume', 'topups', topup_stats['total_topups'], f"{topup_stats['topup_volume']/100:.2f}", period])
+        for row in report.top_articles:
+            writer.writerow(['top_article', row['drink_name'], row['quantity'], f"{row['revenue']/100:.2f}", label])
+        for row in report.stockouts:
+            writer.writerow(['out_of_stock_history', row['drink_name'], row['stockout_count'], row['last_stockout'], label])
+        for row in report.stock:
+            writer.writerow(['stock_ratio', row['name'], row['stock'], '' if row['ratio'] is None else row['ratio'], label])
+        writer.writerow(['topup_volume', 'topups', report.topup_count, f"{report.topup_amount/100:.2f}", label])
         resp = make_response(out.getvalue())
         resp.headers['Content-Type'] = 'text/csv'
         resp.headers['Content-Disposition'] = 'attachment; filename=report_metrics.csv'
@@ -914,41 +924,16 @@ def create_app() -> Flask:
     @app.route('/import/users', methods=['GET', 'POST'])
     @login_required
     def import_users():
+        summary = None
         if request.method == 'POST':
             file = request.files.get('file')
-            if file and file.filename:
-
-                raw = file.read().decode('utf-8')
-                try:
-                    dialect = csv.Sniffer().sniff(raw.splitlines()[0], delimiters=',;')
-                except csv.Error:
-                    dialect = csv.get_dialect('excel')
-                reader = csv.DictReader(io.StringIO(raw), dialect=dialect)
-                conn = database.get_connection()
-                for row in reader:
-                    name = (row.get('name') or '').strip()
-                    uid = (row.get('uid') or '').strip()
-                    val = row.get('balance_euro') or row.get('balance') or '0'
-                    val = val.replace(',', '.')
-                    try:
-                        balance = int(float(val) * 100)
-
-                    except ValueError:
-                        balance = 0
-                    if not name or not uid:
-                        continue
-                    try:
-                        conn.execute(
-                            'INSERT INTO users (name, rfid_uid, balance) VALUES (?, ?, ?)',
-                            (name, uid, balance),
-
-                        )
-                    except sqlite3.IntegrityError:
-                        pass
-                conn.commit()
-                conn.close()
-            return redirect(url_for('users'))
-        return render_template('import_users.html')
+            if not file or not file.filename:
+                return redirect(url_for('import_users'))
+            summary = models.import_users_csv(
+                file.stream,
+                progress=lambda p: print(f"Import: {p['inserted']} neu, {p['updated']} aktualisiert, {p['rejected']} abgelehnt"),
+            )
+        return render_template('import_users.html', summary=summary)
 
     @app.route('/export/restocks')
     @login_required
@@ -982,36 +967,155 @@ def create_app() -> Flask:
     @login_required
     def file_logs():
         page = request.args.get('page', default=1, type=int)
-        log_dir = Path(__file__).resolve().parents[1] / 'logs'
-        files: list[Path] = []
-        if log_dir.exists():
-            files = sorted(log_dir.glob('log_*.txt'), reverse=True)
+        files = logfiles.list_logs()
         total = len(files)
         pages = max((total + PER_PAGE - 1) // PER_PAGE, 1)
         start = (page - 1) * PER_PAGE
         files = files[start : start + PER_PAGE]
         return render_template(
             'file_logs.html',
-            files=[f.name for f in files],
+            files=files,
             page=page,
             pages=pages,
         )
 
+    @app.route('/file_logs/view/<name>')
+    @login_required
+    def file_logs_view(name: str):
+        path = logfiles.log_path(name)
+        if path is None:
+            return redirect(url_for('file_logs'))
+        offset = request.args.get('offset', type=int)
+        chunk = logfiles.read_page(path, offset)
+        return render_template(
+            'file_log_view.html',
+            name=name,
+            chunk=chunk,
+            page_bytes=logfiles.PAGE_BYTES,
+        )
+
+    @app.route('/file_logs/download/<name>')
+    @login_required
+    def file_logs_download(name: str):
+        path = logfiles.log_path(name)
+        if path is None:
+            return redirect(url_for('file_logs'))
+        return send_file(path, as_attachment=True, download_name=name)
+
+    @app.route('/file_logs/search')
+    @login_required
+    def file_logs_search():
+        query = request.args.get('q') or ''
+        name = request.args.get('file') or None
+        regex = bool(request.args.get('regex'))
+        if not query:
+            return redirect(url_for('file_logs'))
+        error = None
+        if regex:
+            try:
+                re.compile(query)
+            except re.error as e:
+                error = f'Ungültiger Ausdruck: {e}'
+        matches = iter(()) if error else logfiles.search(query, [name] if name else None, regex=regex)
+        # Rendered while searching, so matches show up as they are found.
+        return Response(stream_with_context(stream_template(
+            'file_logs_search.html', query=query, name=name, regex=regex,
+            matches=matches, error=error, limit=logfiles.MAX_MATCHES,
+        )))
+
     @app.route('/file_logs/delete/<name>', methods=['POST'])
     @login_required
     def file_logs_delete(name: str):
-        log_dir = Path(__file__).resolve().parents[1] / 'logs'
-        target = log_dir / name
-        if target.exists() and target.is_file():
+        target = logfiles.log_path(name)
+        if target is not None:
             target.unlink()
         return redirect(url_for('file_logs'))
 
+    # --- JSON API ------------------------------------------------------------
+    API_MAX_LIMIT = 1000
+    API_MAX_BATCH = 20
+    API_TABLES = ('drinks', 'users', 'transactions', 'restocks', 'topups')
+
+    def api_login_required(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not session.get('user'):
+                return jsonify({'error': 'Nicht angemeldet'}), 401
+            return func(*args, **kwargs)
+        return wrapper
+
+    def _api_int(args, key: str, default: int) -> int:
+        try:
+            return int(args.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def _api_payload(resource: str, args) -> tuple[dict, int]:
+        """Build the JSON body for ``resource`` from query-style ``args``."""
+        fields = [f for f in str(args.get('fields') or '').split(',') if f]
+        since = args.get('since')
+        since = str(since) if since not in (None, '') else None
+        body: dict
+        if resource in API_TABLES:
+            limit = min(max(_api_int(args, 'limit', API_MAX_LIMIT), 1), API_MAX_LIMIT)
+            items = models.get_api_rows(resource, since=since, limit=limit)
+            next_since = str(items[-1]['id']) if items else since
+            body = {'items': items, 'next_since': next_since, 'has_more': len(items) == limit}
+        elif resource == 'stock':
+            items = []
+            for d in models.get_drinks():
+                status = 'kritisch' if d.stock <= 0 else ('niedrig' if d.stock < d.min_stock else 'ok')
+                items.append({'id': d.id, 'name': d.name, 'stock': d.stock,
+                              'min_stock': d.min_stock, 'status': status})
+            body = {'items': items}
+        elif resource == 'recommendations':
+            days = max(_api_int(args, 'days', 30), 1)
+            items = models.get_purchase_recommendations(
+                days=days, coverage_days=21, replenish_cycle_days=max(45, days)
+            )
+            body = {'items': items}
+        elif resource == 'stats':
+            months = min(max(_api_int(args, 'months', 12), 1), 120)
+            items, totals = models.get_monthly_stats(months)
+            body = {'items': items, 'totals': totals}
+        else:
+            return {'error': f'Unbekannte Ressource: {resource}'}, 404
+        if fields:
+            body['items'] = [
+                {k: v for k, v in item.items() if k in fields} for item in body['items']
+            ]
+        return body, 200
+
+    @app.route('/api/v1/<resource>')
+    @api_login_required
+    def api_resource(resource: str):
+        body, status = _api_payload(resource, request.args)
+        return jsonify(body), status
+
+    @app.route('/api/v1/batch', methods=['POST'])
+    @api_login_required
+    def api_batch():
+        data = request.get_json(silent=True) or {}
+        reqs = data.get('requests')
+        if not isinstance(reqs, list) or len(reqs) > API_MAX_BATCH:
+            return jsonify({'error': f'Erwartet: requests als Liste (max. {API_MAX_BATCH})'}), 400
+        responses = []
+        for item in reqs:
+            if not isinstance(item, dict):
+                responses.append({'status': 400, 'body': {'error': 'Ungültige Anfrage'}})
+                continue
+            resource = str(item.get('resource') or '')
+            body, status = _api_payload(resource, item)
+            responses.append({'resource': resource, 'status': status, 'body': body})
+        return jsonify({'responses': responses})
+
     notifier.start()
     return app
 
 
 def main() -> None:
     database.init_db()
+    logfiles.start_rotation()
     app = create_app()
     template_path = Path(__file__).parent / 'templates'
     app.template_folder = str(template_path)
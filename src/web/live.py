@@ -0,0 +1,185 @@
+"""Live sales feed shared by all server-sent-event subscribers."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterator, Optional
+import json
+import sqlite3
+import threading
+import time
+
+from .. import database
+
+# Event ids are cursors "<transaction id>-<topup id>-<restock id>" so a client
+# reconnecting with Last-Event-ID can be caught up from the database, even
+# after a restart of the web server.
+Cursor = tuple[int, int, int]
+
+REPLAY_LIMIT = 200
+
+
+def format_cursor(cursor: Cursor) -> str:
+    return '-'.join(str(x) for x in cursor)
+
+
+def parse_cursor(value: str | None) -> Optional[Cursor]:
+    try:
+        tx, topup, restock = (int(x) for x in (value or '').split('-'))
+    except ValueError:
+        return None
+    return tx, topup, restock
+
+
+def _fetch(conn: sqlite3.Connection, cursor: Cursor, limit: int | None = None) -> tuple[list[dict], Cursor]:
+    """Return booking, topup and restock events newer than ``cursor``.
+
+    ``limit`` applies per table. Each event carries the cursor right after
+    it as ``id``, so a client resuming from any of them misses nothing.
+    """
+    tx_id, topup_id, restock_id = cursor
+    suffix = f' LIMIT {int(limit)}' if limit is not None else ''
+    events: list[dict] = []
+    for row in conn.execute(
+        'SELECT t.id, t.timestamp, t.quantity, d.id AS drink_id, d.name AS drink_name, '
+        'd.price, u.name AS user_name FROM transactions t '
+        'JOIN drinks d ON d.id = t.drink_id JOIN users u ON u.id = t.user_id '
+        'WHERE t.id > ? ORDER BY t.id' + suffix,
+        (tx_id,),
+    ):
+        tx_id = row['id']
+        events.append({'type': 'sale', 'id': format_cursor((tx_id, topup_id, restock_id)), 'data': {
+            **dict(row), 'value': row['quantity'] * row['price'],
+            'cash': row['user_name'] == 'BARZAHLUNG',
+        }})
+    for row in conn.execute(
+        'SELECT t.id, t.timestamp, t.amount, u.name AS user_name FROM topups t '
+        'JOIN users u ON u.id = t.user_id WHERE t.id > ? ORDER BY t.id' + suffix,
+        (topup_id,),
+    ):
+        topup_id = row['id']
+        events.append({'type': 'topup', 'id': format_cursor((tx_id, topup_id, restock_id)), 'data': dict(row)})
+    for row in conn.execute(
+        'SELECT r.id, r.timestamp, r.quantity, d.id AS drink_id, d.name AS drink_name '
+        'FROM restocks r JOIN drinks d ON d.id = r.drink_id WHERE r.id > ? ORDER BY r.id' + suffix,
+        (restock_id,),
+    ):
+        restock_id = row['id']
+        events.append({'type': 'restock', 'id': format_cursor((tx_id, topup_id, restock_id)), 'data': dict(row)})
+    return events, (tx_id, topup_id, restock_id)
+
+
+def max_cursor(conn: sqlite3.Connection) -> Cursor:
+    """Cursor of the newest rows; events after it are not yet shown."""
+    return tuple(
+        conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0]
+        for table in ('transactions', 'topups', 'restocks')
+    )  # type: ignore[return-value]
+
+
+class LiveFeed:
+    """Polls the database once for all viewers and fans events out to them."""
+
+    def __init__(self, interval: float = 1.0, backlog: int = 500) -> None:
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._events: deque[tuple[int, dict]] = deque(maxlen=backlog)
+        self._seq = 0
+        self._cursor: Cursor = (0, 0, 0)
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> None:
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            # Wait for the initial cursor so new subscribers do not miss events.
+            self._cond.wait(timeout=5)
+
+    def _publish(self, events: list[dict]) -> None:
+        with self._cond:
+            for event in events:
+                self._seq += 1
+                self._events.append((self._seq, event))
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        conn = database.get_connection()
+        version = None
+        stock: dict[int, int] = {}
+        with self._cond:
+            self._cursor = max_cursor(conn)
+            stock = {r['id']: r['stock'] for r in conn.execute('SELECT id, stock FROM drinks')}
+            version = conn.execute('PRAGMA data_version').fetchone()[0]
+            self._cond.notify_all()
+        while True:
+            time.sleep(self.interval)
+            try:
+                current = conn.execute('PRAGMA data_version').fetchone()[0]
+                if current == version:
+                    continue
+                version = current
+                events, self._cursor = _fetch(conn, self._cursor)
+                for row in conn.execute('SELECT id, name, stock, min_stock FROM drinks'):
+                    if stock.get(row['id']) != row['stock']:
+                        stock[row['id']] = row['stock']
+                        events.append({
+                            'type': 'stock', 'id': format_cursor(self._cursor), 'data': dict(row),
+                        })
+                if events:
+                    self._publish(events)
+            except sqlite3.Error as e:  # pragma: no cover - DB failure
+                print(f"Fehler im Live-Feed: {e}")
+
+    def replay(self, cursor: Cursor) -> Iterator[dict]:
+        """Yield events committed after ``cursor`` straight from the database.
+
+        Reads REPLAY_LIMIT rows per table at a time until the backlog is
+        exhausted.
+        """
+        conn = database.get_connection()
+        try:
+            while True:
+                events, cursor = _fetch(conn, cursor, REPLAY_LIMIT)
+                if not events:
+                    return
+                yield from events
+        finally:
+            conn.close()
+
+    def stream(self, last_event_id: str | None = None, keepalive: float = 15.0) -> Iterator[str]:
+        """Yield server-sent-event frames, starting after ``last_event_id``."""
+        self._ensure_started()
+        with self._cond:
+            seq = self._seq
+        seen: set[tuple[str, int]] = set()
+        cursor = parse_cursor(last_event_id)
+        if cursor is not None:
+            for event in self.replay(cursor):
+                seen.add((event['type'], event['data']['id']))
+                yield _frame(event)
+        yield 'retry: 3000\n\n'
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._seq > seq, timeout=keepalive)
+                new = [e for s, e in self._events if s > seq]
+                seq = self._seq
+            if not new:
+                yield ': keepalive\n\n'
+                continue
+            for event in new:
+                if event['type'] != 'stock' and (event['type'], event['data']['id']) in seen:
+                    continue
+                yield _frame(event)
+
+
+def _frame(event: dict) -> str:
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event['data'])}\n\n"
+    )
+
+
+feed = LiveFeed()
@@ -0,0 +1,166 @@
+"""Per-endpoint request and SQL metrics for the web admin."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+import threading
+import time
+
+from flask import Flask, Response, request
+
+from .. import database
+
+# Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = 'getraenkekasse'
+
+
+@dataclass
+class EndpointStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    response_bytes: int = 0
+    sql_statements: int = 0
+    sql_seconds: float = 0.0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile from the histogram (bucket upper bound)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max_seconds
+
+
+class _Request:
+    __slots__ = ('start', 'statements', 'sql_seconds')
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+
+class Metrics:
+    """Collects latency, size and SQL figures per Flask endpoint."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[str, EndpointStats] = {}
+        self._local = threading.local()
+        self.started = time.time()
+
+    def install(self, app: Flask) -> None:
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        database.set_sql_observers(self._on_statement, self._on_sql_time)
+
+    # SQL observers; statements outside a request (background threads) are ignored.
+    def _on_statement(self, sql: str) -> None:
+        req: Optional[_Request] = getattr(self._local, 'req', None)
+        if req is not None:
+            req.statements += 1
+
+    def _on_sql_time(self, seconds: float) -> None:
+        req: Optional[_Request] = getattr(self._local, 'req', None)
+        if req is not None:
+            req.sql_seconds += seconds
+
+    def _before(self) -> None:
+        self._local.req = _Request()
+
+    def _after(self, response: Response) -> Response:
+        req: Optional[_Request] = getattr(self._local, 'req', None)
+        if req is None:
+            return response
+        elapsed = time.perf_counter() - req.start
+        endpoint = request.endpoint or '<unmatched>'
+        size = response.content_length or 0
+        with self._lock:
+            st = self._stats.setdefault(endpoint, EndpointStats())
+            st.count += 1
+            st.seconds += elapsed
+            st.max_seconds = max(st.max_seconds, elapsed)
+            for i, bound in enumerate(BUCKETS):
+                if elapsed <= bound:
+                    st.buckets[i] += 1
+                    break
+            st.response_bytes += size
+            st.sql_statements += req.statements
+            st.sql_seconds += req.sql_seconds
+            st.statuses[response.status_code] = st.statuses.get(response.status_code, 0) + 1
+        return response
+
+    def _teardown(self, exc: Optional[BaseException]) -> None:
+        self._local.req = None
+
+    def snapshot(self) -> list[tuple[str, EndpointStats]]:
+        """Return a copy of all endpoint stats, slowest total time first."""
+        with self._lock:
+            items = [
+                (name, EndpointStats(
+                    st.count, st.seconds, st.max_seconds, list(st.buckets),
+                    st.response_bytes, st.sql_statements, st.sql_seconds, dict(st.statuses),
+                ))
+                for name, st in self._stats.items()
+            ]
+        return sorted(items, key=lambda item: item[1].seconds, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+        self.started = time.time()
+
+    def exposition(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            full = f'{PREFIX}_{name}'
+            lines.append(f'# HELP {full} {help_text}')
+            lines.append(f'# TYPE {full} {kind}')
+            return full
+
+        name = family('http_request_duration_seconds', 'histogram', 'Request latency per endpoint.')
+        for endpoint, st in snap:
+            cumulative = 0
+            for bound, n in zip(BUCKETS, st.buckets):
+                cumulative += n
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {st.count}')
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {st.seconds:.6f}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {st.count}')
+
+        name = family('http_requests_total', 'counter', 'Requests per endpoint and status code.')
+        for endpoint, st in snap:
+            for status, n in sorted(st.statuses.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}",status="{status}"}} {n}')
+
+        name = family('http_response_bytes_total', 'counter', 'Response body bytes per endpoint.')
+        for endpoint, st in snap:
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {st.response_bytes}')
+
+        name = family('sql_statements_total', 'counter', 'SQL statements run per endpoint.')
+        for endpoint, st in snap:
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {st.sql_statements}')
+
+        name = family('sql_duration_seconds_total', 'counter', 'Time spent executing SQL per endpoint.')
+        for endpoint, st in snap:
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {st.sql_seconds:.6f}')
+
+        name = family('start_time_seconds', 'gauge', 'Start of the measurement period.')
+        lines.append(f'{name} {self.started:.0f}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,305 @@
+"""Event-card statement PDFs, rendered in worker processes and cached on disk.
+
+Requests only start a job (:func:`start_statement`, :func:`start_batch`)
+and poll it with :func:`job_status`; a background thread collects the
+per-card PDFs from the process pool and assembles batches from them.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import uuid
+import zipfile
+
+from fpdf import FPDF
+
+from .. import database
+
+try:
+    from pypdf import PdfWriter  # type: ignore
+except Exception as e:  # pragma: no cover - optional dependency
+    PdfWriter = None  # type: ignore
+    print(f"pypdf not available, combined statements are rendered anew: {e}")
+
+# Number of cached batch files (combined PDFs and ZIPs) to keep.
+BATCH_CACHE_LIMIT = 10
+
+# Job ids are the names of the files they produce in the cache directory.
+_JOB_ID = re.compile(r'(event_\d+|batch)_[0-9a-f]{16}\.(pdf|zip)')
+
+_pool: Optional[ProcessPoolExecutor] = None
+_runner: Optional[ThreadPoolExecutor] = None
+_jobs: dict[str, Future] = {}
+_jobs_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=2)
+    return _pool
+
+
+def _get_runner() -> ThreadPoolExecutor:
+    global _runner
+    with _jobs_lock:
+        if _runner is None:
+            _runner = ThreadPoolExecutor(max_workers=2, thread_name_prefix='statements')
+        return _runner
+
+
+def _cache_dir() -> Path:
+    path = database.DB_PATH.parent / 'statements'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _filters(user: sqlite3.Row) -> tuple[str, list]:
+    """Return the WHERE clause limiting a card's transactions to its validity."""
+    clause = 'WHERE t.user_id=? '
+    params: list = [user['id']]
+    if user['active'] and (user['valid_from'] or user['valid_until']):
+        if user['valid_from']:
+            clause += 'AND DATE(t.timestamp) >= ? '
+            params.append(user['valid_from'])
+        if user['valid_until']:
+            clause += 'AND DATE(t.timestamp) <= ? '
+            params.append(user['valid_until'])
+    return clause, params
+
+
+def _header(user: sqlite3.Row) -> dict:
+    return {
+        'id': user['id'],
+        'name': user['name'],
+        'valid_from': user['valid_from'],
+        'valid_until': user['valid_until'],
+        'created_at': user['created_at'],
+    }
+
+
+def _cache_key(conn: sqlite3.Connection, user: sqlite3.Row) -> str:
+    """Key a card's statement on its header, transactions and drink names/prices."""
+    clause, params = _filters(user)
+    row = conn.execute(
+        'SELECT MAX(t.id), COUNT(*), SUM(t.quantity * d.price) '
+        'FROM transactions t JOIN drinks d ON d.id = t.drink_id ' + clause,
+        params,
+    ).fetchone()
+    drinks = conn.execute(
+        'SELECT DISTINCT d.id, d.name, d.price '
+        'FROM transactions t JOIN drinks d ON d.id = t.drink_id ' + clause + 'ORDER BY d.id',
+        params,
+    ).fetchall()
+    raw = json.dumps([_header(user), list(row), [list(d) for d in drinks]], default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _load(conn: sqlite3.Connection, user: sqlite3.Row) -> dict:
+    clause, params = _filters(user)
+    rows = conn.execute(
+        'SELECT t.timestamp, d.name, t.quantity, d.price '
+        'FROM transactions t JOIN drinks d ON d.id = t.drink_id '
+        + clause + 'ORDER BY t.timestamp',
+        params,
+    ).fetchall()
+    return {
+        **_header(user),
+        'items': [(r['timestamp'][:10], r['name'], r['quantity'], r['price']) for r in rows],
+    }
+
+
+def _render_card(pdf: FPDF, st: dict) -> None:
+    pdf.add_page()
+    pdf.set_font('Helvetica', size=12)
+    pdf.cell(0, 10, f'Firma: {st["name"]}', ln=1)
+    if st['valid_from'] or st['valid_until']:
+        pdf.cell(0, 10, f'Gültig: {st["valid_from"] or ""} - {st["valid_until"] or ""}', ln=1)
+    if st['created_at']:
+        pdf.cell(0, 10, f'Erstellt am: {st["created_at"][:10]}', ln=1)
+    pdf.ln(4)
+    pdf.set_font('Helvetica', size=10)
+    pdf.cell(40, 8, 'Datum', 1)
+    pdf.cell(70, 8, 'Getränk', 1)
+    pdf.cell(20, 8, 'Anzahl', 1, align='R')
+    pdf.cell(20, 8, 'Preis', 1, align='R')
+    pdf.cell(20, 8, 'Summe', 1, align='R')
+    pdf.ln()
+    total = 0
+    for day, name, quantity, price in st['items']:
+        total += quantity * price
+        pdf.cell(40, 8, day, 1)
+        pdf.cell(70, 8, name, 1)
+        pdf.cell(20, 8, str(quantity), 1, align='R')
+        pdf.cell(20, 8, f"{price/100:.2f}", 1, align='R')
+        pdf.cell(20, 8, f"{quantity*price/100:.2f}", 1, align='R')
+        pdf.ln()
+    pdf.cell(150, 8, 'Gesamt', 1)
+    pdf.cell(20, 8, f"{total/100:.2f}", 1, align='R')
+
+
+def _tmp_path(target: Path) -> Path:
+    return target.with_name(f"tmp_{uuid.uuid4().hex}_{target.name}")
+
+
+def render_statements(statements: list[dict], target: str) -> str:
+    """Render ``statements`` into one PDF at ``target``. Runs in a worker process."""
+    pdf = FPDF()
+    for st in statements:
+        _render_card(pdf, st)
+    tmp = _tmp_path(Path(target))
+    tmp.write_bytes(bytes(pdf.output()))
+    tmp.replace(target)
+    return target
+
+
+def _event_users(conn: sqlite3.Connection, user_ids: list[int] | None) -> list[sqlite3.Row]:
+    if user_ids:
+        placeholders = ','.join('?' * len(user_ids))
+        return conn.execute(
+            f'SELECT * FROM users WHERE is_event=1 AND id IN ({placeholders}) ORDER BY name',
+            user_ids,
+        ).fetchall()
+    return conn.execute('SELECT * FROM users WHERE is_event=1 ORDER BY name').fetchall()
+
+
+def _card_path(conn: sqlite3.Connection, user: sqlite3.Row) -> Path:
+    return _cache_dir() / f"event_{user['id']}_{_cache_key(conn, user)}.pdf"
+
+
+def _card_paths(conn: sqlite3.Connection, users: list[sqlite3.Row]) -> list[tuple[sqlite3.Row, Path]]:
+    """Return cached per-card PDFs, rendering missing ones in parallel."""
+    cache = _cache_dir()
+    result: list[tuple[sqlite3.Row, Path]] = []
+    pending = []
+    for user in users:
+        path = _card_path(conn, user)
+        result.append((user, path))
+        if not path.exists():
+            for old in cache.glob(f"event_{user['id']}_*.pdf"):
+                old.unlink(missing_ok=True)
+            pending.append(_get_pool().submit(render_statements, [_load(conn, user)], str(path)))
+    for future in pending:
+        future.result()
+    return result
+
+
+def _prune_batches() -> None:
+    batches = sorted(
+        _cache_dir().glob('batch_*'), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for old in batches[BATCH_CACHE_LIMIT:]:
+        old.unlink(missing_ok=True)
+
+
+def _build_card(user_id: int) -> Path:
+    conn = database.get_connection()
+    try:
+        return _card_paths(conn, _event_users(conn, [user_id]))[0][1]
+    finally:
+        conn.close()
+
+
+def _build_batch(user_ids: list[int], target: Path) -> Path:
+    conn = database.get_connection()
+    try:
+        cards = _card_paths(conn, _event_users(conn, user_ids))
+        if target.suffix == '.zip':
+            tmp = _tmp_path(target)
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for user, path in cards:
+                    safe = ''.join(c if c.isalnum() else '_' for c in user['name'])
+                    zf.write(path, f"event_{user['id']}_{safe}.pdf")
+            tmp.replace(target)
+        elif PdfWriter is not None:
+            # Combine the cached cards instead of rendering them again.
+            writer = PdfWriter()
+            for _, path in cards:
+                writer.append(str(path))
+            tmp = _tmp_path(target)
+            with open(tmp, 'wb') as f:
+                writer.write(f)
+            tmp.replace(target)
+        else:
+            statements = [_load(conn, user) for user, _ in cards]
+            _get_pool().submit(render_statements, statements, str(target)).result()
+    finally:
+        conn.close()
+    _prune_batches()
+    return target
+
+
+def _submit(target: Path, build: Callable[..., Path], *args) -> str:
+    job_id = target.name
+    if target.exists():
+        # Keeps a cached batch from being pruned as one of the oldest.
+        target.touch()
+        return job_id
+    runner = _get_runner()
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+        if future is None or future.done():
+            _jobs[job_id] = runner.submit(build, *args)
+    return job_id
+
+
+def start_statement(user_id: int) -> Optional[str]:
+    """Start rendering the statement of one event card and return the job id."""
+    conn = database.get_connection()
+    try:
+        users = _event_users(conn, [user_id])
+        if not users:
+            return None
+        target = _card_path(conn, users[0])
+    finally:
+        conn.close()
+    return _submit(target, _build_card, user_id)
+
+
+def start_batch(user_ids: list[int] | None = None, fmt: str = 'pdf') -> Optional[str]:
+    """Start assembling all (or the selected) statements as one PDF or a ZIP."""
+    conn = database.get_connection()
+    try:
+        users = _event_users(conn, user_ids)
+        if not users:
+            return None
+        keys = [f"{u['id']}:{_cache_key(conn, u)}" for u in users]
+    finally:
+        conn.close()
+    digest = hashlib.sha1('|'.join(keys).encode('utf-8')).hexdigest()[:16]
+    target = _cache_dir() / f"batch_{digest}.{'zip' if fmt == 'zip' else 'pdf'}"
+    return _submit(target, _build_batch, [u['id'] for u in users], target)
+
+
+def job_status(job_id: str) -> Optional[dict]:
+    """Return ``{'status': 'running'|'done'|'failed', ...}`` of a job, ``None`` if unknown.
+
+    Finished jobs carry the ``path`` of the file, failed ones an ``error``.
+    """
+    if not _JOB_ID.fullmatch(job_id):
+        return None
+    with _jobs_lock:
+        future = _jobs.get(job_id)
+        if future is not None and future.done():
+            del _jobs[job_id]
+    if future is not None:
+        if not future.done():
+            return {'status': 'running'}
+        error = future.exception()
+        if error is not None:
+            print(f"Fehler beim Erstellen der Abrechnung {job_id}: {error}")
+            return {'status': 'failed', 'error': str(error)}
+        # A booking during the job may have produced a newer card file.
+        return {'status': 'done', 'path': future.result()}
+    path = _cache_dir() / job_id
+    if path.exists():
+        return {'status': 'done', 'path': path}
+    return None
+
@@ -27,13 +27,22 @@ LOGFILE="$LOGDIR/log_$(date +%Y-%m-%d_%H-%M-%S).txt"
 echo "Logfile: $LOGFILE"
 echo "----------------------------------------"
 
+# Optional: RFID-Daemon als alleiniger Besitzer des Kartenlesers
+DAEMON_PID=""
+if [ "$KASSE_RFID" = "daemon" ]; then
+  echo "Starte RFID-Daemon..."
+  # Umleitung statt Pipe, damit $! die PID des Daemons ist und nicht die von tee
+  venv/bin/python -m src.rfid_daemon > >(tee -a "$LOGFILE") 2>&1 &
+  DAEMON_PID=$!
+fi
+
 # Starte Webserver
 echo "Starte Webserver..."
 venv/bin/python -m src.web.admin_server 2>&1 | tee -a "$LOGFILE" &
 WEB_PID=$!
 
-# Webserver bei Skriptende beenden
-trap "echo 'Beende Webserver...'; kill $WEB_PID" EXIT
+# Webserver (und Daemon) bei Skriptende beenden
+trap "echo 'Beende Webserver...'; kill $WEB_PID $DAEMON_PID" EXIT
 
 # Starte Anwendung und schreibe alles ins Log
 echo "Starte Anwendung..."
@@ -0,0 +1,34 @@
+import sys
+import types
+
+qtwidgets = types.SimpleNamespace(QMessageBox=object, QApplication=object)
+qtcore = types.SimpleNamespace(Qt=types.SimpleNamespace())
+pyqt5 = types.SimpleNamespace(QtWidgets=qtwidgets, QtCore=qtcore)
+sys.modules.setdefault("PyQt5", pyqt5)
+sys.modules.setdefault("PyQt5.QtWidgets", qtwidgets)
+sys.modules.setdefault("PyQt5.QtCore", qtcore)
+
+from src import database, models
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    return conn
+
+
+def test_api_rows_since_id_and_timestamp(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    drink = conn.execute("SELECT id FROM drinks WHERE name='Cola'").fetchone()
+    models.add_transaction(1, drink['id'], 1)
+    models.add_transaction(1, drink['id'], 2)
+    rows = models.get_api_rows('transactions')
+    assert [r['quantity'] for r in rows] == [1, 2]
+    newer = models.get_api_rows('transactions', since=str(rows[0]['id']))
+    assert [r['id'] for r in newer] == [rows[1]['id']]
+    assert models.get_api_rows('transactions', since='2000-01-01', limit=1) == rows[:1]
+    assert models.get_api_rows('transactions', since='2999-01-01') == []
+    conn.close()
@@ -58,3 +58,11 @@ def test_storno_booking_restores_balance_and_stock(tmp_path, monkeypatch):
     assert new_balance == user['balance']
     assert new_stock == drink['stock']
     conn.close()
+
+
+def test_schema_version_marks_initialised_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_PATH', tmp_path / 'fresh.db')
+    assert not database.schema_is_current()
+    conn = setup_db(tmp_path, monkeypatch)
+    assert database.schema_is_current(conn)
+    conn.close()
@@ -0,0 +1,155 @@
+import os
+import sys
+import types
+
+qtwidgets = types.SimpleNamespace(QMessageBox=object, QApplication=object)
+qtcore = types.SimpleNamespace(Qt=types.SimpleNamespace())
+pyqt5 = types.SimpleNamespace(QtWidgets=qtwidgets, QtCore=qtcore)
+sys.modules.setdefault("PyQt5", pyqt5)
+sys.modules.setdefault("PyQt5.QtWidgets", qtwidgets)
+sys.modules.setdefault("PyQt5.QtCore", qtcore)
+
+from src import database, models
+from src.gui import booking
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    booking.sessions.clear()
+    return conn
+
+
+def test_charge_card_books_purchase(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    user = conn.execute("SELECT id, rfid_uid, balance FROM users WHERE name='Alice'").fetchone()
+    drink = conn.execute("SELECT id, price, stock FROM drinks WHERE name='Wasser'").fetchone()
+
+    result = booking.charge_card(user['rfid_uid'], [(drink['id'], 2)])
+    assert result.ok and result.total == drink['price'] * 2
+    assert result.old_balance == user['balance']
+    assert result.user.balance == user['balance'] - drink['price'] * 2
+    stock = conn.execute('SELECT stock FROM drinks WHERE id=?', (drink['id'],)).fetchone()['stock']
+    assert stock == drink['stock'] - 2
+
+    assert booking.charge_card('UNKNOWN', [(drink['id'], 1)]).reason == booking.UNKNOWN_CARD
+    conn.close()
+
+
+def test_basket_is_booked_atomically(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    user = conn.execute("SELECT id, balance FROM users WHERE name='Alice'").fetchone()
+    drinks = conn.execute('SELECT id, price, stock FROM drinks ORDER BY id LIMIT 2').fetchall()
+    items = [(drinks[0]['id'], 1), (drinks[1]['id'], 2), (drinks[0]['id'], 1)]
+    before = conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+    result = booking.charge_user(user['id'], items)
+    expected = drinks[0]['price'] * 2 + drinks[1]['price'] * 2
+    assert result.ok and result.total == expected
+    assert result.user.balance == user['balance'] - expected
+    assert conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0] == before + 2
+
+    # Exceeding the overdraft limit leaves balance, stock and log untouched.
+    limit = models.get_overdraft_limit()
+    quantity = (result.user.balance + limit) // drinks[0]['price'] + 1
+    refused = booking.charge_user(user['id'], [(drinks[0]['id'], quantity)])
+    assert not refused.ok and refused.reason == booking.LIMIT
+    balance = conn.execute('SELECT balance FROM users WHERE id=?', (user['id'],)).fetchone()[0]
+    assert balance == result.user.balance
+    stock = conn.execute('SELECT stock FROM drinks WHERE id=?', (drinks[0]['id'],)).fetchone()[0]
+    assert stock == drinks[0]['stock'] - 2
+    assert conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0] == before + 2
+
+    cash = booking.sell_cash([(drinks[1]['id'], 1)])
+    assert cash.ok and cash.total == drinks[1]['price']
+
+    # A drink deleted while it sat in the basket refuses the whole basket.
+    conn.execute('INSERT INTO drinks (name, price, stock) VALUES (?, ?, ?)', ('Weg', 100, 5))
+    gone = conn.execute("SELECT id FROM drinks WHERE name='Weg'").fetchone()[0]
+    conn.execute('DELETE FROM drinks WHERE id=?', (gone,))
+    conn.commit()
+    count = conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+    missing = booking.charge_user(user['id'], [(drinks[1]['id'], 1), (gone, 1)])
+    assert not missing.ok and missing.reason == booking.FAILED
+    assert models.book_basket(user['id'], [(gone, 1)]) is None
+    assert booking.sell_cash([(gone, 1)]).reason == booking.FAILED
+    # An empty basket is never booked, nor reported as over the limit.
+    assert booking.charge_user(user['id'], []).reason == booking.FAILED
+    assert booking.charge_user(user['id'], [(drinks[0]['id'], 0)]).reason == booking.FAILED
+    assert conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0] == count
+    balance = conn.execute('SELECT balance FROM users WHERE id=?', (user['id'],)).fetchone()[0]
+    assert balance == result.user.balance
+    conn.close()
+
+
+def test_topup_and_game_settlement(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    user = conn.execute("SELECT id, rfid_uid, balance FROM users WHERE name='Bob'").fetchone()
+
+    result = booking.topup_card(user['rfid_uid'], 500)
+    assert result.ok and result.user.balance == user['balance'] + 500
+    won = booking.settle_game(user['id'], 'win', 200)
+    assert won.ok and won.user.balance == user['balance'] + 700
+    assert booking.settle_game(9999, 'win', 200).reason == booking.UNKNOWN_USER
+    assert booking.status_counts()['users'] >= 2
+    conn.close()
+
+
+def test_card_session_carries_user_through_visit(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    user = conn.execute("SELECT id, rfid_uid, balance FROM users WHERE name='Alice'").fetchone()
+    drink = conn.execute("SELECT id, price FROM drinks WHERE name='Cola'").fetchone()
+    lookups = []
+    for name in ('get_user', 'get_user_by_uid'):
+        original = getattr(models, name)
+        monkeypatch.setattr(
+            models, name, lambda key, _f=original: lookups.append(key) or _f(key),
+        )
+
+    checked = booking.check_card(user['rfid_uid'])
+    bought = booking.charge_card(user['rfid_uid'], [(drink['id'], 1)])
+    won = booking.settle_game(user['id'], 'win', bought.total)
+    assert lookups == [user['rfid_uid']]
+    assert bought.old_balance == checked.user.balance
+    assert bought.user.balance == user['balance'] - drink['price']
+    assert won.user.balance == user['balance']
+
+    # A balance changed elsewhere is still booked correctly.
+    conn.execute('UPDATE users SET balance = balance + 1000 WHERE id=?', (user['id'],))
+    conn.commit()
+    again = booking.charge_card(user['rfid_uid'], [(drink['id'], 1)])
+    assert again.user.balance == user['balance'] + 1000 - drink['price']
+    assert again.old_balance == user['balance'] + 1000
+    conn.close()
+
+
+def test_own_sale_keeps_session_over_refresh_check(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    user = conn.execute("SELECT id, rfid_uid FROM users WHERE name='Alice'").fetchone()
+    drink = conn.execute("SELECT id FROM drinks WHERE name='Cola'").fetchone()
+    lookups = []
+    for name in ('get_user', 'get_user_by_uid'):
+        original = getattr(models, name)
+        monkeypatch.setattr(
+            models, name, lambda key, _f=original: lookups.append(key) or _f(key),
+        )
+
+    # The sale touches the refresh flag; the window's periodic check must
+    # not treat that as an outside change.
+    bought = booking.charge_card(user['rfid_uid'], [(drink['id'], 1)])
+    assert database.refresh_needed(0.0)
+    assert not booking.sessions.check_flag()
+    booking.settle_game(user['id'], 'win', bought.total)
+    assert lookups == [user['rfid_uid']]
+
+    # A change from the web admin still drops the cached users.
+    database.touch_refresh_flag()
+    mtime = database.refresh_mtime()
+    os.utime(database.REFRESH_FLAG, (mtime + 1, mtime + 1))
+    assert booking.sessions.check_flag()
+    booking.settle_game(user['id'], 'lose', bought.total)
+    assert lookups == [user['rfid_uid'], user['id']]
+    conn.close()
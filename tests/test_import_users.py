@@ -0,0 +1,41 @@
+import io
+import sys
+import types
+
+qtwidgets = types.SimpleNamespace(QMessageBox=object, QApplication=object)
+qtcore = types.SimpleNamespace(Qt=types.SimpleNamespace())
+pyqt5 = types.SimpleNamespace(QtWidgets=qtwidgets, QtCore=qtcore)
+sys.modules.setdefault("PyQt5", pyqt5)
+sys.modules.setdefault("PyQt5.QtWidgets", qtwidgets)
+sys.modules.setdefault("PyQt5.QtCore", qtcore)
+
+from src import database, models
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    conn = database.get_connection()
+    database.init_db(conn)
+    return conn
+
+
+def test_import_inserts_updates_and_rejects(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    data = (
+        'name;uid;balance_euro\n'
+        'Alice Neu;TESTCARD123;12,50\n'
+        'Carol;NEWCARD1;3\n'
+        ';NOCARD;1\n'
+        'Dave;NEWCARD2;abc\n'
+    ).encode('utf-8')
+    summary = models.import_users_csv(io.BytesIO(data), chunk_size=2)
+    assert (summary['inserted'], summary['updated'], summary['rejected']) == (1, 1, 2)
+    alice = conn.execute("SELECT name, balance FROM users WHERE rfid_uid='TESTCARD123'").fetchone()
+    assert (alice['name'], alice['balance']) == ('Alice Neu', 1250)
+
+    again = models.import_users_csv(io.BytesIO(data))
+    assert (again['inserted'], again['updated']) == (0, 2)
+    count = conn.execute("SELECT COUNT(*) FROM users WHERE rfid_uid='NEWCARD1'").fetchone()[0]
+    assert count == 1
+    conn.close()
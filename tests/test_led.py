@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from src import led
+
+
+def test_led_backend_from_environment(monkeypatch):
+    monkeypatch.setenv(led.BACKEND_ENV, 'sim')
+    led.set_controller(None)
+    try:
+        led.indicate_success()
+        assert led.flush()
+        controller = led.get_controller()
+        assert isinstance(controller, led.SimulatedLed)
+        assert controller.counts == {'success': 1}
+    finally:
+        led.set_controller(None)
+
+
+class BlockingLed(led.LedController):
+    def __init__(self):
+        self.release = threading.Event()
+        self.sent = []
+
+    def send(self, cmd):
+        self.release.wait(2)
+        self.sent.append(cmd)
+
+
+def test_led_worker_coalesces_queued_commands():
+    controller = BlockingLed()
+    led.set_controller(controller)
+    try:
+        worker = led.LedWorker(coalesce_window=10)
+        worker.submit('card_read')
+        # Wait until the worker is stuck on the "serial port".
+        deadline = time.monotonic() + 2
+        while worker.stats()['queued'] and time.monotonic() < deadline:
+            time.sleep(0.001)
+        worker.submit('success')
+        worker.submit('off')
+        controller.release.set()
+        assert worker.flush()
+        assert controller.sent == ['card_read', 'off']
+        worker.submit('off')
+        assert worker.flush()
+        stats = worker.stats()
+        assert stats['sent'] == 2 and stats['coalesced'] == 2 and stats['queued'] == 0
+    finally:
+        led.set_controller(None)
+
+
+def test_led_backend_must_implement_send():
+    class Incomplete(led.LedController):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,31 @@
+from src import database, models
+from src.web import live
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    return conn
+
+
+def test_replay_pages_through_backlog(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(live, 'REPLAY_LIMIT', 3)
+    start = live.max_cursor(conn)
+    user = conn.execute("SELECT id FROM users WHERE name='Alice'").fetchone()['id']
+    drink = conn.execute("SELECT id FROM drinks WHERE name='Cola'").fetchone()['id']
+    for _ in range(8):
+        models.add_transaction(user, drink, 1)
+    models.add_topup(user, 500)
+    models.add_topup(user, 300)
+
+    events = list(live.LiveFeed().replay(start))
+    assert sorted(e['type'] for e in events) == ['sale'] * 8 + ['topup'] * 2
+    assert live.parse_cursor(events[-1]['id']) == live.max_cursor(conn)
+    # Resuming from any event's id yields exactly the events after it.
+    rest = list(live.LiveFeed().replay(live.parse_cursor(events[4]['id'])))
+    assert [e['id'] for e in rest] == [e['id'] for e in events[5:]]
+    conn.close()
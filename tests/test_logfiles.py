@@ -0,0 +1,32 @@
+import gzip
+import os
+import time
+
+from src import logfiles
+
+
+def test_rotate_page_and_search(tmp_path, monkeypatch):
+    monkeypatch.setattr(logfiles, 'LOG_DIR', tmp_path)
+    monkeypatch.setattr(logfiles, 'MAX_BYTES', 1000)
+    old = tmp_path / 'log_2020-01-01_00-00-00.txt'
+    old.write_text(''.join(f'old {i}\n' for i in range(10)))
+    os.utime(old, (time.time() - 2 * logfiles.MAX_AGE,) * 2)
+    active = tmp_path / 'log_2030-01-01_00-00-00.txt'
+    active.write_text(''.join(f'line {i}\n' for i in range(500)))
+
+    written = logfiles.rotate()
+    assert sorted(written) == ['log_2020-01-01_00-00-00.txt.gz', 'log_2030-01-01_00-00-00.1.txt.gz']
+    assert active.stat().st_size == 0
+    assert not old.exists()
+
+    archive = tmp_path / 'log_2030-01-01_00-00-00.1.txt.gz'
+    page = logfiles.read_page(archive, 5, 40)
+    assert page['text'].startswith('line 1\n') and page['text'].endswith('\n')
+    assert page['size'] == len(gzip.decompress(archive.read_bytes()))
+    tail = logfiles.read_page(archive, None, 20)
+    assert tail['text'].endswith('line 499\n') and tail['end'] == tail['size']
+
+    matches = list(logfiles.search('OLD 9'))
+    assert matches == [('log_2020-01-01_00-00-00.txt.gz', 10, 'old 9')]
+    assert len(list(logfiles.search(r'line \d+$', regex=True, max_matches=3))) == 3
+    assert logfiles.log_path('../secret.txt') is None
@@ -0,0 +1,55 @@
+import sys
+import types
+
+qtwidgets = types.SimpleNamespace(QMessageBox=object, QApplication=object)
+qtcore = types.SimpleNamespace(Qt=types.SimpleNamespace())
+pyqt5 = types.SimpleNamespace(QtWidgets=qtwidgets, QtCore=qtcore)
+sys.modules.setdefault("PyQt5", pyqt5)
+sys.modules.setdefault("PyQt5.QtWidgets", qtwidgets)
+sys.modules.setdefault("PyQt5.QtCore", qtcore)
+
+from src import database, models
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    return conn
+
+
+def test_report_range_and_stockout_history(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    cola = conn.execute("SELECT id, price FROM drinks WHERE name='Cola'").fetchone()
+    conn.execute("UPDATE drinks SET stock=0 WHERE id=?", (cola['id'],))
+    conn.executemany(
+        "INSERT INTO restocks (drink_id, quantity, timestamp) VALUES (?, ?, ?)",
+        [(cola['id'], 3, '2024-01-01 10:00:00'), (cola['id'], 2, '2024-01-03 10:00:00')],
+    )
+    conn.executemany(
+        "INSERT INTO transactions (user_id, drink_id, quantity, timestamp) VALUES (1, ?, ?, ?)",
+        [
+            (cola['id'], 3, '2024-01-02 10:00:00'),
+            (cola['id'], 2, '2024-01-04 10:00:00'),
+        ],
+    )
+    conn.execute("INSERT INTO topups (user_id, amount, timestamp) VALUES (1, 500, '2024-01-02 12:00:00')")
+    conn.commit()
+
+    report = models.get_report(None, '2024-01-01', '2024-01-03')
+    assert report.top_articles == [
+        {'drink_name': 'Cola', 'quantity': 3, 'revenue': 3 * cola['price']}
+    ]
+    assert report.topup_count == 1 and report.topup_amount == 500
+    assert report.stockouts == [
+        {'drink_name': 'Cola', 'stockout_count': 1, 'last_stockout': '2024-01-02 10:00:00'}
+    ]
+    full = models.get_report(None, '2024-01-01')
+    assert full.stockouts[0]['stockout_count'] == 2
+    assert models.get_report(None, '2024-01-01') is full
+
+    models.add_topup(1, 100)
+    assert models.get_report(None, '2024-01-01') is not full
+    conn.close()
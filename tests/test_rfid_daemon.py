@@ -0,0 +1,62 @@
+import json
+import time
+
+import pytest
+
+from src import rfid_daemon
+
+
+def start_daemon(tmp_path):
+    daemon = rfid_daemon.ReaderDaemon(
+        rfid_daemon.SimulatedSource(), tmp_path / 'rfid.sock', poll_interval=0.005, debounce=0.02,
+    )
+    assert daemon.start()
+    return daemon
+
+
+def test_subscribers_receive_taps(tmp_path):
+    daemon = start_daemon(tmp_path)
+    path = daemon.path
+    try:
+        with rfid_daemon.connect(path, timeout=5) as sock:
+            sock.sendall(b'{"op": "subscribe"}\n')
+            events = sock.makefile('rb')
+            assert json.loads(events.readline()) == {'event': 'state', 'uid': None}
+            assert rfid_daemon.request('tap', path, uid='CAFE0001') == {'ok': True}
+            assert json.loads(events.readline()) == {'event': 'present', 'uid': 'CAFE0001'}
+            assert json.loads(events.readline()) == {'event': 'removed'}
+            events.close()
+        status = rfid_daemon.request('status', path)
+        assert status['backend'] == 'SimulatedSource' and status['uid'] is None
+    finally:
+        daemon.stop()
+    assert not path.exists()
+    assert not rfid_daemon.daemon_running(path)
+
+
+def test_read_waits_for_next_card(tmp_path):
+    daemon = start_daemon(tmp_path)
+    try:
+        assert rfid_daemon.read_card(0.05, daemon.path) is None
+        daemon.scanner.source.tap('CAFE0002', hold=1.0)
+        started = time.monotonic()
+        assert rfid_daemon.read_card(2, daemon.path) == 'CAFE0002'
+        assert time.monotonic() - started < 1.0
+        assert 'error' in rfid_daemon.request('nonsense', daemon.path)
+        assert 'error' in rfid_daemon.request('read', daemon.path, wait='bald')
+        assert 'error' in rfid_daemon.request('tap', daemon.path)
+        assert 'backend' in rfid_daemon.request('status', daemon.path)
+    finally:
+        daemon.stop()
+
+
+def test_second_daemon_leaves_running_one_alone(tmp_path):
+    daemon = start_daemon(tmp_path)
+    try:
+        second = rfid_daemon.ReaderDaemon(rfid_daemon.SimulatedSource(), daemon.path)
+        assert not second.start()
+        assert rfid_daemon.request('status', daemon.path)['backend'] == 'SimulatedSource'
+        with pytest.raises(TypeError):
+            rfid_daemon.CardSource()
+    finally:
+        daemon.stop()
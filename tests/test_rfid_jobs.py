@@ -0,0 +1,63 @@
+import sys
+import types
+
+qtwidgets = types.SimpleNamespace(QMessageBox=object, QApplication=object)
+qtcore = types.SimpleNamespace(Qt=types.SimpleNamespace())
+pyqt5 = types.SimpleNamespace(QtWidgets=qtwidgets, QtCore=qtcore)
+sys.modules.setdefault("PyQt5", pyqt5)
+sys.modules.setdefault("PyQt5.QtWidgets", qtwidgets)
+sys.modules.setdefault("PyQt5.QtCore", qtcore)
+
+from src import database, models
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    return conn
+
+
+def test_rfid_job_lifecycle(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    job_id = models.create_rfid_job()
+    assert models.get_rfid_job(job_id)['status'] == 'pending'
+    assert models.wait_rfid_job(job_id, 0)['status'] == 'pending'
+
+    assert models.claim_rfid_job() == job_id
+    assert models.claim_rfid_job() is None
+    models.finish_rfid_job(job_id, 'ABCD1234')
+    job = models.get_rfid_job(job_id)
+    assert job['status'] == 'done' and job['uid'] == 'ABCD1234'
+
+    failed = models.create_rfid_job()
+    models.claim_rfid_job()
+    models.finish_rfid_job(failed, None)
+    assert models.wait_rfid_job(failed, 1)['status'] == 'failed'
+    assert models.get_rfid_job(9999) is None
+    conn.close()
+
+
+def test_unclaimed_rfid_job_expires(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    job_id = models.create_rfid_job()
+    conn.execute("UPDATE rfid_jobs SET created = created - ?", (models.RFID_JOB_TIMEOUT + 1,))
+    conn.commit()
+    assert models.get_rfid_job(job_id)['status'] == 'failed'
+    assert models.claim_rfid_job() is None
+
+    # A read nobody finishes (GUI restarted mid-read) does not run forever.
+    running = models.create_rfid_job(running=True)
+    assert models.get_rfid_job(running)['status'] == 'running'
+    conn.execute(
+        "UPDATE rfid_jobs SET updated = updated - ? WHERE id=?",
+        (models.RFID_JOB_RUNNING_TIMEOUT + 1, running),
+    )
+    conn.commit()
+    assert models.get_rfid_job(running)['status'] == 'failed'
+    models.claim_rfid_job()
+    row = conn.execute("SELECT status FROM rfid_jobs WHERE id=?", (running,)).fetchone()
+    assert row['status'] == 'failed'
+    conn.close()
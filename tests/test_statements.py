@@ -0,0 +1,53 @@
+import time
+
+from src import database, models
+from src.web import statements
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    return conn
+
+
+def wait_done(job_id):
+    deadline = time.monotonic() + 30
+    while True:
+        job = statements.job_status(job_id)
+        if job['status'] != 'running' or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_statements_render_in_background_and_follow_renames(tmp_path, monkeypatch):
+    conn = setup_db(tmp_path, monkeypatch)
+    drink = conn.execute("SELECT id FROM drinks WHERE name='Cola'").fetchone()['id']
+    ids = []
+    for name in ('Firma A', 'Firma B'):
+        cur = conn.execute('INSERT INTO users (name, balance, is_event) VALUES (?, 0, 1)', (name,))
+        ids.append(cur.lastrowid)
+    conn.commit()
+    for user_id in ids:
+        models.add_transaction(user_id, drink, 2)
+
+    job_id = statements.start_statement(ids[0])
+    job = wait_done(job_id)
+    assert job['status'] == 'done' and job['path'].read_bytes().startswith(b'%PDF')
+    # Cached: the next request finds the file without a new job.
+    assert statements.start_statement(ids[0]) == job_id
+    assert statements.job_status(job_id)['status'] == 'done'
+
+    batch = wait_done(statements.start_batch(ids, 'pdf'))
+    assert batch['status'] == 'done' and batch['path'].suffix == '.pdf'
+    assert wait_done(statements.start_batch(ids, 'zip'))['path'].suffix == '.zip'
+
+    # Renaming a drink changes what the statement shows.
+    conn.execute("UPDATE drinks SET name='Cola Zero' WHERE id=?", (drink,))
+    conn.commit()
+    assert statements.start_statement(ids[0]) != job_id
+    assert statements.start_statement(9999) is None
+    assert statements.job_status('../test.db') is None
+    conn.close()
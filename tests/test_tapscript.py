@@ -0,0 +1,28 @@
+from src import tapscript
+
+
+def test_generate_is_reproducible_and_weighted():
+    cards = {'REGULAR': 9, 'GUEST': 1}
+    taps = tapscript.generate(500, 3600 * 4, cards, seed=3)
+    assert taps == tapscript.generate(500, 3600 * 4, cards, seed=3)
+    assert 1700 < len(taps) < 2300
+    assert all(a[0] <= b[0] for a, b in zip(taps, taps[1:]))
+    regular = sum(1 for _, uid in taps if uid == 'REGULAR')
+    assert regular > 0.8 * len(taps)
+    assert tapscript.generate(0, 3600, cards) == []
+
+
+def test_script_roundtrip(tmp_path):
+    path = tmp_path / 'taps.txt'
+    taps = [(0.5, 'AAAA'), (12.25, 'BBBB')]
+    tapscript.dump(taps, path)
+    assert tapscript.load(path) == taps
+    assert tapscript.parse_distribution('A=5, B') == {'A': 5.0, 'B': 1.0}
+
+
+def test_scenario_uses_given_card_distribution():
+    uids = ['BENCH000000', 'BENCH000001']
+    given = tapscript.scenario(uids, 500, 3600, 'ONLY=1', seed=1)
+    assert given and {uid for _, uid in given} == {'ONLY'}
+    default = tapscript.scenario(uids, 500, 3600, seed=1)
+    assert {uid for _, uid in default} == set(uids)
@@ -0,0 +1,90 @@
+import requests
+
+from src import database, models
+
+
+def setup_db(tmp_path, monkeypatch):
+    db_file = tmp_path / 'test.db'
+    monkeypatch.setattr(database, 'DB_PATH', db_file)
+    monkeypatch.setattr(database, 'REFRESH_FLAG', tmp_path / 'refresh.flag')
+    conn = database.get_connection()
+    database.init_db(conn)
+    models.set_telegram_token('TOKEN', conn)
+    models.set_telegram_chat('42', conn)
+    # The module creates its notifier on import, which needs the database.
+    from src import telegram_bot
+    return telegram_bot
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.ok = status_code == 200
+        self._body = body or {'ok': self.ok}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.posts = []
+
+    def post(self, url, **kwargs):
+        self.posts.append((url.rsplit('/', 1)[1], kwargs))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def test_outbox_survives_errors_and_respects_rate_limit(tmp_path, monkeypatch):
+    telegram_bot = setup_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(telegram_bot, 'SEND_INTERVAL', 0)
+    monkeypatch.setattr(telegram_bot, 'BACKOFF_BASE', 0)
+    bot = telegram_bot.TelegramNotifier()
+    # Only queue here; the test drives the delivery itself.
+    monkeypatch.setattr(bot, '_start_sender', lambda: None)
+    bot.session = FakeSession([
+        requests.ConnectionError('offline'),
+        FakeResponse(429, {'ok': False, 'parameters': {'retry_after': 0}}),
+        FakeResponse(200),
+        FakeResponse(400, {'ok': False, 'description': 'Bad Request'}),
+        FakeResponse(200),
+    ])
+
+    bot.send_message('eins')
+    bot.send_message('zwei')
+    bot._send_csv('stock.csv', ['drink', 'stock'], [('Cola', 3)])
+    assert models.count_telegram_messages() == 3
+
+    # Network error and rate limit keep the first message queued.
+    assert bot.deliver_pending() == 0
+    assert bot.deliver_pending() == 0
+    message = models.next_telegram_message()
+    assert message['text'] == 'eins' and message['attempts'] == 2
+    # Delivered messages leave the outbox, rejected ones are dropped.
+    while bot.deliver_pending() is not None:
+        pass
+    assert models.count_telegram_messages() == 0
+
+    methods = [method for method, _ in bot.session.posts]
+    assert methods == ['sendMessage'] * 4 + ['sendDocument']
+    assert [kw['json']['text'] for _, kw in bot.session.posts[:4]] == ['eins'] * 3 + ['zwei']
+    document = bot.session.posts[4][1]
+    assert document['data'] == {'chat_id': '42'}
+    assert document['files']['document'] == ('stock.csv', b'drink,stock\r\nCola,3\r\n')
+    assert all(kw['timeout'] == telegram_bot.SEND_TIMEOUT for _, kw in bot.session.posts)
+
+
+def test_outbox_waits_for_retry_time(tmp_path, monkeypatch):
+    telegram_bot = setup_db(tmp_path, monkeypatch)
+    bot = telegram_bot.TelegramNotifier()
+    monkeypatch.setattr(bot, '_start_sender', lambda: None)
+    bot.session = FakeSession([FakeResponse(429, {'parameters': {'retry_after': 30}})])
+    bot.send_message('später')
+    assert bot.deliver_pending() == 0
+    wait = bot.deliver_pending()
+    assert 25 < wait <= 30
+    assert len(bot.session.posts) == 1